@@ -21,4 +21,4 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    frogger(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    frogger(width=GAME_WIDTH,height=GAME_HEIGHT,tickrate=TICK_RATE).run()
@@ -7,7 +7,11 @@ This module contains the main controller class for the frogger application.
 from consts import *
 from game2d import *
 from level import *
+from recording import *
 import colors_geom
+import os
+import random
+import time
 
 from kivy.logger import Logger
 
@@ -51,22 +55,25 @@ class frogger(GameApp):
     # HIDDEN ATTRIBUTES
     # Attribute _state: The current state of the game (taken from consts.py)
     # Invariant: _state is one of STATE_INACTIVE, STATE_LOADING, STATE_PAUSED,
-    #            STATE_ACTIVE, STATE_CONTINUE, or STATE_COMPLETE
+    #            STATE_ACTIVE, STATE_CONTINUE, STATE_COMPLETE, or STATE_REWIND
     #
     # Attribute _level: The subcontroller for a level, managing the frog and obstacles
     # Invariant: _level is a Level object or None if no level is currently active
     #
     # Attribute _title: The title of the game
-    # Invariant: _title is a GLabel, or None if there is no title to display
+    # Invariant: _title is a GLabel in the view, or None if there is no title to display
     #
     # Attribute _text: A message to display to the player
-    # Invariant: _text is a GLabel, or None if there is no message to display
+    # Invariant: _text is a GLabel in the view, or None if there is no message to display
 
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
 
     #Attribute _win: A boolean that states True if game is won by filling all exits
     #Invariant: _win is a True or False expression
 
+    #Attribute _endless: Whether the game is the endless level instead of a level file
+    #Invariant: _endless is a bool
+
     #Attribute width: The width of the level window
     #Invarient: width is an integer in pixel size
 
@@ -88,15 +95,22 @@ class frogger(GameApp):
         given invariants. When done, it sets the _state to STATE_INACTIVE and
         creates both the title (in attribute _title) and a message (in attribute
         _text) saying that the user should press a key to play a game.
+
+        The view is in retained mode: each object is added to it once (the title and
+        the messages here, the lanes and the frog by the level), and only moves after.
         """
+        self.view.retained = True
         self._title = GLabel(text='frogger!',font_name="AlloyInk.ttf",
         font_size = 124, x = self.width/2,y = self.height/2,linecolor = 'green')
-        self._text = GLabel(text = "press 's' to start",font_name="AlloyInk.ttf",
+        self._text = GLabel(text = "press 's' to start\nor 'e' for endless",font_name="AlloyInk.ttf",
         font_size =64, x = self.width/2, y = self.height/2)
+        self.view.add(self._title,LAYER_MESSAGE)
+        self.view.add(self._text,LAYER_MESSAGE)
         self._level = None
         self._state = STATE_INACTIVE
         self.lastkey = 0
         self._win = False
+        self._endless = False
 
 
     def update(self,dt):
@@ -126,7 +140,8 @@ class frogger(GameApp):
         This state only lasts one animation frame (the amount of time to load
         the data from the file) before switching to STATE_ACTIVE. One of the
         key things about this state is that it resizes the window to match the
-        level file.
+        level file. If the player pressed 'e' instead, the level is the endless
+        level (see endless.py), which is ENDLESS_VISIBLE rows on the screen.
 
         STATE_ACTIVE: This is a session of normal gameplay. The player can
         move the frog towards the exit, and the game will move all obstacles
@@ -145,6 +160,11 @@ ss
         STATE_COMPLETE: The wave is over (all lives are lost or all frogs are safe),
         and is either won or lost.
 
+        STATE_REWIND: The player is going back through the last REWIND_SECONDS of
+        play. The application switches to this state if the player holds 'r' while
+        the game is active, paused or complete. The level goes back REWIND_SPEED
+        ticks every frame that 'r' is held. Pressing 'c' plays on from there.
+
         You are allowed to add more states if you wish. Should you do so, you should
         describe them here.
 
@@ -157,9 +177,15 @@ ss
         curr_keys = self.input.key_count
         if self._state == STATE_INACTIVE and curr_keys > 0 and (self.lastkey == 0 and self.input.is_key_down('s')):
             self._state = STATE_LOADING
+        if self._state == STATE_INACTIVE and curr_keys > 0 and (self.lastkey == 0 and self.input.is_key_down('e')):
+            self._endless = True
+            self._state = STATE_LOADING
 
         if self._state != STATE_INACTIVE:
-            self._title = None
+            self._hideTitle()
+
+        if self._state in (STATE_ACTIVE,STATE_PAUSED,STATE_COMPLETE) and self.input.is_key_down('r'):
+            self._state = STATE_REWIND
 
         if self._state == STATE_ACTIVE:
             self._stateActive(dt)
@@ -168,8 +194,7 @@ ss
             self._stateLoading()
 
         if self._state == STATE_PAUSED:
-            self._text = GLabel(text = "press 'c' to continue",font_name="AlloyInk.ttf",
-            font_size = 64, x = self.width/2, y = self.height/2 - GRID_SIZE/2,linecolor = 'white',fillcolor = 'dark green',width = self.width, height = GRID_SIZE)
+            self._showMessage("press 'c' to continue")
             if curr_keys > 0 and (self.lastkey == 0 and self.input.is_key_down('c')):
                 self._state = STATE_CONTINUE
                 self._level.reconstructFrog()
@@ -178,15 +203,19 @@ ss
             self._state = STATE_ACTIVE
 
         if self._state == STATE_COMPLETE:
-            self._text= GLabel(text = "you " + ('win' if self._win else 'lose'),font_name="AlloyInk.ttf",
-            font_size = 64, x = self.width/2, y = self.height/2 - GRID_SIZE/2,linecolor = 'white', fillcolor = 'dark green',width = self.width, height = GRID_SIZE)
+            self._showMessage("you " + ('win' if self._win else 'lose'))
+
+        if self._state == STATE_REWIND:
+            self._stateRewind()
 
     def draw(self):
         """
-        Draws the game objects to the view.
+        Moves the game objects in the view.
 
-        Every single thing you want to draw in this game is a GObject. To draw a
-        GObject g, simply use the method g.draw(self.view). It is that easy!
+        Every single thing you want to draw in this game is a GObject. The view is in
+        retained mode, so each GObject is added to the view once (see start), and the
+        level adds its own objects (see Level.show). So this only has to move the
+        lanes and the frog of the level to where they are now.
 
         Many of the GObjects (such as the cars, logs, and exits) are attributes
         in either Level or Lane. In order to draw them, you either need to add
@@ -194,20 +223,43 @@ ss
         those two classes.  We suggest the latter.  See the example subcontroller.py
         from the lesson videos.
         """
-        if self._state == STATE_INACTIVE:
-            self._title.draw(self.view)
-            self._text.draw(self.view)
-        if self._state == STATE_LOADING:
-            self._level.draw(self.view)
         if self._state == STATE_ACTIVE:
-            self._level.draw(self.view)
-        if self._state == STATE_PAUSED:
-            self._level.draw(self.view)
-            self._text.draw(self.view)
-        if self._state == STATE_COMPLETE:
-            self._level.draw(self.view)
-            self._text.draw(self.view)
+            self._level.animate(self.alpha)
+        elif not self._level is None:
+            self._level.animate()
     # HELPER METHODS FOR THE STATES GO HERE
+    def _showMessage(self,message):
+        '''
+        Puts message in a banner across the middle of the level
+
+        The banner (a GLabel in _text) is only made again (and added to the view) if
+        the message changed, so the view does not get a new label every frame.
+
+        Parameter message: The message to display
+        Precondition: message is a string
+        '''
+        if self._text is None or self._text.text != message:
+            self._hideMessage()
+            self._text = GLabel(text = message,font_name="AlloyInk.ttf",
+            font_size = 64, x = self.width/2, y = self.height/2 - GRID_SIZE/2,linecolor = 'white',fillcolor = 'dark green',width = self.width, height = GRID_SIZE)
+            self.view.add(self._text,LAYER_MESSAGE)
+
+    def _hideMessage(self):
+        '''
+        Takes the message (if any) off the screen
+        '''
+        if not self._text is None:
+            self.view.remove(self._text)
+            self._text = None
+
+    def _hideTitle(self):
+        '''
+        Takes the title (if any) off the screen
+        '''
+        if not self._title is None:
+            self.view.remove(self._title)
+            self._title = None
+
 
     def _stateActive(self,dt):
         '''
@@ -218,20 +270,17 @@ ss
         state to STATE_INACTIVE.
 
         '''
-        self._text = None
+        self._hideMessage()
         x = self._level.update(self.input,dt)
         if x == 'more lives left' :
             self._state = STATE_PAUSED
         if x == 'in exit':
-            self._win= True
-            for lane in self._level.getLanes():
-                if isinstance(lane,Hedge):
-                    if self._level.isWon(lane):
-                        self._win = False
-                        break
+            self._win = self._level.isComplete()
             self._state = STATE_COMPLETE if self._win else STATE_PAUSED
         if x == 'no lives left':
             self._state = STATE_COMPLETE
+        if self._state == STATE_COMPLETE:
+            self._saveRecording()
 
     def _stateLoading(self):
         '''
@@ -242,11 +291,61 @@ ss
         state to STATE_INACTIVE.
 
         '''
-        self._text = None
-        self._title = None
-        defaultlvl = self.load_json(DEFAULT_LEVEL)
+        self._hideMessage()
+        self._hideTitle()
         hitbox = self.load_json('objects.json')
-        self.width = defaultlvl['size'][0] * GRID_SIZE
-        self.height = (defaultlvl['size'][1] + 1)* GRID_SIZE
-        self._level = Level(defaultlvl,hitbox)
+        if self._endless:
+            seed = random.randrange(2**31) if ENDLESS_SEED is None else ENDLESS_SEED
+            self.width = ENDLESS_COLUMNS * GRID_SIZE
+            self.height = (ENDLESS_VISIBLE + 1)* GRID_SIZE
+            self._level = EndlessLevel(seed,hitbox)
+            self._level.show(self.view)
+        else:
+            defaultlvl = self.load_json(DEFAULT_LEVEL)
+            self.width = defaultlvl['size'][0] * GRID_SIZE
+            self.height = (defaultlvl['size'][1] + 1)* GRID_SIZE
+            self._level = Level(defaultlvl,hitbox)
+            self._level.show(self.view)
+            if not REPLAY_FOLDER is None:
+                self._level.setRecorder(Recorder(DEFAULT_LEVEL,defaultlvl,hitbox))
+        rate = TICK_RATE if self.tickrate is None else self.tickrate
+        self._level.setHistory(RewindBuffer(int(REWIND_SECONDS*rate)))
         self._state = STATE_ACTIVE
+
+    def _stateRewind(self):
+        '''
+        Goes back through the level while 'r' is held, and plays on when 'c' is pressed
+
+        The message is hidden while rewinding, so that the whole level can be seen.
+        If the level is rewound to a point with no frog (there is no more history),
+        the frog is reconstructed when play goes on.
+        '''
+        if self.input.is_key_down('r'):
+            self._hideMessage()
+            self._level.rewind(REWIND_SPEED)
+        else:
+            self._showMessage("press 'c' to continue")
+            if self.input.key_count > 0 and (self.lastkey == 0 and self.input.is_key_down('c')):
+                if not self._level.hasFrog():
+                    self._level.reconstructFrog()
+                self._win = False
+                self._hideMessage()
+                self._state = STATE_ACTIVE
+
+    def _saveRecording(self):
+        '''
+        Saves the recording of the level (if any) in the folder REPLAY_FOLDER
+
+        The file is named after the level and the time, such as
+        easy2-20240101-120000.frec. A game that cannot be saved is only logged. There
+        is only a recording if the game was started with --record (see consts.py).
+        '''
+        recorder = self._level.getRecorder()
+        if recorder is None:
+            return
+        name = '%s-%s.frec' % (DEFAULT_LEVEL[:-5],time.strftime('%Y%m%d-%H%M%S'))
+        path = os.path.join(os.path.dirname(self.json),REPLAY_FOLDER,name)
+        try:
+            recorder.save(path)
+        except OSError as e:
+            Logger.info('frogger: Could not save the recording %s (%s).' % (repr(path),e))
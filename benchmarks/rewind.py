@@ -0,0 +1,132 @@
+"""
+Benchmark for the rewind buffer in recording.py
+
+This script plays a level with random input (the same input every run), keeping its
+history in a RewindBuffer, and prints what the history costs: the time that record
+adds to every tick, the memory of the buffer, and the time to rewind the level by
+different numbers of ticks.
+
+It does not need Kivy, so it can be run from the top folder of the game with
+
+    python benchmarks/rewind.py
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+from consts import *
+from simulation import *
+from recording import *
+
+
+def load(name):
+    """
+    Returns the model of the level in the file name (in the JSON folder)
+
+    Parameter name: The level file
+    Precondition: name is a string naming a level file
+    """
+    import json
+    with open(os.path.join(ROOT,'JSON',name)) as file:
+        level = json.load(file)
+    with open(os.path.join(ROOT,'JSON',OBJECT_DATA)) as file:
+        hitbox = json.load(file)
+    return SimLevel(level,hitbox)
+
+
+def play(level,history,ticks):
+    """
+    Plays ticks updates of level with random input, keeping them in history
+
+    The frog is reconstructed whenever it is lost, and the level goes back as far as
+    it can if the game is over. This returns the time of an update without history,
+    in microseconds.
+
+    Parameter level: The model of the level
+    Precondition: level is a SimLevel
+
+    Parameter history: The buffer to keep the updates in
+    Precondition: history is a RewindBuffer for level
+
+    Parameter ticks: The number of updates to play
+    Precondition: ticks is an int > 0
+    """
+    random.seed(0)
+    input = SimInput()
+    dt = 1.0/TICK_RATE
+    spent = 0.0
+    for tick in range(ticks):
+        if level.getFrog() is None:
+            level.reconstructFrog()
+        r = random.random()
+        input.setKeys(['up'] if r < 0.01 else ['left'] if r < 0.015 else ['right'] if r < 0.02 else [])
+        history.record(level,input,dt)
+        start = time.perf_counter()
+        result = level.update(input,dt)
+        spent += time.perf_counter()-start
+        if result == 'no lives left' or level.getExitsLeft() == 0:
+            history.rewind(level,history.getFirst())
+    return spent/ticks*1e6
+
+
+def measure_rewind(level,history,ticks,number):
+    """
+    Returns the microseconds to rewind level by ticks, as a pair (mean,max)
+
+    The level is played forward again after each rewind, so every rewind starts from
+    the same tick. The rewinds start from different points between two keyframes.
+
+    Parameter level: The model of the level
+    Precondition: level is a SimLevel
+
+    Parameter history: The buffer of the updates of level
+    Precondition: history is a RewindBuffer for level
+
+    Parameter ticks: The number of ticks to go back
+    Precondition: ticks is an int > 0
+
+    Parameter number: The number of rewinds to time
+    Precondition: number is an int > 0
+    """
+    times = []
+    for n in range(number):
+        play(level,history,1+n % REWIND_KEYFRAME)
+        start = time.perf_counter()
+        history.rewind(level,history.getTick()-ticks)
+        times.append(time.perf_counter()-start)
+        play(level,history,ticks)
+    return (sum(times)/number*1e6,max(times)*1e6)
+
+
+def main(name='easy2.json',seconds=REWIND_SECONDS):
+    """
+    Prints the cost of keeping seconds of history for the level file name
+
+    Parameter name: The level file
+    Precondition: name is a string naming a level file
+
+    Parameter seconds: The seconds of history to keep
+    Precondition: seconds is a number > 0
+    """
+    level = load(name)
+    history = RewindBuffer(int(seconds*TICK_RATE))
+    update = play(level,history,20*TICK_RATE)
+    (mean,worst) = history.getOverhead()
+    print('%s, %d ticks of history (keyframe every %d ticks)' %
+          (name,int(seconds*TICK_RATE),REWIND_KEYFRAME))
+    print('%-16s %10.2f us' % ('update',update))
+    print('%-16s %10.2f us (max %.1f)' % ('record',mean,worst))
+    print('%-16s %10.1f %%' % ('overhead',mean/update*100))
+    print('%-16s %10d bytes' % ('memory',history.getMemory()))
+    print()
+    print('%-16s %10s %10s' % ('rewind','mean (us)','max (us)'))
+    for ticks in (1,REWIND_KEYFRAME,TICK_RATE,history.getTick()-history.getFirst()):
+        (mean,worst) = measure_rewind(level,history,ticks,100)
+        print('%-16s %10.1f %10.1f' % ('%d ticks' % ticks,mean,worst))
+
+
+if __name__ == '__main__':
+    main()
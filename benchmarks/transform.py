@@ -0,0 +1,109 @@
+"""
+Benchmark comparing the 2d transform with the 4x4 matrix in colors_geom.geom
+
+This script times the operations that game2d uses for every moving or rotated object
+(building a transform, inverting it, composing two transforms and transforming a
+point) with both Matrix and Transform2D, and prints the time per call.  It also
+compares transforming a batch of points one at a time with transform_many.
+
+It does not need Kivy, so it can be run from the top folder of the game with
+
+    python benchmarks/transform.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from colors_geom.geom import Matrix, Transform2D
+
+
+def build(cls):
+    """
+    Returns a transform of class cls built the way GObject builds its matrix
+
+    Parameter cls: The transform class
+    Precondition: cls is Matrix or Transform2D
+    """
+    m = cls()
+    m.scale(1.5,0.5)
+    m.rotate(30)
+    m.translate(100,200)
+    return m
+
+
+def measure(cls,number):
+    """
+    Returns a dictionary from operation name to microseconds per call
+
+    Parameter cls: The transform class
+    Precondition: cls is Matrix or Transform2D
+
+    Parameter number: The number of calls to time for each operation
+    Precondition: number is an int > 0
+    """
+    m = build(cls)
+    n = build(cls).inverse()
+    tests = [('build',     lambda: build(cls)),
+             ('inverse',   lambda: m.inverse()),
+             ('multiply',  lambda: m*n),
+             ('transform', lambda: tuple(m._transform(3.0,4.0)))]
+    result = {}
+    for (name,test) in tests:
+        best = min(timeit.repeat(test,number=number,repeat=5))
+        result[name] = best/number*1e6
+    return result
+
+
+def measure_batch(cls,count,number):
+    """
+    Returns the microseconds to transform count points, one at a time and all at once
+
+    The result is a pair (loop,batch).
+
+    Parameter cls: The transform class
+    Precondition: cls is Matrix or Transform2D
+
+    Parameter count: The number of points in the batch
+    Precondition: count is an int > 0
+
+    Parameter number: The number of batches to time
+    Precondition: number is an int > 0
+    """
+    import numpy as np
+    m = build(cls)
+    points = np.arange(2*count,dtype=np.float64).reshape(count,2)
+    pairs  = points.tolist()
+    out = np.empty_like(points)
+    loop  = lambda: [tuple(m._transform(p[0],p[1])) for p in pairs]
+    batch = lambda: m.transform_many(points,out=out)
+    result = []
+    for test in (loop,batch):
+        best = min(timeit.repeat(test,number=number,repeat=5))
+        result.append(best/number*1e6)
+    return tuple(result)
+
+
+def main(number=20000):
+    """
+    Prints the time per call of each operation for Matrix and Transform2D
+
+    Parameter number: The number of calls to time for each operation
+    Precondition: number is an int > 0
+    """
+    old = measure(Matrix,number)
+    new = measure(Transform2D,number)
+    print('%-10s %12s %12s %8s' % ('operation','Matrix (us)','Transform2D','speedup'))
+    for name in old:
+        print('%-10s %12.2f %12.2f %7.1fx' % (name,old[name],new[name],old[name]/new[name]))
+
+    count = 1000
+    print()
+    print('%d points  %12s %12s %8s' % (count,'loop (us)','batch (us)','speedup'))
+    for cls in (Matrix,Transform2D):
+        (loop,batch) = measure_batch(cls,count,max(1,number//1000))
+        print('%-11s %12.1f %12.1f %7.1fx' % (cls.__name__,loop,batch,loop/batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,4 @@ Module that provides basic point and vector objects.
 from .point  import Point2, Point3, Point
 from .vector import Vector2, Vector3, Vector
 from .matrix import Matrix
+from .transform import Transform2D
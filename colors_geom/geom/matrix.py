@@ -344,7 +344,40 @@ class Matrix(object):
         import numpy as np
         b = np.array([x,y,z,1], dtype=np.float32)
         tmp = np.dot(self._data,b)
-        return map(float,tuple(tmp[:-1]))
+        return tuple(map(float,tmp[:-1]))
+
+    def transform_many(self,points,out=None):
+        """
+        Transforms an array of points by this matrix.
+
+        The points are the rows of an (N,2) or (N,3) array.  Points with two
+        coordinates are treated as having z = 0 (and the z-coordinate of the result is
+        dropped).  All of the points are transformed at once, which is much faster than
+        calling :meth:`transform` on each point.
+
+        The result is computed in the precision of ``points``, but never less than the
+        float32 of this matrix.
+
+        :param points: the points to transform
+        :type points:  array-like of shape (N,2) or (N,3)
+
+        :param out: an array to store the result in (default None)
+        :type out:  ``numpy.ndarray`` of the same shape as points, or None
+
+        :return: The points transformed by this matrix
+        :rtype:  ``numpy.ndarray`` of shape (N,2) or (N,3)
+        """
+        import numpy as np
+        points = np.asarray(points)
+        assert points.ndim == 2 and points.shape[1] in [2,3], \
+            '%s is not an array of 2d or 3d points' % repr(points)
+        size = points.shape[1]
+        if out is None:
+            out = np.empty(points.shape,dtype=np.result_type(points,np.float32))
+        assert out.shape == points.shape, '%s has the wrong shape' % repr(out)
+        np.matmul(points,self._data[:size,:size].T,out=out)
+        out += self._data[:size,3]
+        return out
 
     def transform(self,value):
         """
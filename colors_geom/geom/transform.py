@@ -0,0 +1,423 @@
+"""
+Classes for representing 2d affine transforms.
+
+"""
+import math
+
+
+class Transform2D(object):
+    """
+    An instance is a 2d affine transform for graphics.
+
+    This class has the same interface as :class:`Matrix`, but it only supports the
+    transforms of the plane: translations, rotations about the z-axis, and scales. The
+    transform is stored as six floats, so that the point (x,y) goes to::
+
+        (a*x + b*y + tx, c*x + d*y + ty)
+
+    Every operation is a handful of float multiplications, with no ``numpy`` arrays to
+    allocate.  For the small transforms of a 2d game this is much faster than a 4x4
+    :class:`Matrix`.  The inverse is computed in closed form.
+
+    There are no publicly accessible attributes, as it is not safe to access the
+    internals.
+    """
+
+    def __init__(self,a=1.0,b=0.0,c=0.0,d=1.0,tx=0.0,ty=0.0):
+        """
+        The constructor creates a new transform (the identity by default)
+
+        :param a: the x-coefficient of the new x-coordinate (default 1)
+        :type a:  ``int`` or ``float``
+
+        :param b: the y-coefficient of the new x-coordinate (default 0)
+        :type b:  ``int`` or ``float``
+
+        :param c: the x-coefficient of the new y-coordinate (default 0)
+        :type c:  ``int`` or ``float``
+
+        :param d: the y-coefficient of the new y-coordinate (default 1)
+        :type d:  ``int`` or ``float``
+
+        :param tx: the x-offset (default 0)
+        :type tx:  ``int`` or ``float``
+
+        :param ty: the y-offset (default 0)
+        :type ty:  ``int`` or ``float``
+        """
+        self._data = [float(a),float(b),float(c),float(d),float(tx),float(ty)]
+
+    @classmethod
+    def CreateTranslation(cls,x=0,y=0,z=0):
+        """
+        Creates a translation transform for the given offset.
+
+        :param x: x-coordinate of translation (default 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of translation (default 0)
+        :type y:  ``int`` or ``float``
+
+        :param z: z-coordinate of translation (ignored)
+        :type z:  ``int`` or ``float``
+        """
+        result = cls()
+        result.translate(x,y,z)
+        return result
+
+    @classmethod
+    def CreateRotation(cls,ang=0,x=0,y=0,z=1):
+        """
+        Creates a rotation about the z-axis.
+
+        The rotation angle is given in degrees, not radians. Rotation is counterclockwise.
+        The axis arguments are only there to match :class:`Matrix`; the axis must be the
+        z-axis.
+
+        :param angle: angle of rotation in degrees (default 0)
+        :type angle:  ``int`` or ``float``
+
+        :param x: x-coordinate of rotation axis (must be 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of rotation axis (must be 0)
+        :type y:  ``int`` or ``float``
+
+        :param z: z-coordinate of rotation axis (must be 1)
+        :type z:  ``int`` or ``float``
+        """
+        result = cls()
+        result.rotate(ang,x,y,z)
+        return result
+
+    @classmethod
+    def CreateScale(cls,x=1,y=1,z=1):
+        """
+        Creates a scale transform for the given amount
+
+        :param x: x-coordinate of the scale (default 1)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of the scale (default 1)
+        :type Y:  ``int`` or ``float``
+
+        :param z: z-coordinate of the scale (ignored)
+        :type Z:  ``int`` or ``float``
+        """
+        result = cls()
+        result.scale(x,y,z)
+        return result
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this transform.
+        :rtype:  ``str``
+        """
+        (a,b,c,d,tx,ty) = self._data
+        return str([[a,b,tx],[c,d,ty],[0.0,0.0,1.0]]).replace('], [','],\n [')
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this transform.
+        :rtype:  ``str``
+        """
+        return str(self.__class__)+str(self)
+
+    # COMPARISON
+    def __eq__(self, other):
+        """
+        Compares this object with ``other``
+
+        As with :class:`Matrix`, this tests whether the coefficients are "close enough"
+        (with the tolerances of ``numpy.allclose``). It does not require exact equality
+        for floats.  Equivalence also requires type equivalence.
+
+        :param other: The object to check
+
+        :return: True if ``self`` and ``other`` are equivalent
+        :rtype:  ``bool``
+        """
+        if type(other) != type(self):
+            return False
+        for (x,y) in zip(self._data,other._data):
+            if abs(x-y) > 1e-08 + 1e-05*abs(y):
+                return False
+        return True
+
+    def __ne__(self, other):
+        """
+        Compares this object with ``other``
+
+        As with :class:`Matrix`, this tests whether the coefficients are "close enough".
+        It does not require exact equality for floats.
+
+        :param other: The object to check
+
+        :return: False if ``self`` and ``other`` are equivalent objects.
+        :rtype:  ``bool``
+        """
+        return not self == other
+
+    def __mul__(self,other):
+        """
+        Premultiplies this transform by ``other``.
+
+        As with :class:`Matrix`, this allows us to read graphics operations left to
+        right.  So if ``p`` is a rotation and ``q`` is a translation, then ``p * q``
+        produces a rotation followed by a translation. This method does not modify this
+        transform.
+
+        :param other: the transform to pre-multiply
+        :type other:  ``Transform2D``
+
+        :return: The result of premultiplying this transform by ``other``
+        :rtype:  ``Transform2D``
+        """
+        result = Transform2D()
+        result._data = _compose(other._data,self._data)
+        return result
+
+    def __imul__(self,other):
+        """
+        Premultiplies this transform by ``other`` in place.
+
+        This method will modify the attributes of this oject. This method returns this
+        object for chaining.
+
+        :return: This object, newly modified
+        :rtype:  ``Transform2D``
+        """
+        self._data = _compose(other._data,self._data)
+        return self
+
+    def copy(self):
+        """
+        :return: a copy of this transform
+        :rtype:  ``Transform2D``
+        """
+        result = Transform2D()
+        result._data = list(self._data)
+        return result
+
+    def inverse(self):
+        """
+        :return: the inverse of this transform
+        :rtype:  ``Transform2D``
+        """
+        result = Transform2D()
+        result._data = _invert(self._data)
+        return result
+
+    def invert(self):
+        """
+        Inverts this transform in place.
+
+        This method returns this object for chaining.
+
+        :return: This object, newly modified
+        :rtype:  ``Transform2D``
+        """
+        self._data = _invert(self._data)
+        return self
+
+    def translate(self,x=0,y=0,z=0):
+        """
+        Translates this transform (in-place) by the given amount.
+
+        This method will modify the attributes of this oject. This method returns this
+        object for chaining.
+
+        :param x: x-coordinate of translation (default 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of translation (default 0)
+        :type y:  ``int`` or ``float``
+
+        :param z: z-coordinate of translation (ignored)
+        :type z:  ``int`` or ``float``
+
+        :return: This object, newly modified
+        """
+        self._data[4] += x
+        self._data[5] += y
+        return self
+
+    def rotate(self,ang=0,x=0,y=0,z=1):
+        """
+        Rotates this transform (in place) about the z-axis.
+
+        The rotation angle is given in degrees, not radians. Rotation is counterclockwise.
+        The axis arguments are only there to match :class:`Matrix`; the axis must be the
+        z-axis.
+
+        This method will modify the attributes of this oject. This method returns this
+        object for chaining.
+
+        :param angle: angle of rotation in degrees (default 0)
+        :type angle:  ``int`` or ``float``
+
+        :param x: x-coordinate of rotation axis (must be 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of rotation axis (must be 0)
+        :type y:  ``int`` or ``float``
+
+        :param z: z-coordinate of rotation axis (must be 1)
+        :type z:  ``int`` or ``float``
+
+        :return: This object, newly modified
+        """
+        assert x == 0 and y == 0 and z > 0, 'A 2d transform can only rotate about the z-axis'
+        cs = math.cos(math.radians(ang))
+        sn = math.sin(math.radians(ang))
+        self._data = _compose([cs,-sn,sn,cs,0.0,0.0],self._data)
+        return self
+
+    def scale(self,x=1,y=1,z=1):
+        """
+        Scales this transform (in-place) by the given amount
+
+        This method will modify the attributes of this oject. This method returns this
+        object for chaining.
+
+        :param x: x-coordinate of the scale (default 1)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of the scale (default 1)
+        :type Y:  ``int`` or ``float``
+
+        :param z: z-coordinate of the scale (ignored)
+        :type Z:  ``int`` or ``float``
+
+        :return: This object, newly modified
+        """
+        data = self._data
+        data[0] *= x
+        data[1] *= x
+        data[4] *= x
+        data[2] *= y
+        data[3] *= y
+        data[5] *= y
+        return self
+
+    def _transform(self,x=0,y=0,z=0):
+        """
+        Transforms the given point by this transform.
+
+        The value returned is a 3-element tuple of floats.  The z-coordinate is
+        unchanged.
+
+        :param x: x-coordinate to transform (default 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate to transform (default 0)
+        :type y:  ``int`` or ``float``
+
+        :param z: z-coordinate to transform (default 0)
+        :type z:  ``int`` or ``float``
+
+        :return: The point (x,y,z) transformed by this transform
+        :rtype:  ``tuple``
+        """
+        (a,b,c,d,tx,ty) = self._data
+        return (a*x+b*y+tx,c*x+d*y+ty,float(z))
+
+    def transform_many(self,points,out=None):
+        """
+        Transforms an array of points by this transform.
+
+        The points are the rows of an (N,2) or (N,3) array.  The z-coordinate of 3d
+        points is unchanged.  All of the points are transformed at once, which is much
+        faster than calling :meth:`transform` on each point when there are many.
+
+        :param points: the points to transform
+        :type points:  array-like of shape (N,2) or (N,3)
+
+        :param out: an array to store the result in (default None)
+        :type out:  ``numpy.ndarray`` of the same shape as points, or None
+
+        :return: The points transformed by this transform
+        :rtype:  ``numpy.ndarray`` of shape (N,2) or (N,3)
+        """
+        import numpy as np
+        points = np.asarray(points)
+        assert points.ndim == 2 and points.shape[1] in [2,3], \
+            '%s is not an array of 2d or 3d points' % repr(points)
+        if out is None:
+            out = np.empty(points.shape,dtype=np.result_type(points,np.float64))
+        assert out.shape == points.shape, '%s has the wrong shape' % repr(out)
+        (a,b,c,d,tx,ty) = self._data
+        x = points[:,0]
+        y = points[:,1]
+        if np.shares_memory(points,out):
+            x = x.copy()
+            y = y.copy()
+        elif points.shape[1] == 3:
+            out[:,2] = points[:,2]
+        np.multiply(x,a,out=out[:,0])
+        out[:,0] += b*y
+        out[:,0] += tx
+        np.multiply(x,c,out=out[:,1])
+        out[:,1] += d*y
+        out[:,1] += ty
+        return out
+
+    def transform(self,value):
+        """
+        Transforms the given point or vector by this transform.
+
+        Value can be a point or vector of any dimenion.  This includes :class:`Point2`,
+        :class:`Point3`, :class:`Vector2`, and :class:`Vector3`.  The value returned
+        will have the same type as ``value``.  As with :class:`Matrix`, vectors are
+        translated too.
+
+        :param value: the object to transform
+        :type value:  point or vector
+
+        :return: The value  transformed by this transform
+        :rtype:  ``type(value)``
+
+        """
+        from .tuple import Tuple2, Tuple3
+        if isinstance(value,Tuple2):
+            p = self._transform(value.x,value.y)
+            return type(value)(p[0],p[1])
+        elif isinstance(value,Tuple3):
+            p = self._transform(value.x,value.y,value.z)
+            return type(value)(p[0],p[1],p[2])
+
+        assert False, '%s is not a point or vector' % repr(value)
+
+
+def _compose(first,second):
+    """
+    Returns the coefficients of the transform second followed by first
+
+    :param first: the coefficients (a,b,c,d,tx,ty) of the transform applied last
+    :type first:  ``list`` of ``float``
+
+    :param second: the coefficients (a,b,c,d,tx,ty) of the transform applied first
+    :type second:  ``list`` of ``float``
+    """
+    (a0,b0,c0,d0,x0,y0) = first
+    (a1,b1,c1,d1,x1,y1) = second
+    return [a0*a1+b0*c1, a0*b1+b0*d1,
+            c0*a1+d0*c1, c0*b1+d0*d1,
+            a0*x1+b0*y1+x0, c0*x1+d0*y1+y0]
+
+
+def _invert(data):
+    """
+    Returns the coefficients of the inverse transform
+
+    :param data: the coefficients (a,b,c,d,tx,ty) of an invertible transform
+    :type data:  ``list`` of ``float``
+    """
+    (a,b,c,d,tx,ty) = data
+    det = a*d-b*c
+    assert det != 0, 'The transform is not invertible'
+    ia =  d/det
+    ib = -b/det
+    ic = -c/det
+    id =  a/det
+    return [ia,ib,ic,id,-(ia*tx+ib*ty),-(ic*tx+id*ty)]
@@ -332,10 +332,14 @@ class Tuple2(object):
         Transforms this object by a matrix in place
 
         :param matrix: matrix to transform with
-        :type matrix:  :class:`Matrix`
+        :type matrix:  :class:`Matrix` or :class:`Transform2D`
         """
         from .matrix import Matrix
+        from .transform import Transform2D
         import numpy as np
+        if isinstance(matrix,Transform2D):
+            (self.x,self.y,z) = matrix._transform(self.x,self.y)
+            return
         assert isinstance(matrix,Matrix), "%s is not a matrix" % repr(matrix)
         b = np.array([self.x,self.y,0,1], dtype=np.float32)
         tmp = np.dot(matrix._data,b)
@@ -362,12 +366,13 @@ class Tuple2(object):
         :rtype:  ``type(self)``
         """
         from .matrix import Matrix
+        from .transform import Transform2D
         result = self.copy()
         if type(value) in [int,float]:
             result._imul_scalar_(value)
         elif isinstance(value,Tuple2):
             result._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Transform2D)):
             result._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
@@ -393,11 +398,12 @@ class Tuple2(object):
         :return: This object, newly modified
         """
         from .matrix import Matrix
+        from .transform import Transform2D
         if type(value) in [int,float]:
             self._imul_scalar_(value)
         elif isinstance(value,Tuple2):
             self._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Transform2D)):
             self._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
@@ -971,10 +977,14 @@ class Tuple3(object):
         Transforms this object by a matrix in place
 
         :param matrix: matrix to transform with
-        :type matrix:  :class:`Matrix`
+        :type matrix:  :class:`Matrix` or :class:`Transform2D`
         """
         from .matrix import Matrix
+        from .transform import Transform2D
         import numpy as np
+        if isinstance(matrix,Transform2D):
+            (self.x,self.y,self.z) = matrix._transform(self.x,self.y,self.z)
+            return
         assert isinstance(matrix,Matrix), "%s is not a matrix" % repr(matrix)
         b = np.array([self.x,self.y,self.z,1], dtype=np.float32)
         tmp = np.dot(matrix._data,b)
@@ -1002,12 +1012,13 @@ class Tuple3(object):
         :rtype:  ``type(self)``
         """
         from .matrix import Matrix
+        from .transform import Transform2D
         result = self.copy()
         if type(value) in [int,float]:
             result._imul_scalar_(value)
         elif isinstance(value,Tuple3):
             result._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Transform2D)):
             result._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
@@ -1033,11 +1044,12 @@ class Tuple3(object):
         :return: This object, newly modified
         """
         from .matrix import Matrix
+        from .transform import Transform2D
         if type(value) in [int,float]:
             self._imul_scalar_(value)
         elif isinstance(value,Tuple3):
             self._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Transform2D)):
             self._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
@@ -48,6 +48,10 @@ DEATH_SPEED  = 0.5
 
 ### GAME CONSTANTS ###
 
+# The number of fixed time steps per second (None to step once per animation frame)
+# A fixed step makes the game the same for the same inputs, whatever the frame rate
+TICK_RATE = 60
+
 # The state before the game has started
 STATE_INACTIVE = 0
 # The state when we are loading in a new level
@@ -60,6 +64,54 @@ STATE_PAUSED   = 3
 STATE_CONTINUE = 4
 # The state when the game is complete (won or lost)
 STATE_COMPLETE = 5
+# The state when the player is going back through the last few seconds
+STATE_REWIND   = 6
+
+# The number of seconds of play that can be rewound
+REWIND_SECONDS = 10
+# The number of ticks rewound for each tick that the rewind key is held
+REWIND_SPEED   = 2
+
+
+### LAYER CONSTANTS ###
+
+# The layers of the view (see GView.add), from the bottom to the top
+# The lane backgrounds
+LAYER_TILES   = 0
+# The obstacles and the safe frogs
+LAYER_OBJECTS = 1
+# The frog
+LAYER_FROG    = 2
+# The lives display (and the distance of the endless level)
+LAYER_DISPLAY = 3
+# The title and the messages
+LAYER_MESSAGE = 4
+
+
+### ENDLESS CONSTANTS ###
+
+# The number of grid columns in the endless level
+ENDLESS_COLUMNS   = 11
+# The number of rows of the endless level on the screen (without the lives display)
+ENDLESS_VISIBLE   = 11
+# The number of rows on the screen below the farthest row the frog has reached
+ENDLESS_BEHIND    = 4
+# The number of lanes that exist at a time: the rows on the screen and one more row
+# above and below, so that the camera can follow a hop
+ENDLESS_ROWS      = ENDLESS_VISIBLE+2
+# The number of rows in each stretch of generated lanes; the first row is always grass
+# Must be at most ENDLESS_BEHIND+1, so that a lost frog can go back to grass
+ENDLESS_CHUNK     = 5
+# The chance that a stretch starts with a hedge (with openings) after the grass
+ENDLESS_HEDGES    = 0.25
+# The offscreen buffer (in grid squares) of the generated roads and rivers
+ENDLESS_OFFSCREEN = 2
+# The smallest and largest lane speed (in pixels a second) at the start
+ENDLESS_SPEEDS    = (60,140)
+# The number of rows until the lanes are twice as fast (they get no faster)
+ENDLESS_RAMP      = 250
+# The seed of the endless level (None for a new level every game)
+ENDLESS_SEED      = None
 
 
 ### FONT CONSTANTS ###
@@ -90,6 +142,11 @@ TRILL_SOUND = 'trill.wav'
 DEFAULT_LEVEL  = 'easy2.json'
 # The object data (hitboxes) file
 OBJECT_DATA    = 'objects.json'
+# The folder (next to the JSON folder) for the recordings of finished games
+# This is None (games are not recorded) unless the game is started with --record
+REPLAY_FOLDER  = None
+# The folder that --record records to when it is not given one
+REPLAY_DEFAULT = 'Replays'
 
 
 ### USE COMMAND LINE ARGUMENTS TO CHANGE DEFAULT LEVEL FILE AND FROG SPEED
@@ -105,7 +162,19 @@ you start the game.
 
 The second argument is the FROG_SPEED, which is the amount of time between move steps.
 A large value means a much slower moving frog.
+
+Finished games are only recorded if you ask for it with the option --record (which
+records to the folder REPLAY_DEFAULT) or --record=FOLDER. The option may go anywhere,
+and it is taken out of sys.argv so that it does not shift the other arguments.
 """
+for arg in sys.argv[1:]:
+    if arg == '--record':
+        REPLAY_FOLDER = REPLAY_DEFAULT
+        sys.argv.remove(arg)
+    elif arg.startswith('--record='):
+        REPLAY_FOLDER = arg[len('--record='):]
+        sys.argv.remove(arg)
+
 try:
     file = sys.argv[1]
     if file[-5:].lower() == '.json':
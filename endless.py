@@ -0,0 +1,335 @@
+"""
+Endless level module for frogger
+
+This module contains the model of the endless level, in which new lanes are made up
+(from a seeded random generator) as the frog goes forward, as in Crossy Road.
+
+The lanes are in the same format as the lanes of a level file. EndlessLanes is a list
+of them with no end, and endlessLevel puts it in a level JSON dict, so the lanes can be
+read by SimLane (and by the lane views in lanes.py) like any other level. SimEndless is
+the model of the level. It only has ENDLESS_ROWS lanes at a time. When the frog reaches
+a new row, the lane that scrolled off the bottom is made into the new lane at the top,
+so the memory and the time of an update stay the same however far the frog goes.
+
+A row is always the same lane for the same seed, so the level can be put back in an
+earlier state (see SimEndless.restore) by making the lanes of that state again.
+"""
+from consts import *
+from simulation import *
+import numpy as np
+import random
+import math
+
+# PRIMARY RULE: Like simulation.py, this module may only access consts.py and
+# simulation.py. It must never import game2d (or anything else that needs Kivy).
+
+# The obstacles of the generated roads
+ENDLESS_CARS = ('car1','car2','car3','car4','car5','car6','truck1','truck2','truck3',
+                'trailer1','trailer2','flatbed')
+
+# The obstacles of the generated rivers
+ENDLESS_LOGS = ('log2','log3','log4','log5')
+
+# The smallest and largest gap (in grid squares) between two cars
+ENDLESS_CAR_GAPS = (2,5)
+
+# The smallest and largest gap (in grid squares) between two logs
+ENDLESS_LOG_GAPS = (1,2)
+
+
+def endlessLevel(seed,jsonhitbox):
+    """
+    Returns a level JSON dict for the endless level with the given seed
+
+    The dict has the same keys as a level file (and the seed), but its lanes are an
+    EndlessLanes. The level is ENDLESS_VISIBLE rows high (the part on the screen), and
+    the frog starts in the middle of row 0.
+
+    Parameter seed: The seed of the level
+    Precondition: seed is an int
+
+    Paramter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+    """
+    return {'version': 1.0, 'seed': seed, 'size': [ENDLESS_COLUMNS,ENDLESS_VISIBLE],
+            'start': [ENDLESS_COLUMNS//2,0], 'offscreen': ENDLESS_OFFSCREEN,
+            'lanes': EndlessLanes(seed,jsonhitbox)}
+
+
+class EndlessLanes(object):
+    """
+    A class representing the (never ending) lanes of an endless level, bottom to top.
+
+    Row r of the level is lanes[r], a lane dict in the format of a level file. The rows
+    come in stretches of ENDLESS_CHUNK rows. Every stretch starts with grass, which
+    may be followed by a hedge with openings, and the rest is mostly roads or mostly
+    rivers. Each stretch is made by its own random generator, seeded with the level seed
+    and the number of the stretch. So a row is the same lane whenever (and however
+    often) it is asked for, and only the last stretch asked for needs to be kept.
+
+    The lanes get faster as the rows go up, until they are twice as fast at row
+    ENDLESS_RAMP. The length of this list is ENDLESS_ROWS, the number of lanes that a
+    level has at a time.
+    """
+    # Attribute _seed: The seed of the level
+    # Invariant: _seed is an int
+
+    # Attribute _hitbox: The JSON of the objects and their hitboxes
+    # Invariant: _hitbox is a JSON dict
+
+    # Attribute _chunk: The number of the stretch in _rows
+    # Invariant: _chunk is an int >= 0, or None if no stretch was made yet
+
+    # Attribute _rows: The lanes of stretch _chunk, bottom to top
+    # Invariant: _rows is a list of ENDLESS_CHUNK lane dicts
+
+    def __init__(self,seed,jsonhitbox):
+        '''
+        Initializes the lanes of the endless level with the given seed
+
+        Parameter seed: The seed of the level
+        Precondition: seed is an int
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        '''
+        self._seed = seed
+        self._hitbox = jsonhitbox
+        self._chunk = None
+        self._rows = []
+
+    def __len__(self):
+        '''Returns the number of lanes a level has at a time (ENDLESS_ROWS)'''
+        return ENDLESS_ROWS
+
+    def __getitem__(self,row):
+        '''
+        Returns the lane dict of the given row
+
+        Parameter row: The row number
+        Precondition: row is an int >= 0
+        '''
+        assert type(row) == int and row >= 0, '%s is not a row' % repr(row)
+        chunk = row // ENDLESS_CHUNK
+        if chunk != self._chunk:
+            self._rows = self._make(chunk)
+            self._chunk = chunk
+        return self._rows[row % ENDLESS_CHUNK]
+
+    def _make(self,chunk):
+        '''
+        Returns the lane dicts of the given stretch, bottom to top
+
+        Parameter chunk: The number of the stretch
+        Precondition: chunk is an int >= 0
+        '''
+        rng = random.Random('%d/%d' % (self._seed,chunk))
+        rows = [{'type': 'grass'}]
+        if chunk > 0 and rng.random() < ENDLESS_HEDGES:
+            rows.append(self._hedge(rng))
+        kind = rng.choice(('road','water'))
+        while len(rows) < ENDLESS_CHUNK:
+            row = chunk*ENDLESS_CHUNK+len(rows)
+            r = rng.random()
+            if r < 0.1:
+                rows.append({'type': 'grass'})
+            elif (r < 0.8) == (kind == 'road'):
+                rows.append(self._lane(rng,row,'road',ENDLESS_CARS,ENDLESS_CAR_GAPS))
+            else:
+                rows.append(self._lane(rng,row,'water',ENDLESS_LOGS,ENDLESS_LOG_GAPS))
+        return rows
+
+    def _lane(self,rng,row,type,objects,gaps):
+        '''
+        Returns a new moving lane dict, with obstacles all around its wrap length
+
+        The obstacles are put one after the other from a random start, with a random
+        gap between them (including the gap between the last and the first).
+
+        Parameter rng: The random generator of the stretch
+        Precondition: rng is a random.Random
+
+        Parameter row: The row of the lane
+        Precondition: row is an int >= 0
+
+        Parameter type: The lane type
+        Precondition: type is 'road' or 'water'
+
+        Parameter objects: The obstacle types to choose from
+        Precondition: objects is a non-empty tuple of keys in objects.json
+
+        Parameter gaps: The smallest and largest gap (in grid squares)
+        Precondition: gaps is a pair of ints with 0 < gaps[0] <= gaps[1]
+        '''
+        (low,high) = ENDLESS_SPEEDS
+        speed = rng.uniform(low,high)*(1+min(row,ENDLESS_RAMP)/ENDLESS_RAMP)
+        speed = round(speed)*rng.choice((-1,1))
+
+        period = (ENDLESS_COLUMNS+2*ENDLESS_OFFSCREEN)*GRID_SIZE
+        start = -ENDLESS_OFFSCREEN*GRID_SIZE+rng.randrange(gaps[1]+1)*GRID_SIZE
+        left = start
+        result = []
+        while True:
+            obj = rng.choice(objects)
+            width = self._hitbox['images'][obj]['size'][0]
+            if result and left+width+gaps[0]*GRID_SIZE > start+period:
+                break
+            center = left+width/2
+            result.append({'type': obj, 'position': (center-GRID_SIZE/2)/GRID_SIZE})
+            left += width+rng.randint(gaps[0],gaps[1])*GRID_SIZE
+        return {'type': type, 'speed': speed, 'objects': result}
+
+    def _hedge(self,rng):
+        '''
+        Returns a new hedge lane dict with one to three openings (and no exits)
+
+        Parameter rng: The random generator of the stretch
+        Precondition: rng is a random.Random
+        '''
+        columns = rng.sample(range(ENDLESS_COLUMNS),rng.randint(1,3))
+        return {'type': 'hedge',
+                'objects': [{'type': 'open', 'position': col} for col in sorted(columns)]}
+
+
+class SimEndless(SimLevel):
+    """
+    A class representing the endless level as plain numbers.
+
+    The level only has ENDLESS_ROWS lanes at a time, the rows getBottom() and up. The
+    frog and the lanes are at their true rows, so the y-coordinates keep growing. When
+    the frog reaches a new row, the window of lanes moves up to keep ENDLESS_BEHIND+1
+    rows below it: the lanes that fall off the bottom are made into the new lanes at the
+    top (see SimLane.reload). The frog cannot go down into the lowest row, which is
+    only there for the camera.
+
+    The generated hedges have no exits, so the game only ends when the lives are gone.
+    A new frog starts on the highest grass at or below the farthest row reached.
+    """
+    # Attribute _bottom: The row of the lowest lane
+    # Invariant: _bottom is an int >= 0, and _lanes[i].getRow() == _bottom+i
+
+    # Attribute _reached: The farthest row the frog has reached (the score)
+    # Invariant: _reached is an int >= 0
+
+    def getBottom(self):
+        '''Returns the row of the lowest lane of the level'''
+        return self._bottom
+
+    def getReached(self):
+        '''Returns the farthest row that the frog has reached'''
+        return self._reached
+
+    def __init__(self,jsondictlvl,jsonhitbox):
+        """
+        Initializes the endless level of the given level JSON and hitbox JSON
+
+        Parameter jsondictlvl: The JSON for level
+        Precondition: jsondictlvl is a dict returned by endlessLevel
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        """
+        super().__init__(jsondictlvl,jsonhitbox)
+        for (lane,offset) in self._slots:       # The hedges have no exits to keep
+            self._size -= len(lane.getTypes())
+        self._slots = []
+        self._bottom = 0
+        self._reached = int(self._frog.y//GRID_SIZE)
+        self._height = len(self._lanes)*GRID_SIZE
+
+    def update(self,input,dt):
+        """
+        Moves the frog and the obstacles forward one animation frame.
+
+        If the frog reaches a new row, the lanes scroll up after the update. This
+        returns the same values as SimLevel.update.
+
+        Parameter input: The user input
+        Precondition: input has a method is_key_down (e.g. GInput or SimInput)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        """
+        result = super().update(input,dt)
+        if not self._frog is None:
+            row = int(self._frog.y//GRID_SIZE)
+            if row > self._reached:
+                self._reached = row
+                self._scroll(max(self._bottom,row-ENDLESS_BEHIND-1))
+        return result
+
+    def reconstructFrog(self):
+        '''Puts a new frog on the highest grass at or below the farthest row reached'''
+        super().reconstructFrog()
+        top = min(self._reached,self._bottom+len(self._lanes)-1)
+        for row in range(top,self._bottom,-1):
+            if self._lanes[row-self._bottom].getType() == 'grass':
+                self._frog.y = float(row*GRID_SIZE+GRID_SIZE/2)
+                return
+
+    def snapshot(self):
+        '''
+        Returns the whole state of the level as a flat NumPy array of floats
+
+        This is the snapshot of SimLevel, followed by the lowest row and the farthest
+        row reached.
+        '''
+        return np.append(super().snapshot(),(self._bottom,self._reached))
+
+    def restore(self,data):
+        '''
+        Puts the level back in the state of a snapshot
+
+        If the lanes scrolled since the snapshot, the lanes of the snapshot are made
+        again (the same lanes, as the rows are always the same).
+
+        Parameter data: The state of the level
+        Precondition: data is a value returned by snapshot for this level
+        '''
+        self._scroll(int(data[-2]))
+        self._reached = int(data[-1])
+        super().restore(data)
+
+    def _scroll(self,bottom):
+        '''
+        Moves the window of lanes so that its lowest row is bottom
+
+        The lanes that are still in the window keep their state. The others are made
+        into the lanes of the new rows.
+
+        Parameter bottom: The new lowest row
+        Precondition: bottom is an int >= 0
+        '''
+        if bottom == self._bottom:
+            return
+        shift = (bottom-self._bottom) % len(self._lanes)
+        self._lanes = self._lanes[shift:]+self._lanes[:shift]
+        self._bottom = bottom
+        self._bytype = {}
+        for (pos,lane) in enumerate(self._lanes):
+            if lane.getRow() != bottom+pos:
+                lane.reload(self._level,bottom+pos,self._hitbox)
+            self._bytype.setdefault(lane.getType(),[]).append(lane)
+        self._height = (bottom+len(self._lanes))*GRID_SIZE
+
+    def _rows(self,box):
+        '''
+        Returns the range of positions in getLanes() whose lanes the box might touch
+
+        Parameter box: The bounding box (l,t,r,b) of an object (usually the frog)
+        Precondition: box is a 4-element tuple of floats
+        '''
+        low  = min(box[1],box[3])
+        high = max(box[1],box[3])
+        first = max(self._bottom,math.ceil(low/GRID_SIZE)-1)
+        last  = min(self._bottom+len(self._lanes),math.floor(high/GRID_SIZE)+1)
+        return range(first-self._bottom,max(first,last)-self._bottom)
+
+    def _moveDown(self):
+        '''
+        Moves the frog downward, unless it would go into the lowest row.
+        '''
+        if self._frog.y-GRID_SIZE < (self._bottom+1)*GRID_SIZE:
+            self._frog.angle = FROG_SOUTH
+            return
+        return super()._moveDown()
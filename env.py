@@ -0,0 +1,535 @@
+"""
+Training environment module for frogger
+
+This module plays many copies of a level at once for reinforcement learning, in the
+style of a vectorized gym environment. Each call to step takes one action per game
+(see ENV_ACTIONS) and returns NumPy arrays of observations, rewards and done flags.
+
+Every game is a SimLevel, so it follows exactly the rules of the game. However, the
+games share one array of lane clocks. Most of an update is moving the lanes, and
+that is done for all of the games at once, with a single NumPy operation. A game only
+moves the lanes that the frog can touch (the rows of its bounding box) to their real
+time, when it needs them to check a collision.
+
+The observations are also computed for all of the games at once. Each one is a grid
+with one cell per lane and grid column. It has two channels:
+
+    0: the cells covered by an obstacle hitbox (cars, logs, and exits or openings
+       that are not taken)
+    1: the cell with the center of the frog
+
+The grids have row 0 at the bottom, like the level.
+
+The environment can be timed from the command line:
+
+    python env.py JSON/easy2.json JSON/complete.json
+"""
+from consts import *
+from simulation import *
+import numpy as np
+
+# PRIMARY RULE: Like simulation.py, this module may only access consts.py and
+# simulation.py. It must never import game2d (or anything else that needs Kivy).
+
+# The actions of the environment, by number (None waits a frame)
+ENV_ACTIONS = (None,'up','down','left','right')
+
+# The reward for each result of SimLevel.update
+ENV_REWARDS = {'in exit': 1.0, 'more lives left': -1.0, 'no lives left': -1.0}
+
+# The default time step of the environment (in seconds), the fixed step of the game
+ENV_DT = 1/TICK_RATE
+
+# The number of games played at once by main
+ENV_GAMES = 64
+
+
+class FroggerVecEnv(object):
+    """
+    A class that plays many copies of a level in lockstep.
+
+    The games are reset when they are done: when the last life is lost, when every
+    exit is taken, or after limit steps. The observation returned by that step is the
+    first one of the new game. As in the game, the frog is put back at the start in
+    the step after it reaches an exit or loses a life.
+    """
+    # Attribute _levels: The games
+    # Invariant: _levels is a list of _VecLevel, all of the same level file
+
+    # Attribute _clock: The lane times of every game
+    # Invariant: _clock is a float64 NumPy array of shape (count,lanes), where
+    # _clock[k] is the _clock of _levels[k] (it may be a view of shared memory)
+
+    # Attribute _start: The snapshot of a new game
+    # Invariant: _start is a NumPy array (see SimLevel.snapshot)
+
+    # Attribute _inputs: The input for each action
+    # Invariant: _inputs is a list of SimInput, parallel to ENV_ACTIONS
+
+    # Attribute _dt: The time step of every update
+    # Invariant: _dt is a float > 0
+
+    # Attribute _limit: The most steps in a game
+    # Invariant: _limit is an int > 0, or None if games have no limit
+
+    # Attribute _ticks: The number of steps of each game since it was reset
+    # Invariant: _ticks is an int NumPy array of length count
+
+    # Attribute _results: The result of the last update of each game
+    # Invariant: _results is a list of None or the strings of ENV_REWARDS
+
+    # Attribute _rowof: The row of each obstacle (the obstacles of all lanes, in order)
+    # Invariant: _rowof is an int NumPy array of length M
+
+    # Attribute _speeds: The speed of each obstacle
+    # Invariant: _speeds is a float64 NumPy array of length M (0 if it does not move)
+
+    # Attribute _periods: The wrap length of the lane of each obstacle
+    # Invariant: _periods is a float64 NumPy array of length M (inf if it does not move)
+
+    # Attribute _highs: The right wraparound edge of the lane of each obstacle
+    # Invariant: _highs is a float64 NumPy array of length M (inf if it does not move)
+
+    # Attribute _base: The obstacle centers at phase 0
+    # Invariant: _base is a float64 NumPy array of length M
+
+    # Attribute _lefts: The offset from each obstacle center to its hitbox left edge
+    # Invariant: _lefts is a float64 NumPy array of length M
+
+    # Attribute _rights: The offset from each obstacle center to its hitbox right edge
+    # Invariant: _rights is a float64 NumPy array of length M
+
+    # Attribute _starts: Where the obstacles of each lane with obstacles begin
+    # Invariant: _starts is an int NumPy array, increasing, with _starts[0] == 0
+
+    # Attribute _rows: The row of each lane with obstacles
+    # Invariant: _rows is an int NumPy array, parallel to _starts
+
+    # Attribute _exits: Where the exits of each hedge are among the obstacles
+    # Invariant: _exits is a list of pairs (row,offset) for the hedge lanes
+
+    # Attribute _live: Whether each obstacle is shown in the observation of each game
+    # Invariant: _live is a bool NumPy array of shape (count,M); it is False only for
+    # the taken exits
+
+    # Attribute _edges: The left edge of each grid column, and the right edge
+    # Invariant: _edges is a pair of float64 NumPy arrays of length columns
+
+    def getCount(self):
+        '''Returns the number of games'''
+        return len(self._levels)
+
+    def getShape(self):
+        '''Returns the shape (count,channels,rows,columns) of the observations'''
+        level = self._levels[0]
+        return (len(self._levels),2,len(level.getLanes()),level.getWidth()//GRID_SIZE)
+
+    def getTicks(self):
+        '''Returns a copy of the number of steps of each game since it was reset'''
+        return self._ticks.copy()
+
+    def getResults(self):
+        '''Returns the result of the last update of each game (see SimLevel.update)'''
+        return list(self._results)
+
+    def getLives(self):
+        '''Returns the number of lives left in each game, as a NumPy array'''
+        return np.array([level.getLives() for level in self._levels],dtype=int)
+
+    def getExitsLeft(self):
+        '''Returns the number of exits not yet taken in each game, as a NumPy array'''
+        return np.array([level.getExitsLeft() for level in self._levels],dtype=int)
+
+    def getObstacles(self):
+        '''
+        Returns a table of the obstacles in the observations, one row per obstacle
+
+        The obstacles are those of every lane, bottom to top, each lane in the order of
+        its pattern (see SimLane.getPattern). The table is a float64 NumPy array with
+        the columns: the row of the lane, the center at lane time 0, the offsets from
+        the center to the hitbox left and right edges, the speed of the lane (0 if it
+        does not move), its wrap length and its right wraparound edge (inf if it does
+        not move). The table is a copy.
+        '''
+        return np.stack([self._rowof,self._base,self._lefts,self._rights,
+                         self._speeds,self._periods,self._highs],axis=1)
+
+    def getLevel(self,k):
+        '''
+        Returns the model of the game k, with every lane moved to its real time
+
+        Parameter k: The game number
+        Precondition: k is an int in 0..getCount()-1
+        '''
+        level = self._levels[k]
+        level.sync()
+        return level
+
+    def __init__(self,jsondictlvl,jsonhitbox,count,dt=ENV_DT,limit=None,clock=None):
+        '''
+        Initializes count new games of the given level
+
+        The lane times are kept in clock, if it is given, so that they can be shared
+        with other processes (see shared.py).
+
+        Parameter jsondictlvl: The JSON for level
+        Precondition: jsondictlvl is a JSON file
+
+        Parameter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+
+        Parameter count: The number of games
+        Precondition: count is an int > 0
+
+        Parameter dt: The time step of every update
+        Precondition: dt is a float > 0
+
+        Parameter limit: The most steps in a game (None for no limit)
+        Precondition: limit is an int > 0 or None
+
+        Parameter clock: The array to keep the lane times in (None for a new one)
+        Precondition: clock is None or a float64 NumPy array of shape (count,lanes)
+        '''
+        assert type(count) == int and count > 0, '%s is not a valid count' % repr(count)
+        assert limit is None or (type(limit) == int and limit > 0), '%s is not a valid limit' % repr(limit)
+        self._levels = [_VecLevel(jsondictlvl,jsonhitbox) for k in range(count)]
+        lanes = self._levels[0].getLanes()
+        if clock is None:
+            clock = np.zeros((count,len(lanes)),dtype=np.float64)
+        assert clock.shape == (count,len(lanes)), '%s is not a clock for %d games' % (repr(clock),count)
+        self._clock = clock
+        for k in range(count):
+            self._levels[k].setClock(self._clock[k])
+        self._start = self._levels[0].snapshot()
+        self._inputs = [SimInput([] if key is None else [key]) for key in ENV_ACTIONS]
+        self._dt = float(dt)
+        self._limit = limit
+        self._ticks = np.zeros(count,dtype=int)
+        self._results = [None]*count
+        self._table(lanes)
+
+    def reset(self):
+        '''
+        Starts every game again, and returns the observations
+        '''
+        for k in range(len(self._levels)):
+            self._reset(k)
+        return self._observe()
+
+    def step(self,actions):
+        '''
+        Updates every game once, and returns a tuple (observations,rewards,dones)
+
+        The rewards (float64) and the done flags (bool) are NumPy arrays with one value
+        per game. A game that is done has been reset already (see the class).
+
+        Parameter actions: The action of each game (an index into ENV_ACTIONS)
+        Precondition: actions is a sequence of getCount() ints
+        '''
+        count = len(self._levels)
+        actions = np.asarray(actions)
+        assert actions.shape == (count,), '%s does not have %d actions' % (repr(actions),count)
+        rewards = np.zeros(count,dtype=np.float64)
+        dones = np.zeros(count,dtype=bool)
+        moved = np.zeros(count,dtype=int)
+        for k in range(count):
+            level = self._levels[k]
+            if level.getFrog() is None:
+                level.reconstructFrog()
+            result = level.update(self._inputs[actions[k]],self._dt)
+            moved[k] = level.getMoved()
+            self._results[k] = result
+            if not result is None:
+                rewards[k] = ENV_REWARDS[result]
+                if result == 'in exit':
+                    self._take(k)
+                dones[k] = result == 'no lives left' or level.getExitsLeft() == 0
+
+        # Move the lanes of every game at once (not the lanes above a drowning)
+        rows = np.arange(self._clock.shape[1])
+        np.add(self._clock,self._dt,out=self._clock,where=rows < moved[:,None])
+        self._ticks += 1
+        if not self._limit is None:
+            dones |= self._ticks >= self._limit
+        for k in np.flatnonzero(dones):
+            self._reset(k)
+        return (self._observe(),rewards,dones)
+
+    def positions(self,out=None):
+        '''
+        Returns the obstacle centers of every game, as an array of shape (count,M)
+
+        The obstacles are in the order of getObstacles. The centers are those of
+        SimLane.positionsAt for the lane time of each game, computed all at once.
+
+        Parameter out: The array to put the centers in (None for a new one)
+        Precondition: out is None or a float64 NumPy array of shape (count,M)
+        '''
+        times = self._clock[:,self._rowof]
+        phase = np.remainder(self._speeds*times,self._periods)
+        phase[phase >= self._periods] = 0.0
+        xs = np.add(self._base,phase,out=out)
+        xs -= np.where(xs >= self._highs,self._periods,0.0)
+        return xs
+
+    def frogs(self,out=None):
+        '''
+        Returns the frog of every game, as an array of shape (count,3)
+
+        Each row is the position (x,y) and the heading of the frog, or NaN if the game
+        has no frog (it is put back at the start in the next step).
+
+        Parameter out: The array to put the frogs in (None for a new one)
+        Precondition: out is None or a float64 NumPy array of shape (count,3)
+        '''
+        if out is None:
+            out = np.empty((len(self._levels),3),dtype=np.float64)
+        for (k,level) in enumerate(self._levels):
+            frog = level.getFrog()
+            out[k] = (np.nan,np.nan,np.nan) if frog is None else (frog.x,frog.y,frog.angle)
+        return out
+
+    # HIDDEN METHODS
+    def _table(self,lanes):
+        '''
+        Builds the tables of every obstacle that the observations are computed from
+
+        Parameter lanes: The lanes of a new game
+        Precondition: lanes is a list of SimLane, all at time 0
+        '''
+        (rowof,speeds,periods,highs,base,lefts,rights) = ([],[],[],[],[],[],[])
+        (starts,rows) = ([],[])
+        self._exits = []
+        for lane in lanes:
+            xs = lane.getPattern()
+            if len(xs) == 0:
+                continue
+            if lane.getType() == 'hedge':
+                self._exits.append((lane.getRow(),len(base)))
+            starts.append(len(base))
+            rows.append(lane.getRow())
+            # At time 0 the obstacles are at the pattern, so bounds gives the offsets
+            (l,t,r,b) = lane.bounds()
+            moving = not lane.getSpeed() is None
+            for i in range(len(xs)):
+                rowof.append(lane.getRow())
+                speeds.append(lane.getSpeed() if moving else 0.0)
+                periods.append(lane.getPeriod())
+                highs.append(lane.getWrap()[1])
+                base.append(xs[i])
+                lefts.append(l[i]-xs[i])
+                rights.append(r[i]-xs[i])
+        self._rowof = np.array(rowof,dtype=int)
+        self._speeds = np.array(speeds,dtype=np.float64)
+        self._periods = np.array(periods,dtype=np.float64)
+        self._highs = np.array(highs,dtype=np.float64)
+        self._base = np.array(base,dtype=np.float64)
+        self._lefts = np.array(lefts,dtype=np.float64)
+        self._rights = np.array(rights,dtype=np.float64)
+        self._starts = np.array(starts,dtype=int)
+        self._rows = np.array(rows,dtype=int)
+        self._live = np.ones((len(self._levels),len(base)),dtype=bool)
+        columns = np.arange(self._levels[0].getWidth()//GRID_SIZE,dtype=np.float64)
+        self._edges = (columns*GRID_SIZE,(columns+1)*GRID_SIZE)
+
+    def _reset(self,k):
+        '''
+        Starts the game k again
+
+        Parameter k: The game number
+        Precondition: k is an int in 0..getCount()-1
+        '''
+        level = self._levels[k]
+        level.restore(self._start)
+        self._live[k] = True
+        self._ticks[k] = 0
+
+    def _take(self,k):
+        '''
+        Hides the exits taken in the game k from its observations
+
+        Parameter k: The game number
+        Precondition: k is an int in 0..getCount()-1
+        '''
+        lanes = self._levels[k].getLanes()
+        for (row,offset) in self._exits:
+            for i in lanes[row].getOccupied():
+                self._live[k,offset+i] = False
+
+    def _observe(self):
+        '''
+        Returns the observations of every game (see the module)
+        '''
+        (count,channels,height,width) = self.getShape()
+        result = np.zeros((count,channels,height,width),dtype=np.uint8)
+
+        if len(self._base) > 0:
+            xs = self.positions()
+            left  = (xs+self._lefts)[:,:,None]
+            right = (xs+self._rights)[:,:,None]
+            cover = (left < self._edges[1]) & (right > self._edges[0]) & self._live[:,:,None]
+            result[:,0,self._rows,:] = np.logical_or.reduceat(cover,self._starts,axis=1)
+
+        for k in range(count):
+            frog = self._levels[k].getFrog()
+            if not frog is None:
+                row = min(max(int(frog.y//GRID_SIZE),0),height-1)
+                col = min(max(int(frog.x//GRID_SIZE),0),width-1)
+                result[k,1,row,col] = 1
+        return result
+
+
+class _VecLevel(SimLevel):
+    """
+    A class representing a level whose lane times are kept in a shared array.
+
+    The lanes of this level are not moved by update. Instead, the level keeps the
+    number of lanes that the update moved (see getMoved), and the owner of the array
+    adds dt to those lane times afterwards. The lanes that the frog touches are moved
+    to their time when they are looked at, so update plays exactly as in SimLevel.
+    The other lanes may be behind until sync is called.
+    """
+    # Attribute _clock: The lane times of this level, bottom to top
+    # Invariant: _clock is a float64 NumPy array with one value per lane
+
+    # Attribute _moving: The time step of the update in progress
+    # Invariant: _moving is a float
+
+    # Attribute _moved: The number of lanes (from the bottom) moved by the last update
+    # Invariant: _moved is an int in 0..len(getLanes())
+
+    def getMoved(self):
+        '''Returns the number of lanes (from the bottom) moved by the last update'''
+        return self._moved
+
+    def setClock(self,clock):
+        '''
+        Keeps the lane times of this level in clock from now on
+
+        Parameter clock: The lane times, bottom to top
+        Precondition: clock is a float64 NumPy array with one value per lane
+        '''
+        self._clock = clock
+        self._clock[:] = [lane.getTime() for lane in self.getLanes()]
+
+    def __init__(self,jsondictlvl,jsonhitbox):
+        """
+        Initializes a level with given level JSON and hitbox JSON
+
+        Parameter jsondictlvl: The JSON for level
+        Precondition: jsondictlvl is a JSON file
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        """
+        SimLevel.__init__(self,jsondictlvl,jsonhitbox)
+        self._clock = np.zeros(len(self.getLanes()),dtype=np.float64)
+        self._moving = 0.0
+        self._moved = 0
+
+    def update(self,input,dt):
+        """
+        Moves the frog forward one animation frame, and returns the result
+
+        The lanes are moved by the owner of the clock (see the class).
+
+        Parameter input: The user input
+        Precondition: input has a method is_key_down (e.g. GInput or SimInput)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        """
+        self._moving = dt
+        self._moved = 0
+        return SimLevel.update(self,input,dt)
+
+    def sync(self):
+        '''Moves every lane to its time in the clock'''
+        for (lane,time) in zip(self.getLanes(),self._clock.tolist()):
+            if lane.getTime() != time:
+                lane.setTime(time)
+
+    def restore(self,data):
+        '''
+        Puts the level back in the state of a snapshot (see SimLevel.restore)
+
+        Parameter data: The state of the level
+        Precondition: data is a value returned by snapshot for this level
+        '''
+        SimLevel.restore(self,data)
+        self._clock[:] = [lane.getTime() for lane in self.getLanes()]
+
+    def _step(self,dt,first,last):
+        '''
+        Marks the lanes up to last as moved, and moves the ones the frog touches
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+
+        Parameter first: The first lane to move
+        Precondition: first is an int >= 0
+
+        Parameter last: One past the last lane to move
+        Precondition: last is an int <= len(getLanes())
+        '''
+        self._moved = last
+        if not self._frog is None:
+            self._rows(self._frog.bbox())
+
+    def _rows(self,box):
+        '''
+        Returns the range of rows whose lanes the box might touch, moving those lanes
+
+        A lane is moved to its time in the clock, plus the time step if the update in
+        progress has moved it already.
+
+        Parameter box: The bounding box (l,t,r,b) of an object (usually the frog)
+        Precondition: box is a 4-element tuple of floats
+        '''
+        rows = SimLevel._rows(self,box)
+        lanes = self.getLanes()
+        for pos in rows:
+            time = float(self._clock[pos])
+            if pos < self._moved:
+                time += self._moving
+            if lanes[pos].getTime() != time:
+                lanes[pos].setTime(time)
+        return rows
+
+
+def main(names):
+    '''
+    Plays ENV_GAMES games of each level file in names with random actions for a few
+    seconds, and prints the steps per second
+
+    The objects file is OBJECT_DATA in the same folder as each level.
+
+    Parameter names: The paths to the level files
+    Precondition: names is a list of strings
+    '''
+    import json
+    import os
+    import time
+    for name in names:
+        with open(name) as file:
+            jsondict = json.load(file)
+        with open(os.path.join(os.path.dirname(name),OBJECT_DATA)) as file:
+            jsonhitbox = json.load(file)
+        env = FroggerVecEnv(jsondict,jsonhitbox,ENV_GAMES)
+        env.reset()
+        random = np.random.default_rng(0)
+        (steps,exits,deaths) = (0,0,0)
+        start = time.perf_counter()
+        while time.perf_counter()-start < 2:
+            (obs,rewards,dones) = env.step(random.integers(0,len(ENV_ACTIONS),ENV_GAMES))
+            exits += int((rewards > 0).sum())
+            deaths += int((rewards < 0).sum())
+            steps += ENV_GAMES
+        elapsed = time.perf_counter()-start
+        print('%s: %.0f steps/s (%.1f million per hour), %d exits, %d deaths' %
+              (name,steps/elapsed,steps/elapsed*3600/1e6,exits,deaths))
+
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv[1:])
@@ -7,10 +7,13 @@ simpler for students in CS 1110.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
+from .gobject import GObject, GScene, collide_matrix, batch
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
 from .gsprite import GSprite
 from .gtile import GTile
+from .gbatch import GBatch
+from .gcamera import GCamera
+from .gpool import GPool
 from .gpath import GPath, GTriangle, GPolygon
 from .gview import GInput, GView
 from .app import GameApp
@@ -25,6 +25,9 @@ import sys
 # Pull off the band aid
 import numpy
 
+# The most time (in seconds) that a fixed-step game catches up on in one frame
+TICK_LIMIT = 0.25
+
 
 class GameApp(kivy.app.App):
     """
@@ -44,9 +47,18 @@ class GameApp(kivy.app.App):
 
     :meth:`draw`: This method draws all of the objects to the screen.  The only
     thing you should have in this method are calls to ``self.view.draw()``.
+
+    By default, :meth:`update` is called once a frame with the time since the last frame.
+    If the game has a :attr:`tickrate`, then :meth:`update` is instead called with a
+    fixed time step, as many times as the time since the last frame allows (which may be
+    zero times for a fast display).  The time left over is :attr:`alpha`, which
+    :meth:`draw` can use to draw the objects between the last two steps.  The same
+    inputs then always give the same game, whatever the frame rate.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
+    # Class attribute for the atlas of the Images folder (None if there is no atlas)
+    TEXTURE_ATLAS = None
 
 
     # MUTABLE ATTRIBUTES
@@ -71,6 +83,26 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
 
+    @property
+    def tickrate(self):
+        """
+        The number of fixed steps per second, or None to update once per frame
+
+        With a tick rate, every call to :meth:`update` gets ``1.0/tickrate`` seconds.
+        The tick rate does not have to match the frame rate; a game can step at 30 Hz
+        and draw at 60 Hz or more.
+
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._tickrate
+
+    @tickrate.setter
+    def tickrate(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._tickrate = value
+        self._accum = 0.0
+
     @property
     def width(self):
         """
@@ -105,6 +137,22 @@ class GameApp(kivy.app.App):
 
 
     # IMMUTABLE PROPERTIES
+    @property
+    def alpha(self):
+        """
+        How far the game is from the last fixed step to the next, when drawing
+
+        This is the time left over after the last call to :meth:`update`, as a fraction
+        of a step.  To draw smoothly, :meth:`draw` can put an object at ``alpha`` of the
+        way from where it was before the last step to where it is now.  It is always 1
+        if there is no :attr:`tickrate`.
+
+        **Invariant**: Must be a float in [0,1].
+        """
+        if self._tickrate is None:
+            return 1.0
+        return min(1.0,self._accum*self._tickrate)
+
     @property
     def view(self):
         """
@@ -213,6 +261,9 @@ class GameApp(kivy.app.App):
         has already been loaded, it will return the cached texture.  Otherwise, it will
         load the texture and cache it before returning it.
 
+        If the image is in the texture atlas (see :meth:`load_atlas`), the texture is a
+        region of an atlas page.  Regions act like any other texture when drawn.
+
         :param name: The file name
         :type name:  ``str``
         """
@@ -221,6 +272,10 @@ class GameApp(kivy.app.App):
             return None
         elif name in cls.TEXTURE_CACHE:
             return cls.TEXTURE_CACHE[name]
+        elif not cls.TEXTURE_ATLAS is None and name in cls.TEXTURE_ATLAS.textures:
+            texture = cls.TEXTURE_ATLAS[name]
+            cls.TEXTURE_CACHE[name] = texture
+            return texture
 
         try:
             from kivy.core.image import Image
@@ -235,6 +290,23 @@ class GameApp(kivy.app.App):
 
         return texture
 
+    @classmethod
+    def load_atlas(cls):
+        """
+        Returns: The texture atlas for the **Images** folder, or None if it cannot be built
+
+        The atlas packs every PNG file in the **Images** folder into one (or a few) large
+        textures.  Once it is loaded, :meth:`load_texture` returns regions of the atlas,
+        so that the images drawn each frame share a texture.  The atlas is cached on disk
+        in the folder **Images/.atlas**, and is only packed again when an image changes.
+
+        The game loads the atlas before calling :meth:`start`, unless it was created with
+        the keyword argument ``atlas=False``.
+        """
+        from .gatlas import load_atlas
+        GameApp.TEXTURE_ATLAS = load_atlas(cls.images)
+        return GameApp.TEXTURE_ATLAS
+
     @classmethod
     def unload_texture(cls,name):
         """
@@ -309,17 +381,24 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        a = keywords.pop('atlas', True)
+        t = keywords.pop('tickrate', None)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert t is None or type(t) in [int,float], 'tickrate %s is not a number' % repr(t)
+        assert t is None or t > 0, 'tickrate %s is not positive' % repr(t)
 
         self._gwidth = w
         self._gheight = h
         Window.size = (self.width,self.height)
 
         self._fps = f
+        self._atlas = bool(a)
+        self._tickrate = t
+        self._accum = 0.0
 
         x = keywords.pop('left', None)
         y = keywords.pop('top', None)
@@ -418,6 +497,9 @@ class GameApp(kivy.app.App):
 
         Every single object that you draw will need to be an attribute of the ``GameApp``
         class.  This method should largely be a sequence of calls to ``self.view.draw()``.
+
+        If the view is in retained mode (see :attr:`GView.retained`), the objects were
+        already added to the view, and this method should only move them.
         """
         pass
 
@@ -434,6 +516,8 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
+        if self._atlas:
+            self.load_atlas()
         self.start()
 
     def _refresh(self,dt):
@@ -443,13 +527,30 @@ class GameApp(kivy.app.App):
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
 
+        With a :attr:`tickrate`, the time is added to an accumulator and :meth:`update`
+        is called once for every whole step in it.  The input is refreshed after each
+        step, so a key press is seen by exactly one step.
+
+        In retained mode, the view is not cleared, and the objects that changed are drawn
+        again after :meth:`draw`.
+
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
-        self.view.clear()
-        self.update(dt)
+        if not self.view.retained:
+            self.view.clear()
+        if self._tickrate is None:
+            self.update(dt)
+            self.input.refresh()
+        else:
+            step = 1.0/self._tickrate
+            self._accum = min(self._accum+dt,TICK_LIMIT)
+            while self._accum >= step:
+                self._accum -= step
+                self.update(step)
+                self.input.refresh()
         self.draw()
-        self.input.refresh()
+        self.view._flush()
 
     def _setpaths(self):
         """
@@ -0,0 +1,218 @@
+"""
+A texture atlas for the images of a game.
+
+Every image object draws with the texture of its source file.  When each image has its
+own texture, every car, log and frog on the screen binds a new texture.  This module
+packs all of the PNG files in the **Images** folder into one (or a few) large textures,
+and gives each file a region of that texture.  Objects that share an atlas page draw
+without switching textures.
+
+The atlas is written in the Kivy ``.atlas`` format (a JSON table of regions plus one PNG
+per page) to a hidden folder ``.atlas`` inside the **Images** folder.  The name of the
+atlas is a hash of the source files, so it is only packed again when an image changes.
+"""
+from kivy.logger import Logger
+import os
+import json
+import hashlib
+
+# The version of the packing code (change this to invalidate old atlases)
+ATLAS_VERSION = 1
+
+# The largest size (in pixels) of an atlas page
+ATLAS_SIZE = 2048
+
+
+def load_atlas(folder,size=ATLAS_SIZE):
+    """
+    Returns the texture atlas for the PNG files in ``folder``, or None if there is none
+
+    If the atlas for the current contents of ``folder`` is already cached on disk, this
+    function loads it.  Otherwise, it packs the images and writes the atlas before
+    loading it.  The regions of the atlas are named by file name, so ``'car1.png'`` is
+    the region for **Images/car1.png**.
+
+    If the folder has no PNG files, or the atlas cannot be written, this function returns
+    None and the images should be loaded separately.
+
+    :param folder: The path to the image folder
+    :type folder:  ``str``
+
+    :param size: The largest width and height of a page
+    :type size:  ``int`` > 0
+    """
+    from kivy.atlas import Atlas
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith('.png'))
+    if not names:
+        return None
+
+    cache = os.path.join(folder,'.atlas')
+    stem = 'images-'+_digest(folder,names,size)
+    path = os.path.join(cache,stem+'.atlas')
+    if not os.path.exists(path):
+        try:
+            _write(folder,names,size,cache,stem)
+        except Exception as e:
+            Logger.info('GameApp: Could not build the texture atlas (%s).' % e)
+            return None
+    return Atlas(path)
+
+
+# HIDDEN FUNCTIONS
+def _digest(folder,names,size):
+    """
+    Returns the hash of the files ``names`` in ``folder``, as a hex string
+
+    The hash also includes the page size and the version of the packer.
+
+    :param folder: The path to the image folder
+    :type folder:  ``str``
+
+    :param names: The file names to hash
+    :type names:  ``list`` of ``str``
+
+    :param size: The largest width and height of a page
+    :type size:  ``int`` > 0
+    """
+    hasher = hashlib.sha1(('%d:%d' % (ATLAS_VERSION,size)).encode())
+    for name in names:
+        hasher.update(name.encode()+b'\0')
+        with open(os.path.join(folder,name),'rb') as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()[:16]
+
+
+def _pixels(path):
+    """
+    Returns the pixels of the image file as a height x width x 4 RGBA array
+
+    The first row of the array is the top of the image.
+
+    :param path: The path to the image file
+    :type path:  ``str``
+    """
+    import numpy as np
+    from kivy.core.image import ImageLoader
+    data = ImageLoader.load(path,keep_data=True)._data[0]
+    depth = len(data.fmt)
+    if not data.fmt in ('rgba','bgra','rgb','bgr'):
+        raise ValueError('%s has unsupported pixel format %s' % (repr(path),data.fmt))
+
+    row = data.rowlength if data.rowlength else data.width*depth
+    pixels = np.frombuffer(data.data,dtype=np.uint8).reshape(data.height,row)
+    pixels = pixels[:,:data.width*depth].reshape(data.height,data.width,depth)
+    if data.fmt[0] == 'b':
+        pixels = pixels[:,:,[2,1,0]+([3] if depth == 4 else [])]
+    if depth == 3:
+        alpha = np.full((data.height,data.width,1),255,dtype=np.uint8)
+        pixels = np.concatenate((pixels,alpha),axis=2)
+    return pixels
+
+
+def _pack(sizes,size):
+    """
+    Returns the placement of rectangles with the given sizes in pages
+
+    The result is a pair (places,pages).  The value places[i] is a triple (page,x,y)
+    giving the top left corner of rectangle i, where y grows downward.  The value
+    pages is a list of the (width,height) of each page, rounded up to a power of two.
+
+    The rectangles are placed on shelves (rows) in order of decreasing height.  Every
+    rectangle gets a one pixel border, so that filtering never mixes two images.
+
+    :param sizes: The width and height of each rectangle
+    :type sizes:  ``list`` of (``int``,``int``), each no larger than size-2
+
+    :param size: The largest width and height of a page
+    :type size:  ``int`` > 0
+    """
+    order = sorted(range(len(sizes)),key=lambda i: (-sizes[i][1],-sizes[i][0]))
+    places = [None]*len(sizes)
+    pages = []
+    x = y = shelf = 0
+    for i in order:
+        (w,h) = (sizes[i][0]+2,sizes[i][1]+2)
+        if x+w > size:
+            (x,y,shelf) = (0,y+shelf,0)
+        if not pages or y+h > size:
+            pages.append([0,0])
+            (x,y,shelf) = (0,0,0)
+        places[i] = (len(pages)-1,x+1,y+1)
+        pages[-1][0] = max(pages[-1][0],x+w)
+        pages[-1][1] = max(pages[-1][1],y+h)
+        x += w
+        shelf = max(shelf,h)
+    return (places,[(_power(w),_power(h)) for (w,h) in pages])
+
+
+def _power(n):
+    """
+    Returns the smallest power of two that is at least n
+
+    :param n: The value to round up
+    :type n:  ``int`` > 0
+    """
+    return 1 << (n-1).bit_length()
+
+
+def _write(folder,names,size,cache,stem):
+    """
+    Packs the images ``names`` in ``folder`` and writes the atlas ``stem`` to ``cache``
+
+    Any older atlas in ``cache`` is removed.  Images that are too large for a page are
+    left out of the atlas (they are loaded separately).
+
+    :param folder: The path to the image folder
+    :type folder:  ``str``
+
+    :param names: The file names to pack
+    :type names:  ``list`` of ``str``
+
+    :param size: The largest width and height of a page
+    :type size:  ``int`` > 0
+
+    :param cache: The path to the atlas folder
+    :type cache:  ``str``
+
+    :param stem: The file name of the atlas, without an extension
+    :type stem:  ``str``
+    """
+    import numpy as np
+    from kivy.core.image import ImageLoader
+    images = {}
+    for name in names:
+        try:
+            pixels = _pixels(os.path.join(folder,name))
+        except Exception as e:
+            Logger.info('GameApp: Leaving %s out of the texture atlas (%s).' % (repr(name),e))
+            continue
+        if pixels.shape[0] <= size-2 and pixels.shape[1] <= size-2:
+            images[name] = pixels
+
+    names = sorted(images)
+    (places,pages) = _pack([(images[n].shape[1],images[n].shape[0]) for n in names],size)
+    sheets = [np.zeros((h,w,4),dtype=np.uint8) for (w,h) in pages]
+    table = [{} for page in pages]
+    for (name,(page,x,y)) in zip(names,places):
+        (h,w) = images[name].shape[:2]
+        # Copy the edge pixels into the border around the image
+        sheets[page][y-1:y+h+1,x-1:x+w+1] = np.pad(images[name],((1,1),(1,1),(0,0)),mode='edge')
+        table[page][name] = [x,pages[page][1]-y-h,w,h]
+
+    if not os.path.isdir(cache):
+        os.makedirs(cache)
+    for old in os.listdir(cache):
+        if old.startswith('images-'):
+            os.remove(os.path.join(cache,old))
+
+    loader = [x for x in ImageLoader.loaders if x.can_save('png',is_bytesio=False)][0]
+    meta = {}
+    for (page,sheet) in enumerate(sheets):
+        file = '%s-%d.png' % (stem,page)
+        (h,w) = sheet.shape[:2]
+        loader.save(os.path.join(cache,file),w,h,'rgba',sheet.tobytes(),False,'png')
+        meta[file] = table[page]
+
+    # Write the table last, as its presence marks a complete atlas
+    with open(os.path.join(cache,stem+'.atlas'),'w') as f:
+        json.dump(meta,f)
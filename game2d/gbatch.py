@@ -0,0 +1,205 @@
+"""
+A module to draw many images with a few draw calls.
+
+Every GImage draws itself with its own group of instructions: a push, three transforms,
+a rectangle and a pop.  A batch instead copies the corners of a list of images into a
+single mesh for each texture.  When the textures are regions of the same atlas page,
+the whole batch is one draw call.  Moving an image only rewrites its vertices, so a
+batch is cheap to animate.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .grectangle import GImage
+import math
+
+# The most images in one mesh (Kivy mesh indices are 16 bit)
+BATCH_LIMIT = 16384
+
+
+# #mark -
+class GBatch(object):
+    """
+    A class representing a list of images drawn as a few meshes.
+
+    A batch is made from a list of :class:`GImage` objects.  It draws each image with the
+    size, angle, scale, tint and texture that the image had when the batch was made.
+    However, the batch keeps its own positions for the images, which you change with the
+    method :meth:`move`.  Changing the images after making the batch does not change what
+    the batch draws.  The whole batch can also be moved at once with :attr:`origin`.
+
+    The batch has one mesh for each texture (and tint).  The images of one mesh are drawn
+    in the order of the list.  If all of the textures are regions of the texture atlas,
+    the batch is a single mesh.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of images in this batch
+
+        **invariant**. Value is an int >= 0.
+        """
+        return len(self._xs)
+
+    @property
+    def xs(self):
+        """
+        The x-coordinates of the image centers, as a copy
+
+        **invariant**. Value is a 1d ``numpy`` array of length ``count``.
+        """
+        return self._xs.copy()
+
+    @property
+    def ys(self):
+        """
+        The y-coordinates of the image centers, as a copy
+
+        **invariant**. Value is a 1d ``numpy`` array of length ``count``.
+        """
+        return self._ys.copy()
+
+    # MUTABLE PROPERTIES
+    @property
+    def origin(self):
+        """
+        The offset (x,y) added to every image position when the batch is drawn.
+
+        Changing the origin moves the whole batch with a single ``Translate``, without
+        touching the vertices.  The origin starts at (0,0).
+
+        **invariant**. Value is a tuple of two numbers.
+        """
+        return (self._trans.x,self._trans.y)
+
+    @origin.setter
+    def origin(self,value):
+        assert type(value) in [list,tuple] and len(value) == 2, '%s is not a pair' % repr(value)
+        if self._trans.x != value[0]:
+            self._trans.x = value[0]
+        if self._trans.y != value[1]:
+            self._trans.y = value[1]
+
+    # BUILT-IN METHODS
+    def __init__(self,images):
+        """
+        Creates a new batch drawing the given images.
+
+        The images start at their current positions.  The list may be empty, in which
+        case the batch draws nothing.
+
+        :param images: The images to draw
+        :type images:  ``list`` of :class:`GImage`
+        """
+        self._trans = Translate(0,0,0)
+        self._cache = InstructionGroup()
+        self.load(images)
+
+    # PUBLIC METHODS
+    def load(self,images):
+        """
+        Makes this batch draw the given images instead, keeping its origin.
+
+        This is the same as making a new batch, except that the graphics that a view
+        already has for this batch stay valid.  The images start at their current
+        positions.
+
+        :param images: The images to draw
+        :type images:  ``list`` of :class:`GImage`
+        """
+        import numpy
+        assert type(images) in [list,tuple], '%s is not a list' % repr(images)
+        assert all(isinstance(image,GImage) for image in images), '%s has a non-image' % repr(images)
+        count = len(images)
+        self._xs = numpy.array([image.x for image in images],dtype=float)
+        self._ys = numpy.array([image.y for image in images],dtype=float)
+
+        # The corners of each image relative to its center, after scaling and rotating
+        self._offsets = numpy.zeros((count,4,2),dtype=float)
+        coords = numpy.zeros((count,4,2),dtype=numpy.float32)
+        for (i,image) in enumerate(images):
+            (sx,sy) = image.scale
+            rads = math.radians(image.angle)
+            (cos,sin) = (math.cos(rads),math.sin(rads))
+            w = image.width*sx/2.0
+            h = image.height*sy/2.0
+            for (k,(cx,cy)) in enumerate(((-w,-h),(w,-h),(w,h),(-w,h))):
+                self._offsets[i,k] = (cx*cos-cy*sin,cx*sin+cy*cos)
+            if not image._texture is None:
+                coords[i] = numpy.reshape(image._texture.tex_coords,(4,2))
+
+        # Group the images by texture and tint, in order of first appearance
+        keys = []
+        groups = {}
+        for (i,image) in enumerate(images):
+            texture = image._texture
+            color = (1,1,1,1) if image.fillcolor is None else tuple(image.fillcolor)
+            key = (None if texture is None else texture.id,color)
+            if not key in groups or len(groups[key][-1][0]) == BATCH_LIMIT:
+                groups.setdefault(key,[]).append(([],texture,color))
+                keys.append((key,len(groups[key])-1))
+            groups[key][-1][0].append(i)
+
+        self._meshes = []
+        self._cache.clear()
+        self._cache.add(PushMatrix())
+        self._cache.add(self._trans)
+        for (key,part) in keys:
+            (indices,texture,color) = groups[key][part]
+            indices = numpy.array(indices,dtype=int)
+            verts = numpy.zeros((len(indices),4,4),dtype=numpy.float32)
+            verts[:,:,2:] = coords[indices]
+            quads = numpy.arange(len(indices)*4,dtype=int).reshape(-1,4)
+            order = quads[:,[0,1,2,2,3,0]].ravel().tolist()
+            mesh = Mesh(vertices=[],indices=order,mode='triangles',texture=texture)
+            self._meshes.append((indices,verts,mesh))
+            self._cache.add(Color(*color))
+            self._cache.add(mesh)
+        self._cache.add(PopMatrix())
+        self._update()
+
+    def move(self,xs,ys=None):
+        """
+        Moves the images of this batch to the given centers.
+
+        The vertices are only rewritten if a position has changed.
+
+        :param xs: The x-coordinates of the image centers
+        :type xs:  sequence of ``count`` numbers
+
+        :param ys: The y-coordinates of the image centers (None to keep them)
+        :type ys:  sequence of ``count`` numbers or None
+        """
+        import numpy
+        xs = numpy.asarray(xs,dtype=float)
+        assert xs.shape == self._xs.shape, '%s does not have %d values' % (repr(xs),self.count)
+        changed = not numpy.array_equal(xs,self._xs)
+        self._xs[:] = xs
+        if not ys is None:
+            ys = numpy.asarray(ys,dtype=float)
+            assert ys.shape == self._ys.shape, '%s does not have %d values' % (repr(ys),self.count)
+            changed = changed or not numpy.array_equal(ys,self._ys)
+            self._ys[:] = ys
+        if changed:
+            self._update()
+
+    def draw(self, view):
+        """
+        Draws this batch in the provided view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._cache)
+
+    # HIDDEN METHODS
+    def _update(self):
+        """
+        Rewrites the vertex positions of every mesh in place.
+        """
+        for (indices,verts,mesh) in self._meshes:
+            verts[:,:,0] = self._offsets[indices,:,0]+self._xs[indices,None]
+            verts[:,:,1] = self._offsets[indices,:,1]+self._ys[indices,None]
+            # Assigning the same buffer tells Kivy to upload it again
+            mesh.vertices = memoryview(verts.reshape(-1))
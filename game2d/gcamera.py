@@ -0,0 +1,156 @@
+"""
+A module to scroll the view over a world larger than the window.
+
+A camera is a pair of markers in the drawing order of a view.  Everything drawn between
+:meth:`GCamera.begin` and :meth:`GCamera.end` is drawn as if the point (x,y) of the world
+were the bottom left corner of the view.  Everything drawn outside of the two markers
+(such as a score display) stays where it is on the screen.
+
+In retained mode (see :attr:`GView.retained`), the camera is added to the view once
+with :meth:`GCamera.show`, and then moves the objects in a range of layers.
+
+Moving the camera only changes one ``Translate``.  None of the objects in the world are
+touched, so in retained mode a frame where only the camera moved does not change the
+canvas at all.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+
+
+# #mark -
+class GCamera(object):
+    """
+    A class representing a camera looking at part of the world.
+
+    The camera position (x,y) is the point of the world that is drawn at the bottom left
+    corner of the view.  The camera does not change the touch coordinates of
+    :class:`GInput`; those are still screen coordinates.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal coordinate of the world at the left edge of the view.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return -self._trans.x
+
+    @x.setter
+    def x(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        if self._trans.x != -value:
+            self._trans.x = -float(value)
+
+    @property
+    def y(self):
+        """
+        The vertical coordinate of the world at the bottom edge of the view.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return -self._trans.y
+
+    @y.setter
+    def y(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        if self._trans.y != -value:
+            self._trans.y = -float(value)
+
+    # BUILT-IN METHODS
+    def __init__(self,x=0,y=0):
+        """
+        Creates a new camera at the given position.
+
+        :param x: The horizontal coordinate of the world at the left edge of the view
+        :type x:  ``int`` or ``float``
+
+        :param y: The vertical coordinate of the world at the bottom edge of the view
+        :type y:  ``int`` or ``float``
+        """
+        self._trans = Translate(0,0,0)
+        self._start = InstructionGroup()
+        self._start.add(PushMatrix())
+        self._start.add(self._trans)
+        self._stop = PopMatrix()
+        self._marks = (_GMark(self._start),_GMark(self._stop))
+        self.x = x
+        self.y = y
+
+    # PUBLIC METHODS
+    def begin(self,view):
+        """
+        Starts drawing the world to the provided view.
+
+        Every object drawn to the view after this (and before :meth:`end`) is moved by
+        the camera.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._start)
+
+    def end(self,view):
+        """
+        Stops drawing the world to the provided view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._stop)
+
+    def show(self,view,first,last):
+        """
+        Adds this camera to the provided view in retained mode.
+
+        Every object in the layers from first to last (see :meth:`GView.add`) is moved by
+        the camera.  The camera takes the layers half a layer below first and half a
+        layer above last, so those should not have any objects.
+
+        :param view: view to add to
+        :type view:  :class:`GView`
+
+        :param first: the lowest layer of the world
+        :type first:  ``int``
+
+        :param last: the highest layer of the world
+        :type last:  ``int`` >= first
+        """
+        view.add(self._marks[0],first-0.5)
+        view.add(self._marks[1],last+0.5)
+
+    def hide(self,view):
+        """
+        Removes this camera from the provided view in retained mode.
+
+        :param view: view to remove from
+        :type view:  :class:`GView`
+        """
+        view.remove(self._marks[0])
+        view.remove(self._marks[1])
+
+
+# #mark -
+class _GMark(object):
+    """
+    A class representing one end of a camera, to add to a view in retained mode.
+    """
+
+    def __init__(self,cmd):
+        """
+        Creates a mark drawing the given Kivy graphics command.
+
+        :param cmd: the command to draw
+        :type cmd:  A Kivy graphics command
+        """
+        self._cmd = cmd
+
+    def draw(self,view):
+        """
+        Draws this mark in the provided view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._cmd)
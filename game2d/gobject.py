@@ -5,7 +5,14 @@ This module provides the base drawable class, as well as simple scene graph supp
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from colors_geom.geom import Point2, Matrix
+from colors_geom.geom import Point2, Transform2D
+from contextlib import contextmanager
+
+# The objects whose drawing cache is out of date, while a batch is open (see batch)
+# The keys are the object ids, in the order the objects were first changed
+_deferred = None
+# The number of batches that are open (batches may be nested)
+_depth = 0
 
 
 def is_color(c):
@@ -72,6 +79,46 @@ def is_gobject_list(g):
         return False
 
 
+@contextmanager
+def batch():
+    """
+    Defers the drawing cache resets of every object changed inside a ``with`` block.
+
+    Changing the size of an object (or its image, text, line width or children) after
+    it is made rebuilds its drawing cache right away.  Inside of the block::
+
+        with batch():
+            ...
+
+    an object that is changed is only marked, and its drawing cache is rebuilt once
+    when the block ends, however many times it was changed.  Objects made inside of
+    the block are still complete when their constructor returns.
+
+    Until the block ends, a changed object must not be drawn, and any size that comes
+    from its drawing cache (the size an image takes from its texture, or that a label
+    takes from its text) is that of the object before the change.  Batches may be
+    nested; the objects are reset when the outermost batch ends.
+    """
+    global _deferred, _depth
+    if _depth == 0:
+        _deferred = {}
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if _depth == 0:
+            objs = list(_deferred.values())
+            _deferred = None
+            # Scenes add the caches of their children, so they go last
+            for obj in objs:
+                if not isinstance(obj,GScene):
+                    obj._reset()
+            for obj in objs:
+                if isinstance(obj,GScene):
+                    obj._reset()
+
+
 #mark -
 
 class GObject(object):
@@ -101,6 +148,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._btrue = False
 
     @property
     def y(self):
@@ -116,6 +164,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._btrue = False
 
     @property
     def width(self):
@@ -133,8 +182,8 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
-        if self._defined:
-            self._reset()
+        self._btrue = False
+        self._changed()
 
     @property
     def height(self):
@@ -152,8 +201,8 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
-        if self._defined:
-            self._reset()
+        self._btrue = False
+        self._changed()
 
     @property
     def hitbox(self):
@@ -179,6 +228,7 @@ class GObject(object):
 
     @hitbox.setter
     def hitbox(self,value):
+        self._btrue = False
         if value is None:
             self._hitbox = None
             return
@@ -220,6 +270,7 @@ class GObject(object):
             self._scale.x = float(value[0])
             self._scale.y = float(value[1])
         self._mtrue = False
+        self._btrue = False
 
     @property
     def angle(self):
@@ -238,6 +289,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         diff = np.allclose([self._rotate.angle],[value])
         self._rotate.angle = float(value)
+        self._btrue = False
         if not diff:
             self._mtrue = False
 
@@ -275,8 +327,7 @@ class GObject(object):
                 value = colors_geom.RGB.CreateName(value).glColor()
 
         self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
-        if self._defined:
-            self._reset()
+        self._changed()
 
     @property
     def fillcolor(self):
@@ -313,8 +364,7 @@ class GObject(object):
                 value = colors_geom.RGB.CreateName(value).glColor()
 
         self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
-        if self._defined:
-            self._reset()
+        self._changed()
 
     @property
     def name(self):
@@ -494,7 +544,7 @@ class GObject(object):
         This value is constructed dynamically as needed.  It should only be used
         internally in this package
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: Either a :class:`Transform2D` or ``None``
         """
         if not self._mtrue or self._matrix is None:
             self._build_matrix()
@@ -508,7 +558,7 @@ class GObject(object):
         This value is constructed dynamically as needed.  It should only be used
         internally in this package
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: Either a :class:`Transform2D` or ``None``
         """
         if not self._mtrue or self._matrix is None:
             self._build_matrix()
@@ -539,8 +589,12 @@ class GObject(object):
         # Set the properties.
         self._defined = False
 
+        # The views in retained mode that this object was added to (see GView.add)
+        self._views = []
+
         # Create the Kivy transforms for position and size
         self._mtrue  = False
+        self._btrue  = False
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
@@ -628,7 +682,7 @@ class GObject(object):
             isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
             return isx and isy
 
-        comp = obj.matrix*self.matrix.inverse()
+        comp = obj.matrix*self.inverse
         w = obj.width/2.0
         h = obj.height/2.0
         p0 = tuple(comp._transform(-w+h2[0], h-h2[1]))
@@ -653,6 +707,21 @@ class GObject(object):
 
         return False
 
+    def collides_many(self,objs):
+        """
+        Checks whether this object collides with each object in a list.
+
+        This is the same as calling :meth:`collides` on each object, but all of the
+        tests are done at once.  See :func:`collide_matrix` for details.
+
+        :param objs: the objects to check for collision
+        :type objs: ``list`` of :class:`GObject`
+
+        :return: A mask whose i-th entry is True if the shape collides with objs[i]
+        :rtype:  ``numpy.ndarray`` of ``bool``
+        """
+        return collide_matrix([self],objs)[0]
+
     def contains(self,point):
         """
         Checks whether this shape contains the point
@@ -677,7 +746,7 @@ class GObject(object):
             return l <= point[0] <= r and b <= point[1] <= t
 
         # Transform this to the right space.
-        point = tuple(self.matrix.inverse()._transform(point[0],point[1]))
+        point = tuple(self.inverse._transform(point[0],point[1]))
         w = self.width/2.0
         h = self.height/2.0
         isx = - w + self._hitbox[0] <= point[0] <= w - self._hitbox[2]
@@ -721,31 +790,71 @@ class GObject(object):
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
     # HIDDEN METHODS
+    def _changed(self):
+        """
+        Resets the drawing cache after a settings change, or at the end of the batch.
+
+        This method does nothing while the object is being made (the constructor resets
+        the cache once it is done).  See :func:`batch`.
+        """
+        if not self._defined:
+            return
+        if _deferred is None:
+            self._reset()
+        else:
+            _deferred.setdefault(id(self),self)
+
     def _reset(self):
         """
         Resets the drawing cache.
+
+        Any view in retained mode that has this object is told to draw it again (see
+        :meth:`GView.add`).
         """
         self._cache = InstructionGroup()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
+        self._redraw()
+
+    def _redraw(self):
+        """
+        Tells the views in retained mode that have this object that its cache was reset.
+        """
+        for view in self._views:
+            view._changed(self)
 
     def _build_matrix(self):
         """
         Builds the transform matrices after a settings change.
         """
-        self._matrix = Matrix()
+        self._matrix = Transform2D()
         self._matrix.scale(self._scale.x,self._scale.y)
         self._matrix.rotate(self._rotate.angle)
         self._matrix.translate(self._trans.x,self._trans.y)
-        self._invrse = Matrix()
+        self._invrse = Transform2D()
         self._invrse.translate(-self._trans.x,-self._trans.y)
         self._invrse.rotate(-self._rotate.angle)
         self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
         self._mtrue = True
 
     def _bbox(self):
+        """
+        Returns the bounding box of this rotated object
+
+        The bounding box is returned as a tuple (l,t,r,b).  Like the matrix, the box
+        is cached and only rebuilt (with :meth:`_build_bbox`) after a settings change.
+
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        if not self._btrue:
+            self._bounds = self._build_bbox()
+            self._btrue = True
+        return self._bounds
+
+    def _build_bbox(self):
         """
         Computes the bounding box of this rotated object
 
@@ -832,8 +941,7 @@ class GScene(GObject):
     def children(self,value):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
         self._children = list(value)
-        if self._defined:
-            self._reset()
+        self._changed()
 
 
     # IMMUTABLE PROPERTIES
@@ -927,6 +1035,18 @@ class GScene(GObject):
 
 
     # HIDDEN METHODS
+    def _bbox(self):
+        """
+        Returns the bounding box of this scene
+
+        The size of a scene depends on its children, which may move at any time, so
+        this box is never cached.
+
+        :return: The bounding box for the scene
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        return self._build_bbox()
+
     def _reset(self):
         """
         Resets the drawing cache
@@ -935,3 +1055,120 @@ class GScene(GObject):
         for x in self.children:
             self._cache.add(x._cache)
         self._cache.add(PopMatrix())
+
+
+#mark -
+
+def collide_matrix(a_list,b_list):
+    """
+    Checks every object in one list for collisions with every object in another.
+
+    The result is a boolean mask whose entry [i,j] is the value of
+    ``a_list[i].collides(b_list[j])``.  The bounding boxes and transforms of the objects
+    are gathered once, and all of the pairs are tested with vectorized ``numpy``
+    operations, so this is much faster than a double loop over :meth:`GObject.collides`
+    when there are many objects.
+
+    As with :meth:`GObject.collides`, pairs where both objects are rotated in 90 degree
+    increments use a simple box test.  Otherwise the hitbox of the second object is
+    transformed into the space of the first, and its sides are tested against the
+    hitbox of the first.
+
+    :param a_list: the objects doing the test
+    :type a_list: ``list`` of :class:`GObject`
+
+    :param b_list: the objects to test against
+    :type b_list: ``list`` of :class:`GObject`
+
+    :return: The collision mask
+    :rtype:  ``numpy.ndarray`` of ``bool`` with shape (len(a_list),len(b_list))
+    """
+    import numpy as np
+    assert len(a_list) == 0 or is_gobject_list(a_list), '%s is not a list of GObject' % repr(a_list)
+    assert len(b_list) == 0 or is_gobject_list(b_list), '%s is not a list of GObject' % repr(b_list)
+    a = _collide_data(a_list)
+    b = _collide_data(b_list)
+    if len(a_list) == 0 or len(b_list) == 0:
+        return np.zeros((len(a_list),len(b_list)),dtype=bool)
+
+    # The box test for right angles (same as GObject.collides)
+    (l0,t0,r0,b0) = [v[np.newaxis,:] for v in b['bbox']]
+    (l1,t1,r1,b1) = [v[:,np.newaxis] for v in a['bbox']]
+    isx = ((l1 <= l0) & (l0 <= r1)) | ((l0 <= l1) & (l1 <= r0))
+    isy = ((b1 <= b0) & (b0 <= t1)) | ((b0 <= b1) & (b1 <= t0))
+    result = isx & isy
+
+    square = a['square'][:,np.newaxis] & b['square'][np.newaxis,:]
+    if square.all():
+        return result
+
+    # Everything else: corners of b into the space of a, then test the sides
+    (pa,pb) = np.nonzero(~square)
+    corners = b['corners'][pb]                                  # (k,4,2) world
+    local = corners - a['trans'][pa][:,np.newaxis,:]
+    cos = a['cos'][pa][:,np.newaxis]
+    sin = a['sin'][pa][:,np.newaxis]
+    px = ( cos*local[...,0] + sin*local[...,1])/a['scale'][pa,0][:,np.newaxis]
+    py = (-sin*local[...,0] + cos*local[...,1])/a['scale'][pa,1][:,np.newaxis]
+
+    nx = np.roll(px,-1,axis=1)
+    ny = np.roll(py,-1,axis=1)
+    sl0 = np.minimum(px,nx)
+    sr0 = np.maximum(px,nx)
+    sb0 = np.minimum(py,ny)
+    st0 = np.maximum(py,ny)
+    (sl1,st1,sr1,sb1) = [v[pa][:,np.newaxis] for v in a['local']]
+    isx = ((sl1 <= sl0) & (sl0 <= sr1)) | ((sl0 <= sl1) & (sl1 <= sr0))
+    isy = ((sb1 <= sb0) & (sb0 <= st1)) | ((sb0 <= sb1) & (sb1 <= st0))
+    result[pa,pb] = (isx & isy).any(axis=1)
+    return result
+
+
+def _collide_data(objs):
+    """
+    Gathers the collision data of a list of objects into ``numpy`` arrays.
+
+    The data is a dictionary with the bounding boxes ('bbox'), whether each object is
+    rotated in 90 degree increments ('square'), the hitbox in local coordinates
+    ('local'), the hitbox corners in world coordinates ('corners'), and the parts of
+    the transform ('trans', 'cos', 'sin' and 'scale').
+
+    :param objs: the objects to gather
+    :type objs: ``list`` of :class:`GObject`
+
+    :return: The collision data
+    :rtype:  ``dict``
+    """
+    import numpy as np
+    n = len(objs)
+    bbox   = np.zeros((4,n))
+    local  = np.zeros((4,n))
+    square = np.zeros(n,dtype=bool)
+    trans  = np.zeros((n,2))
+    scale  = np.ones((n,2))
+    angle  = np.zeros(n)
+    for i in range(n):
+        obj = objs[i]
+        hit = (0,0,0,0) if obj._hitbox is None else obj._hitbox
+        w = obj.width/2.0
+        h = obj.height/2.0
+        square[i] = (obj.angle % 360) in [0,90,180,270]
+        if square[i]:
+            bbox[:,i] = obj._bbox()
+        local[:,i] = (-w+hit[0],h-hit[1],w-hit[2],-h+hit[3])
+        trans[i] = (obj._trans.x,obj._trans.y)
+        scale[i] = (obj._scale.x,obj._scale.y)
+        angle[i] = obj._rotate.angle
+
+    radians = np.radians(angle)
+    cos = np.cos(radians)
+    sin = np.sin(radians)
+
+    # The hitbox corners, in the order used by GObject.collides
+    (l,t,r,b) = local
+    cx = np.stack([l,r,r,l],axis=1)*scale[:,0:1]
+    cy = np.stack([t,t,b,b],axis=1)*scale[:,1:2]
+    corners = np.stack([cos[:,np.newaxis]*cx - sin[:,np.newaxis]*cy + trans[:,0:1],
+                        sin[:,np.newaxis]*cx + cos[:,np.newaxis]*cy + trans[:,1:2]],axis=2)
+    return {'bbox':bbox,'square':square,'local':local,'corners':corners,
+            'trans':trans,'cos':cos,'sin':sin,'scale':scale}
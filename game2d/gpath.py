@@ -116,8 +116,8 @@ class GPath(GObject):
     def points(self,value):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
-        if self._defined:
-            self._reset()
+        self._btrue = False
+        self._changed()
 
     @property
     def linewidth(self):
@@ -135,8 +135,7 @@ class GPath(GObject):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         assert value >= 0, 'value %s is negative' % repr(value)
         self._linewidth = value
-        if self._defined:
-            self._reset()
+        self._changed()
 
 
     # IMMUTABLE PROPERTIES
@@ -294,8 +293,8 @@ class GTriangle(GPath):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
-        if self._defined:
-            self._reset()
+        self._btrue = False
+        self._changed()
 
 
     # BUILT-IN METHODS
@@ -410,8 +409,8 @@ class GPolygon(GPath):
     def points(self,value):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
-        if self._defined:
-            self._reset()
+        self._btrue = False
+        self._changed()
 
     @property
     def source(self):
@@ -427,8 +426,7 @@ class GPolygon(GPath):
         from .app import GameApp
         assert value is None or GameApp.is_image(value), 'value %s is not an image file' % repr(value)
         self._source = value
-        if self._defined:
-            self._reset()
+        self._changed()
 
     @property
     def source_width(self):
@@ -452,8 +450,7 @@ class GPolygon(GPath):
     def source_width(self,value):
         assert value is None or type(value) in [int,float], 'value %s is not a valid width' % repr(value)
         self._source_width = None
-        if self._defined:
-            self._reset()
+        self._changed()
 
     @property
     def source_height(self):
@@ -477,8 +474,7 @@ class GPolygon(GPath):
     def source_height(self,value):
         assert value is None or _is_num(value), 'value %s is not a valid width' % repr(value)
         self._source_height = None
-        if self._defined:
-            self._reset()
+        self._changed()
 
 
     # BUILT-IN METHODS
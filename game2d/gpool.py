@@ -0,0 +1,131 @@
+"""
+A module to use graphics objects again instead of making new ones.
+
+Making a :class:`GObject` is not cheap.  The constructor builds the Kivy transforms,
+and the drawing cache (with the texture of an image) is built from scratch.  A game
+that keeps making and throwing away the same kind of objects (obstacles that scroll
+off the screen, markers that come and go) can instead release them to a pool, and
+acquire them back with new settings.
+"""
+from .gobject import GObject, batch
+from .app import GameApp
+
+
+# #mark -
+class GPool(object):
+    """
+    A class representing a pool of graphics objects of one type.
+
+    The method :meth:`acquire` returns an object with the given settings.  If the pool
+    has a released object, that object is changed in place: its ``source`` first (and
+    then its size, to match the new image), then every other setting.  Settings that
+    already have the right value are not set again, so an object acquired with the
+    settings it was released with does not rebuild its drawing cache, and the others
+    rebuild it once (see :func:`batch`).  Otherwise the pool makes a new object.
+
+    Every setting that is not given to :meth:`acquire` keeps the value it had when the
+    object was released.  So any setting that some objects change (such as ``angle``)
+    should have a default, given when the pool is made.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def kind(self):
+        """
+        The class of the objects in this pool.
+
+        **invariant**: Value is a subclass of :class:`GObject`.
+        """
+        return self._kind
+
+    @property
+    def available(self):
+        """
+        The number of released objects waiting to be acquired again.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return len(self._free)
+
+    @property
+    def created(self):
+        """
+        The number of objects this pool has made.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return self._created
+
+    # BUILT-IN METHODS
+    def __init__(self,kind,*args,**defaults):
+        """
+        Creates a new empty pool of objects of the given class.
+
+        A new object is made as ``kind(*args,**keywords)``, where the keywords are the
+        defaults updated with the settings given to :meth:`acquire`.
+
+        :param kind: The class of the objects
+        :type kind:  a subclass of :class:`GObject`
+
+        :param args: The positional arguments to make a new object
+        :type args:  any
+
+        :param defaults: The settings of every object acquired, unless given to acquire
+        :type defaults:  keys are attribute names
+        """
+        assert isinstance(kind,type) and issubclass(kind,GObject), '%s is not a GObject class' % repr(kind)
+        self._kind = kind
+        self._args = args
+        self._defaults = defaults
+        self._free = []
+        self._created = 0
+
+    # PUBLIC METHODS
+    def acquire(self,**keywords):
+        """
+        Returns an object of this pool with the given settings.
+
+        The object is a released object if there is one, and a new object otherwise.
+
+        :param keywords: The settings of the object
+        :type keywords:  keys are attribute names
+        """
+        settings = dict(self._defaults)
+        settings.update(keywords)
+        if not self._free:
+            self._created += 1
+            return self._kind(*self._args,**settings)
+
+        obj = self._free.pop()
+        with batch():
+            if 'source' in settings and obj.source != settings['source']:
+                obj.source = settings['source']
+                texture = GameApp.load_texture(obj.source)
+                if not texture is None:
+                    settings.setdefault('width',texture.width)
+                    settings.setdefault('height',texture.height)
+            for key in ('width','height'):
+                if key in settings and getattr(obj,key) != settings[key]:
+                    setattr(obj,key,settings[key])
+            for (key,value) in settings.items():
+                if not key in ('source','width','height') and getattr(obj,key) != value:
+                    setattr(obj,key,value)
+        return obj
+
+    def release(self,obj):
+        """
+        Gives an object back to this pool, to be acquired again.
+
+        The object must no longer be used (or drawn) until it is acquired again.
+
+        :param obj: The object to release
+        :type obj:  an instance of :attr:`kind` that is not already released
+        """
+        assert isinstance(obj,self._kind), '%s is not a %s' % (repr(obj),self._kind.__name__)
+        self._free.append(obj)
+
+    def clear(self):
+        """
+        Forgets every released object, so that they can be garbage collected.
+        """
+        self._free = []
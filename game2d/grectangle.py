@@ -46,8 +46,7 @@ class GRectangle(GObject):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value >= 0, '%s is negative' % repr(value)
         self._linewidth = value
-        if self._defined:
-            self._reset()
+        self._changed()
     
     
     # BUILT-IN METHODS
@@ -154,7 +153,7 @@ class GEllipse(GRectangle):
             dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
             dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
         else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
+            p = self.inverse._transform(point[0],point[1])
             dx = p[0]*p[0]/(rx*rx)
             dy = p[1]*p[1]/(ry*ry)
         
@@ -219,8 +218,7 @@ class GImage(GRectangle):
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
-        if self._defined:
-            self._reset()
+        self._changed()
     
     
     # BUILT-IN METHODS
@@ -257,8 +255,10 @@ class GImage(GRectangle):
         
         self._texture = GameApp.load_texture(self.source)
         if not self._texture is None and (self.width == 0 or self.height == 0):
-                self.width  = self._texture.width
-                self.height = self._texture.height
+            # Not the setters, which would reset the cache again
+            self._width  = float(self._texture.width)
+            self._height = float(self._texture.height)
+            self._btrue = False
         
         x = -self.width/2.0
         y = -self.height/2.0
@@ -390,8 +390,7 @@ class GLabel(GRectangle):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
         self._label.halign = value
-        if self._defined:
-            self._reset()
+        self._changed()
     
     @property
     def valign(self):
@@ -414,8 +413,7 @@ class GLabel(GRectangle):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
         self._label.valign = value
-        if self._defined:
-            self._reset()
+        self._changed()
     
     
     # REDEFINED PROPERTIES
@@ -432,6 +430,7 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._btrue = False
         self._hanchor = 'center'
         self._ha = value
     
@@ -448,6 +447,7 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._btrue = False
         self._vanchor = 'center'
         self._hv = value
     
@@ -635,8 +635,7 @@ class GLabel(GRectangle):
         """
         A workaround to deal with parameter requirements for callbacks
         """
-        if self._defined:
-            self._reset()
+        self._changed()
     
     def _reset(self):
         """
@@ -653,6 +652,7 @@ class GLabel(GRectangle):
         self._width  = max(self.width, self._label.width)
         self._height = max(self.height,self._label.height)
         self._defined = True
+        self._btrue = False
         
         # Reset the absolute anchor
         if self._hanchor == 'left':
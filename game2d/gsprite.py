@@ -59,8 +59,7 @@ class GSprite(GRectangle):
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
-        if self._defined:
-            self._reset()
+        self._changed()
     
     @property
     def format(self):
@@ -131,6 +130,7 @@ class GSprite(GRectangle):
         if value is None:
             self._hitboxes = None
             self._hitbox   = None
+            self._btrue    = False
             return
         
         try:
@@ -39,8 +39,7 @@ class GTile(GObject):
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
-        if self._defined:
-            self._reset()
+        self._changed()
     
     # IMMUTABLE PROPERTIES
     @property
@@ -118,6 +117,10 @@ class GTile(GObject):
         rng_x = size_x+1 if rem_x > 0 else size_x
         rng_y = size_y+1 if rem_y > 0 else size_y
         
+        # Texture coordinates of the tile (the texture may be a region of an atlas)
+        (u,v)   = self._texture.uvpos
+        (du,dv) = self._texture.uvsize
+        
         vert = []
         indx = []
         pos = 0
@@ -125,10 +128,10 @@ class GTile(GObject):
             for jj in range(rng_y):
                 ni = 1 if ii < size_x else rem_x/grid_x
                 nj = 1 if jj < size_y else rem_y/grid_y
-                vert.extend([x+ii*grid_x,      y+jj*grid_y,         0, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,        ni, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y,   ni, 1-nj])
-                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y,    0, 1-nj])
+                vert.extend([x+ii*grid_x,      y+jj*grid_y,      u,       v])
+                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,      u+ni*du, v])
+                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y, u+ni*du, v+nj*dv])
+                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y, u,       v+nj*dv])
                 indx.extend([pos,pos+1,pos+2,pos+2,pos+3,pos])
                 pos += 4
         
@@ -411,12 +411,44 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    In retained mode (see :attr:`retained`), the view is not cleared.  Instead, each
+    object is added to the view once with :meth:`add`, and stays on the screen until it
+    is taken away with :meth:`remove`.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
+    # MUTABLE PROPERTIES
+    @property
+    def retained(self):
+        """
+        Whether the view keeps its objects between animation frames.
+
+        By default the view empties its canvas at the start of every animation frame,
+        and every object drawn adds its graphics back.  In retained mode, the view is
+        never emptied by the game.  The objects to show are added to the view once (with
+        :meth:`add`), in layers, and the canvas only changes when an object is added,
+        removed, or changed in a way that rebuilds its graphics (such as a new image or
+        text).  Moving an object does not change the canvas at all.  So the cost of a
+        frame depends on what changed, and not on how many objects are on the screen.
+
+        Changing this value removes everything from the view.  The value is False by
+        default.
+
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        if value != self._retained:
+            self.clear()
+            self._retained = value
+
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -433,6 +465,12 @@ class GView(FloatLayout):
         self.bind(size=self._reset)
         self._reset()
         self._contents = set()
+        self._retained = False
+        self._layers = []
+        self._groups = {}
+        self._slots  = {}
+        self._stale  = {}
+        self._target = None
 
 
     # PUBLIC METHODS
@@ -442,25 +480,132 @@ class GView(FloatLayout):
 
         You should never call this method, since you do not understand raw Kivy graphics
         commands.  Instead, you should use the `draw` method in :class:`GObject` instead.
+        In retained mode, objects are only drawn when they are added (see :meth:`add`).
 
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
-        if not cmd in self._contents:
-            self._frame.add(cmd)
+        if self._retained:
+            assert not self._target is None, 'objects in a retained view must be added with add()'
+            self._target.add(cmd)
+        elif not cmd in self._contents:
             self._contents.add(cmd)
+            self._frame.add(cmd)
 
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  In retained
+        mode, it is not called for you, and it removes every object added to the view.
         """
-        self._frame.clear()
         self._contents.clear()
+        for (obj,layer,slot) in self._slots.values():
+            if hasattr(obj,'_views'):
+                obj._views.remove(self)
+        self._layers = []
+        self._groups = {}
+        self._slots  = {}
+        self._stale  = {}
+        self._frame.clear()
+
+    def add(self,obj,layer=0):
+        """
+        Adds a graphics object to this view in retained mode.
+
+        The object stays on the screen until it is removed (with :meth:`remove`), and
+        the view draws it again by itself whenever its graphics are rebuilt.  It can be
+        anything with a ``draw`` method that takes a view, such as a :class:`GObject`.
+
+        The layers are drawn from the lowest to the highest, and the objects of a layer
+        in the order that they were added.  Adding an object that is already in the view
+        moves it to the end of the given layer.
+
+        :param obj: the object to add
+        :type obj:  an object with a method ``draw(view)``
+
+        :param layer: the layer of the object
+        :type layer:  ``int`` or ``float``
+        """
+        assert self._retained, 'objects can only be added to a view in retained mode'
+        assert type(layer) in [int,float], '%s is not a number' % repr(layer)
+        if id(obj) in self._slots:
+            self.remove(obj)
+        slot = InstructionGroup()
+        self._paint(obj,slot)
+        if not layer in self._groups:
+            pos = 0
+            while pos < len(self._layers) and self._layers[pos] < layer:
+                pos += 1
+            self._layers.insert(pos,layer)
+            self._groups[layer] = InstructionGroup()
+            self._frame.insert(pos,self._groups[layer])
+        self._groups[layer].add(slot)
+        self._slots[id(obj)] = (obj,layer,slot)
+        if hasattr(obj,'_views'):
+            obj._views.append(self)
+
+    def remove(self,obj):
+        """
+        Removes a graphics object from this view in retained mode.
+
+        This does nothing if the object is not in the view.
+
+        :param obj: the object to remove
+        :type obj:  an object added with :meth:`add`
+        """
+        entry = self._slots.pop(id(obj),None)
+        if entry is None:
+            return
+        (obj,layer,slot) = entry
+        self._groups[layer].remove(slot)
+        self._stale.pop(id(obj),None)
+        if hasattr(obj,'_views'):
+            obj._views.remove(self)
 
     # HIDDEN METHODS
+    def _changed(self,obj):
+        """
+        Marks an object in this view as having new graphics.
+
+        This is called by the object (see :meth:`GObject._changed`) whenever its drawing
+        cache is rebuilt.  The object is drawn again at the end of the animation frame.
+
+        :param obj: the object that changed
+        :type obj:  an object added with :meth:`add`
+        """
+        self._stale[id(obj)] = obj
+
+    def _flush(self):
+        """
+        Draws again the objects that changed during this animation frame.
+
+        This only does something in retained mode.  It is called for you at the end of
+        the animation frame, so an object that changed many times is drawn once.
+        """
+        for obj in self._stale.values():
+            slot = self._slots[id(obj)][2]
+            slot.clear()
+            self._paint(obj,slot)
+        self._stale = {}
+
+    def _paint(self,obj,slot):
+        """
+        Draws an object into the given graphics group.
+
+        :param obj: the object to draw
+        :type obj:  an object with a method ``draw(view)``
+
+        :param slot: the group to put the graphics in
+        :type slot:  ``InstructionGroup``
+        """
+        self._target = slot
+        try:
+            obj.draw(self)
+        finally:
+            self._target = None
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -8,10 +8,12 @@ slice that the frog goes through: grass, roads, water, and the exit hedge.
 from game2d import *
 from consts import *
 from models import *
+from simulation import *
 
 # PRIMARY RULE: Lanes are not allowed to access anything in any level.py or app.py.
-# They can only access models.py and const.py. If you need extra information from the
-# level object (or the app), then it should be a parameter in your method.
+# They can only access models.py, simulation.py and const.py. If you need extra
+# information from the level object (or the app), then it should be a parameter in
+# your method.
 
 class Lane(object):         # You are permitted to change the parent class if you wish
     """
@@ -36,23 +38,32 @@ class Lane(object):         # You are permitted to change the parent class if yo
     # Attribute _tile: The individual lane created
     # Invariant: _tile is a GTile
 
+    # Attribute _type: The lane type
+    # Invariant: _type is one of 'grass', 'road', 'water' or 'hedge'
+
     # Attribute _jsondict = The current level's JSON dict
     # Invariant: _jsondict is a JSON file
 
     # Attribute _safe: A list of safe frogs that need to be created for each occupied exit
     # Invariant: _safe is an empty/non-empty list of GImages
 
-    # Attribute _speed: The speed of the lane (and the objects in it)
-    # Invariant: _speed is a non-zero int
-
-    # Attribute _buffer: The offscreen buffer of the objects in the lane
-    # Invariant: _buffer is a non-zero int
+    # Attribute _shown: The exits that have a safe frog, in order
+    # Invariant: _shown is a list of obstacle indices, parallel to _safe
 
     # Attribute _objs: The list of objects in a lane
     # Invariant: _objs is either an empty list or non empty list of GImages
 
-    # Attribute _singlelane: a dictionary of the lane with all the objects and positions
-    # Invariant: _singlelane is a dictionary
+    # Attribute _pool: The pool that the obstacle and safe frog images come from
+    # Invariant: _pool is a GPool of GImages, with angle 0 by default
+
+    # Attribute _sim: The model of the lane, which owns the obstacle positions
+    # Invariant: _sim is a SimLane for the same row
+
+    # Attribute _batch: The renderer that draws all of the objects as one mesh
+    # Invariant: _batch is a LaneBatch for _objs and _sim
+
+    # Attribute _view: The view that the lane is shown in (see show)
+    # Invariant: _view is a GView in retained mode, or None if the lane is not shown
 
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
@@ -60,14 +71,29 @@ class Lane(object):         # You are permitted to change the parent class if yo
         '''Returns the row number of the lane created.'''
         return self._tile
 
+    def getRow(self):
+        '''Returns the row number of the lane.'''
+        return self._tiles
+
+    def getType(self):
+        '''Returns the lane type.'''
+        return self._type
+
+    def getSim(self):
+        '''Returns the model (a SimLane) of this lane.'''
+        return self._sim
+
     # INITIALIZER TO SET LANE POSITION, BACKGROUND,AND OBJECTS
 
-    def __init__(self,jsondict,tile,jsonhitbox):
+    def __init__(self,jsondict,tile,jsonhitbox,sim=None,pool=None):
         '''
         Initializes a lane with given tile and a JSON of level and JSON of objects
 
         The objects of the lane are put into a list and the list (if there are objects)
-        are created with the lane. The objects are also assigned speeds.
+        are created with the lane. The positions of the objects are owned by the model
+        sim. The lane draws the objects with a LaneBatch, and only copies the positions
+        into the images when they are asked for. The images are acquired from pool, and
+        released to it again when the lane no longer needs them.
 
         Parameter jsondictlvl: The JSON for level
         Precondition: jsondictlvl is a JSON file
@@ -77,50 +103,186 @@ class Lane(object):         # You are permitted to change the parent class if yo
 
         Paramter tile: The row number
         Precondition: tile is an integer
+
+        Parameter sim: The model of this lane (a new one is made if it is None)
+        Precondition: sim is a SimLane for row tile, or None
+
+        Parameter pool: The pool of images (a new one is made if it is None)
+        Precondition: pool is a GPool of GImages with angle 0 by default, or None
         '''
         self._jsondict = jsondict
         self._tiles = tile
         self._safe = []
+        self._shown = []
         self._jsonhitbox = jsonhitbox
         self._objs = []
-        self._singlelane = self._jsondict['lanes'][self._tiles]
-
-        if 'speed' in self._singlelane:
-            self._speed = self._singlelane['speed']
-            self._buffer = self._jsondict['offscreen']
-
-        if 'objects' in self._singlelane:
-            objects = jsondict['lanes'][self._tiles]['objects']
-            for i in range(len(objects)):
-                type = objects[i]['type']
-                object = GImage(x = objects[i]['position'] * GRID_SIZE + GRID_SIZE/2,
-                 y = GRID_SIZE * tile + GRID_SIZE/2, source= objects[i]['type'] +'.png',
-                 hitbox = self._jsonhitbox['images'][type]['hitbox'])
-                if 'speed' in self._singlelane and self._jsondict['lanes'][tile]['speed'] <0:
-                    object.angle = 180
-                self._objs.append(object)
+        self._pool = GPool(GImage,angle=0) if pool is None else pool
+        self._sim = SimLane(jsondict,tile,jsonhitbox) if sim is None else sim
+        self._load()
+        self._batch = LaneBatch(self._objs,self._sim)
+        self._view = None
+
+    def reload(self,jsondict,tile,sim):
+        '''
+        Makes this lane the lane at row tile of jsondict, using its images again
+
+        This is for a level with a moving window of lanes (see EndlessLevel in level.py).
+        The tile of the lane is moved in place, and the obstacle images go back to the
+        pool and are acquired again for the new obstacles. The new lane must have the
+        same type as this one.
+
+        Parameter jsondict: The JSON for level
+        Precondition: jsondict is a JSON file
+
+        Paramter tile: The row number
+        Precondition: tile is an integer
+
+        Parameter sim: The model of the new lane
+        Precondition: sim is a SimLane for row tile
+        '''
+        self._jsondict = jsondict
+        self._tiles = tile
+        self._sim = sim
+        for safefrog in self._safe:
+            self._hideSafe(safefrog)
+        del self._safe[:]
+        del self._shown[:]
+        self._tile.bottom = tile*GRID_SIZE
+        self._load()
+        self._batch.reload(self._objs,sim)
 
     def update(self,dt):
-        for obj in self._objs:
-            if 'speed' in self._singlelane:
-                obj.x += self._speed * dt
-                if obj.x < (-1 * self._buffer * GRID_SIZE):
-                    d = (-1 * self._buffer * GRID_SIZE) - obj.x
-                    obj.x = (self._jsondict['size'][0]*GRID_SIZE + self._buffer * GRID_SIZE) - d
-                elif obj.x > (self._jsondict['size'][0]*GRID_SIZE) + self._buffer * GRID_SIZE:
-                    d = self._jsondict['size'][0]*GRID_SIZE + self._buffer * GRID_SIZE - obj.x
-                    obj.x = -1 * self._buffer * GRID_SIZE - d
+        '''
+        Moves the objects in the lane (only use this if the lane owns its model)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        '''
+        self._sim.update(dt)
 
     # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
-    def draw(self,view):
+    def findObstacles(self,left,right):
+        '''
+        Returns the objects (GImages) in the lane whose hitboxes overlap [left,right]
+
+        The objects are in the order they appear in the level file. This uses the
+        sorted index of the lane model, so it only looks at the objects near the range.
+
+        Parameter left: The left end of the range
+        Precondition: left is a number
+
+        Parameter right: The right end of the range
+        Precondition: right is a number
+        '''
+        self._sync()
+        return [self._objs[i] for i in self._sim.overlapping(left,right)]
+
+    def positionsAt(self,t):
+        '''
+        Returns the obstacle centers (a NumPy array) once the lane has moved t seconds
+
+        This is computed in closed form by the lane model, without moving anything.
+
+        Parameter t: The lane time
+        Precondition: t is a number
+        '''
+        return self._sim.positionsAt(t)
+
+    def occupied(self,left,right,t=None):
+        '''
+        Returns True if an obstacle overlaps [left,right] at lane time t
+
+        This is answered by the lane model in O(log n) time, without moving anything.
+
+        Parameter left: The left end of the range
+        Precondition: left is a number
+
+        Parameter right: The right end of the range
+        Precondition: right is a number
+
+        Parameter t: The lane time (None for the current time)
+        Precondition: t is a number or None
+        '''
+        return self._sim.occupied(left,right,t)
+
+    def show(self,view):
         """
-        Draws a lane, objects in the lane, and the safe frog is frog reaches exit
+        Adds the tile, the objects and the safe frogs of the lane to view
+
+        The lane keeps them in the view (adding and removing safe frogs as exits are
+        taken) until it is hidden. Each frame only has to animate the lane.
+
+        Parameter view: The view to show the lane in
+        Precondition: view is a GView in retained mode
         """
-        self._tile.draw(view)
-        for obj in self._objs:
-            obj.draw(view)
+        self._view = view
+        view.add(self._tile,LAYER_TILES)
+        view.add(self._batch,LAYER_OBJECTS)
         for safefrog in self._safe:
-            safefrog.draw(view)
+            view.add(safefrog,LAYER_OBJECTS)
+
+    def hide(self):
+        """
+        Removes the tile, the objects and the safe frogs of the lane from its view
+        """
+        if not self._view is None:
+            self._view.remove(self._tile)
+            self._view.remove(self._batch)
+            for safefrog in self._safe:
+                self._view.remove(safefrog)
+        self._view = None
+
+    def animate(self,lag=0.0):
+        """
+        Moves the objects of the lane to where the model has them
+
+        The objects are drawn where they were lag seconds ago, so that a level with a
+        fixed time step can draw between two steps.
+
+        Parameter lag: How far (in seconds) behind the model to draw the objects
+        Precondition: lag is a float >= 0
+        """
+        self._batch.animate(lag)
+
+    def _hideSafe(self,safefrog):
+        '''
+        Removes a safe frog from the view (if the lane is shown) and releases it
+
+        Parameter safefrog: The safe frog
+        Precondition: safefrog is a GImage in _safe
+        '''
+        if not self._view is None:
+            self._view.remove(safefrog)
+        self._pool.release(safefrog)
+
+    def _sync(self):
+        '''
+        Copies the obstacle positions from the model into the images
+        '''
+        xs = self._sim.getPositions().tolist()    # GObject wants Python floats
+        for (obj,x) in zip(self._objs,xs):
+            if obj.x != x:
+                obj.x = x
+
+    def _load(self):
+        '''
+        Puts the objects of the lane in the JSON into _objs, acquired from the pool
+
+        The images that were in _objs are released to the pool first.
+        '''
+        singlelane = self._jsondict['lanes'][self._tiles]
+        objects = singlelane.get('objects',[])
+        self._type = singlelane['type']
+        for object in reversed(self._objs):
+            self._pool.release(object)
+        self._objs = []
+        angle = 180 if singlelane.get('speed',0) < 0 else 0
+        for i in range(len(objects)):
+            type = objects[i]['type']
+            object = self._pool.acquire(x = objects[i]['position'] * GRID_SIZE + GRID_SIZE/2,
+             y = GRID_SIZE * self._tiles + GRID_SIZE/2, source= type +'.png',
+             hitbox = self._jsonhitbox['images'][type]['hitbox'], angle = angle)
+            self._objs.append(object)
 
 
 class Grass(Lane):                           # We recommend AGAINST changing this one
@@ -131,7 +293,7 @@ class Grass(Lane):                           # We recommend AGAINST changing thi
     with this class if you are adding additional features like a snake in the grass
     (which the original Frogger does on higher difficulties).
     """
-    def __init__(self,jsondict,tile,jsonhitbox):
+    def __init__(self,jsondict,tile,jsonhitbox,sim=None,pool=None):
         '''
         Initializes a Grass lane with given tile and a JSON of level and JSON of objects
 
@@ -147,7 +309,7 @@ class Grass(Lane):                           # We recommend AGAINST changing thi
         Paramter tile: The row number
         Precondition: tile is an integer
         '''
-        super().__init__(jsondict,tile,jsonhitbox)
+        super().__init__(jsondict,tile,jsonhitbox,sim,pool)
         self._tile = GTile(left = 0, bottom = self._tiles*GRID_SIZE,
         width=self._jsondict['size'][0]*GRID_SIZE,height=GRID_SIZE, source= 'grass' +'.png')
     # ONLY ADD CODE IF YOU ARE WORKING ON EXTRA CREDIT EXTENSIONS.
@@ -162,7 +324,7 @@ class Road(Lane):                           # We recommend AGAINST changing this
     than other lanes as they have cars that can kill the frog. Therefore, this class
     does need a method to tell whether or not the frog is safe.
     """
-    def __init__(self,jsondict,tile,jsonhitbox):
+    def __init__(self,jsondict,tile,jsonhitbox,sim=None,pool=None):
         '''
         Initializes a Road lane with given tile and a JSON of level and JSON of objects
 
@@ -178,7 +340,7 @@ class Road(Lane):                           # We recommend AGAINST changing this
         Paramter tile: The row number
         Precondition: tile is an integer
         '''
-        super().__init__(jsondict,tile,jsonhitbox)
+        super().__init__(jsondict,tile,jsonhitbox,sim,pool)
         self._tile = GTile(left = 0, bottom = self._tiles*GRID_SIZE,
          width=self._jsondict['size'][0]*GRID_SIZE,height=GRID_SIZE, source= 'road' +'.png')
 
@@ -192,12 +354,9 @@ class Road(Lane):                           # We recommend AGAINST changing this
         road and False if not.
 
         Paramater Frog: A frog object
-        Precondition: Frog is a GImage
+        Precondition: Frog is a Frog (see models.py) or a SimFrog
         '''
-        for image in self._objs:
-            if frog.collides(image):
-                return True
-        return False
+        return self._sim.collideCar(frog.bbox())
 
 
 class Water(Lane):
@@ -214,7 +373,7 @@ class Water(Lane):
     frog moves at the same rate as all of the logs.
     """
 
-    def __init__(self,jsondict,tile,jsonhitbox):
+    def __init__(self,jsondict,tile,jsonhitbox,sim=None,pool=None):
         '''
         Initializes a Water lane with given tile and a JSON of level and JSON of objects
 
@@ -230,7 +389,7 @@ class Water(Lane):
         Paramter tile: The row number
         Precondition: tile is an integer
         '''
-        super().__init__(jsondict,tile,jsonhitbox)
+        super().__init__(jsondict,tile,jsonhitbox,sim,pool)
         self._tile = GTile(left = 0, bottom = self._tiles*GRID_SIZE,
         width=self._jsondict['size'][0]*GRID_SIZE,height=GRID_SIZE, source= 'water' +'.png')
 
@@ -240,14 +399,7 @@ class Water(Lane):
         This method returns 'lose life in water' if the frog moved offscreen
         on the log or is in the water, but returns 'safe' if on a log. This also
         moves the frog with the log if the frog is on the log'''
-        for image in self._objs:
-            if image.contains((frog.x,frog.y)) or animation is not None:
-                frog.x += self._speed * dt
-                if frog.x<0 or frog.x > width:
-                    return 'lose life in water'
-                else:
-                    return 'safe'
-        return 'lose life in water'
+        return self._sim.onLog(frog,width,animation,dt)
 
 
 class Hedge(Lane):
@@ -270,7 +422,7 @@ class Hedge(Lane):
     (unlike Road and Water) will need an initializer. Remember to user super() to combine
     it with the initializer for the Lane.
     """
-    def __init__(self,jsondict,tile,jsonhitbox):
+    def __init__(self,jsondict,tile,jsonhitbox,sim=None,pool=None):
         '''
         Initializes a Hedge lane with given tile and a JSON of level and JSON of objects
 
@@ -286,10 +438,9 @@ class Hedge(Lane):
         Paramter tile: The row number
         Precondition: tile is an integer
         '''
-        super().__init__(jsondict,tile,jsonhitbox)
+        super().__init__(jsondict,tile,jsonhitbox,sim,pool)
         self._tile = GTile(left = 0, bottom = self._tiles*GRID_SIZE,
         width=self._jsondict['size'][0]*GRID_SIZE,height=GRID_SIZE, source= 'hedge' +'.png')
-        self._occupiedexits = []
 
     # LIST ALL HIDDEN ATTRIBUTES HERE
 
@@ -310,41 +461,129 @@ class Hedge(Lane):
         the frog is trying to move down into an exit. If this is attempted, function returns
         that it is in neither a exit or opening and is treated like a normal hedge.
         '''
-        for image in self._objs:
-            if image.contains((frog.x,(frog.y))):
-                if image.source == 'exit.png':
-                    if image in self._occupiedexits or direction == 'down':
-                        return 'not in object'
-                    else:
-                        safefrog = GImage(x = image.x,y = image.y, source= 'safe.png')
-                        self._safe.append(safefrog)
-                        self._occupiedexits.append(image)
-                        return 'is exit'
-                elif image.source == 'open.png':
-                    return 'is opening'
-        return 'not in object'
+        return self._sim.canCont(frog,direction)
 
     def getNumExits(self):
         '''
         Returns the number of exits that exits.
 
-        This method uses an accumulator and goes through the number of exits in
-        the water lane and adds the amount of exits to x. The x is then returned.
+        This method asks the model of the lane, which counts the exits in the
+        hedge objects.
         '''
-        x = 0
-        for i in self._jsondict['lanes'][self._tiles]['objects']:
-            if i['type'] == 'exit':
-                x+=1
-        return x
+        return self._sim.getNumExits()
 
     def getNumOccupied(self):
         '''
         Returns the number of occupied exits in lane
 
-        This checks the number of objects stored in the list (self._occupiedexits)
-        of occupied exits and returns the number of occupies exits (the length
-        of the list that stores exits)
+        This asks the model of the lane, which keeps the list of occupied exits
+        and returns the number of occupied exits (the length of that list)
+        '''
+        return self._sim.getNumOccupied()
+
+    def animate(self,lag=0.0):
+        """
+        Moves the objects of the hedge, adding a safe frog for each new taken exit
+
+        Parameter lag: How far (in seconds) behind the model to draw the objects
+        Precondition: lag is a float >= 0
+        """
+        self._sync()
+        super().animate(lag)
+
+    def _sync(self):
         '''
-        return len(self._occupiedexits)
+        Copies the model into the images, adding a safe frog for each new taken exit
+
+        If the model was restored to an earlier state, the safe frogs of the exits that
+        are no longer taken are removed first. The safe frogs are also added to and
+        removed from the view, if the hedge is shown.
+        '''
+        super()._sync()
+        occupied = self._sim.getOccupied()
+        keep = 0
+        while keep < min(len(self._shown),len(occupied)) and self._shown[keep] == occupied[keep]:
+            keep += 1
+        for safefrog in self._safe[keep:]:
+            self._hideSafe(safefrog)
+        del self._safe[keep:]
+        del self._shown[keep:]
+        for i in occupied[keep:]:
+            image = self._objs[i]
+            safefrog = self._pool.acquire(x = image.x,y = image.y, source= FROG_SAFE,
+                                          hitbox = (0,0,0,0))
+            self._safe.append(safefrog)
+            self._shown.append(i)
+            if not self._view is None:
+                self._view.add(safefrog,LAYER_OBJECTS)
 
 # IF YOU NEED ADDITIONAL LANE CLASSES, THEY GO HERE
+class LaneBatch(GBatch):
+    """
+    A class that draws all of the obstacles of a lane as a single mesh.
+
+    Drawing every obstacle as its own GImage takes about six canvas instructions per
+    obstacle. This batch instead has one mesh per texture, and every obstacle texture
+    is a region of the texture atlas, so a lane is one mesh.
+
+    The model of the lane is a fixed obstacle pattern plus a phase. The mesh holds the
+    pattern (with the obstacles that have wrapped moved back one wrap length), and the
+    phase is the origin of the batch. So each frame only changes one Translate, and the
+    vertices are only rewritten when an obstacle wraps around.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _sim: The model of the lane, which owns the obstacle positions
+    # Invariant: _sim is a SimLane with one position for each image in the batch
+
+    # Attribute _lapped: The obstacles that had wrapped when the vertices were written
+    # Invariant: _lapped is a list of obstacle indices, or None before the first animate
+
+    def __init__(self,images,sim):
+        '''
+        Initializes a batch drawing the obstacles images at the positions in sim
+
+        Parameter images: The obstacle images of the lane, in the order of the model
+        Precondition: images is a (possibly empty) list of GImages
+
+        Parameter sim: The model of the lane
+        Precondition: sim is a SimLane with one obstacle for each image
+        '''
+        super().__init__(images)
+        self._sim = sim
+        self._lapped = None
+
+    def reload(self,images,sim):
+        '''
+        Makes this batch draw the obstacles images at the positions in sim instead
+
+        Parameter images: The obstacle images of the lane, in the order of the model
+        Precondition: images is a (possibly empty) list of GImages
+
+        Parameter sim: The model of the lane
+        Precondition: sim is a SimLane with one obstacle for each image
+        '''
+        self.load(images)
+        self._sim = sim
+        self._lapped = None
+
+    def animate(self,lag=0.0):
+        '''
+        Moves the obstacles to their positions in the model
+
+        If lag is not 0, the obstacles are put where they were lag seconds ago. The
+        lane motion is closed form, so this is exact (even if an obstacle wrapped).
+
+        Parameter lag: How far (in seconds) behind the model to put the obstacles
+        Precondition: lag is a float >= 0
+        '''
+        if lag:
+            time = self._sim.getTime()-lag
+            (phase,lapped) = (self._sim.phaseAt(time),self._sim.lappedAt(time))
+        else:
+            (phase,lapped) = (self._sim.getPhase(),self._sim.getLapped())
+        if lapped != self._lapped:
+            xs = self._sim.getPattern().copy()
+            xs[lapped] -= self._sim.getPeriod()
+            self.move(xs)
+            self._lapped = lapped
+        self.origin = (phase,0)
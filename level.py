@@ -4,13 +4,18 @@ Subcontroller module for frogger
 This module contains the subcontroller to manage a single level in the frogger game.
 
 The subcontroller Level manages the frog and all of the obstacles(defined in models.py).
-This module contains the level class and all of the individual lanes.
+This module contains the level class and all of the individual lanes. The game
+itself is played by the model in simulation.py; Level only keeps the images in step
+with that model. EndlessLevel is the subcontroller of the endless level (see
+endless.py), which makes up its lanes as the frog goes forward.
 
 """
 from game2d import *
 from consts import *
 from lanes  import *
 from models import *
+from simulation import *
+from endless import *
 
 
 class Level(object):
@@ -43,23 +48,47 @@ class Level(object):
     # Attribute _lanes: The list of tiles(type of lane) of the Level
     # Invariant: _lanes is a list containing GTiles
 
-    # Attribute _frog: The frog that the player uses to play the game
-    # Invariant: _frog is a Frog object
+    # Attribute _bytype: The lanes of each type, bottom to top
+    # Invariant: _bytype is a dict from lane type to a list of Lane objects
+
+    # Attribute _frog: The image of the frog that the player uses to play the game
+    # Invariant: _frog is a Frog object, or None if the model has no frog
+
+    # Attribute _frogs: The pool of frog images, so a new frog does not make a new image
+    # Invariant: _frogs is a GPool of Frog objects, none of them _frog
+
+    # Attribute _images: The pool of the obstacle and safe frog images of the lanes
+    # Invariant: _images is a GPool of GImages, with angle 0 by default
 
     # Attribute _livesimg : A list of the frog images in the lives display
-    # Invariant: _livesimg is a non empty/empty list of GImage
+    # Invariant: _livesimg is a non empty/empty list of GImage, the last images of _heads
+
+    # Attribute _heads : All of the frog images of the lives display, right to left
+    # Invariant: _heads is a list of GImage
 
     # Attribute _livestext : The 'lives' text in the lives display
     # Invariant: _livestext is a GLabel
 
-    # Atttribute _animator: Whether animating or not
-    # Invariant: _aniamtor is None if nothing to animate or frog object of generator
+    # Attribute _sim: The model that plays the level (frog, lanes and lives)
+    # Invariant: _sim is a SimLevel, and the lanes share its SimLanes
 
     # Attribute _hitbox : json of the objects with the hitboxes
     # Invariant: _hitbox is a JSON dict
 
-    # Attribute _input: Object of what the input is (up,down,left,or right)
-    # Invariant: _input is a GInput
+    # Attribute _last: The position (x,y) of the model frog before the last update
+    # Invariant: _last is a pair of floats, or None if the frog is new since then
+
+    # Attribute _dt: The time of the last update
+    # Invariant: _dt is a float >= 0
+
+    # Attribute _recorder: The recording of the updates of this level
+    # Invariant: _recorder is a Recorder (see recording.py), or None if not recording
+
+    # Attribute _history: The recent updates of this level, to go back through
+    # Invariant: _history is a RewindBuffer (see recording.py), or None if not kept
+
+    # Attribute _view: The view that the level is shown in (see show)
+    # Invariant: _view is a GView in retained mode, or None if the level is not shown
 
     # Attribute _width: Width of the level window
     # Invariant: _width is an int
@@ -72,8 +101,47 @@ class Level(object):
         '''returns the list of lanes (lane objects) in a level'''
         return self._lanes
 
+    def getLanesOfType(self,type):
+        '''
+        returns the list of lanes (bottom to top) of a type in a level
+
+        Parameter type: The lane type
+        Precondition: type is one of 'grass', 'road', 'water' or 'hedge'
+        '''
+        return self._bytype.get(type,[])
+
+    def getRecorder(self):
+        '''Returns the recording of the updates of this level (None if not recording)'''
+        return self._recorder
+
+    def setRecorder(self,recorder):
+        '''
+        Records every update of this level from now on with recorder
+
+        Parameter recorder: The recording to add to (None to stop recording)
+        Precondition: recorder is a Recorder (see recording.py) or None
+        '''
+        self._recorder = recorder
+
+    def getHistory(self):
+        '''Returns the buffer of recent updates of this level (None if not kept)'''
+        return self._history
+
+    def setHistory(self,history):
+        '''
+        Keeps the recent updates of this level from now on in history (see rewind)
+
+        Parameter history: The buffer to add to (None to stop keeping them)
+        Precondition: history is a RewindBuffer (see recording.py) or None
+        '''
+        self._history = history
+
+    def hasFrog(self):
+        '''Returns True if the level has a frog, False if it must be reconstructed'''
+        return not self._sim.getFrog() is None
+
     # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
-    def __init__(self,jsondictlvl,jsonhitbox):
+    def __init__(self,jsondictlvl,jsonhitbox,sim=None):
         """
         Initializes a level with given level JSON and
 
@@ -85,36 +153,40 @@ class Level(object):
 
         Paramter jsonhitbox: The JSON for objects and the hitboxes
         Precondition: jsonhitbox is a JSON file
+
+        Parameter sim: The model of the level (a new SimLevel is made if it is None)
+        Precondition: sim is a SimLevel for jsondictlvl, or None
         """
         self._level = jsondictlvl
         self._hitbox = jsonhitbox
+        self._images = GPool(GImage,angle=0)
+        self._frogs = GPool(Frog,jsondictlvl)
 
+        self._sim = SimLevel(jsondictlvl,jsonhitbox) if sim is None else sim
         self._lanes = []
-        lanes = self._level['lanes']
-        for tile in range(len(lanes)):
-            if lanes[tile]['type'] == 'grass':
-                lane = Grass(jsondictlvl,tile,jsonhitbox)
-            elif lanes[tile]['type'] == 'water':
-                lane = Water(jsondictlvl,tile,jsonhitbox)
-            elif lanes[tile]['type'] == 'road':
-                lane = Road(jsondictlvl,tile,jsonhitbox)
-            elif lanes[tile]['type'] == 'hedge':
-                lane = Hedge(jsondictlvl,tile,jsonhitbox)
-            self._lanes.append(lane)
-
-        self._animator = None
-        self._frog = Frog(jsondictlvl)
+        self._bytype = {}
+        for lane in self._sim.getLanes():
+            self._lanes.append(self._makeLane(lane))
+            self._bytype.setdefault(lane.getType(),[]).append(self._lanes[-1])
+
+        self._frog = self._frogs.acquire()
+        self._last = None
+        self._dt = 0.0
+        self._recorder = None
+        self._history = None
+        self._view = None
         self._width = self._level['size'][0] * GRID_SIZE
         self._height= self._level['size'][1] * GRID_SIZE
 
         self._livesimg=[]
         for i in range(3):
             frog = GImage(x = (self._width- GRID_SIZE/2) - (i*GRID_SIZE),
-            y =GRID_SIZE * len(lanes)+ GRID_SIZE/2, width = GRID_SIZE,
+            y =self._height+ GRID_SIZE/2, width = GRID_SIZE,
             height = GRID_SIZE,source=FROG_HEAD)
             self._livesimg.append(frog)
+        self._heads = list(self._livesimg)
         self._livestext = GLabel(text = "lives:",font_name="AlloyInk.ttf",
-        font_size =48,y = GRID_SIZE * len(lanes) + GRID_SIZE/2,
+        font_size =48,y = self._height + GRID_SIZE/2,
         linecolor = 'dark green')
         self._livestext.right = self._livesimg[2].left
 
@@ -122,10 +194,10 @@ class Level(object):
         """
         Animates the frog slide.
 
-        In this method the frog is moved based on input and it checks whether it can
-        move (cannot move if going into a hedge or offscreen). The lanes are also updated
-        and the method checks if the frog is in the water or collides with a car. If
-        the frog does, the update also takes off a life from the display.
+        In this method the model of the level is moved forward one frame: the frog is
+        moved based on input (it cannot move into a hedge or offscreen), the lanes are
+        updated, and the model checks if the frog is in the water or collides with a
+        car. If the frog dies, the update also takes off a life from the display.
 
         Parameter dt: The arrow key pressed by user
         Precondition: input is 'up', 'down','left', or 'right'
@@ -133,59 +205,185 @@ class Level(object):
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
         """
-        self._input = input
-        if self._animator is not None:          # We have something to animate
-            try:
-                self._animator.send(dt)
-            except StopIteration:
-                self._animator = None
-        elif self._input.is_key_down('up'):
-            return self._moveUp()
-        elif self._input.is_key_down('down'):
-            return self._moveDown()
-        elif self._input.is_key_down('left'):
-            self._moveLeft()
-        elif self._input.is_key_down('right'):
-            self._moveRight()
+        frog = self._sim.getFrog()
+        self._last = None if frog is None else (frog.x,frog.y)
+        self._dt = dt
+        if not self._recorder is None:
+            self._recorder.record(self._sim,input,dt)
+        if not self._history is None:
+            self._history.record(self._sim,input,dt)
+        result = self._sim.update(input,dt)
+        self._matchFrog()
+        self._matchLives()
+        return result
+
+    # DRAW METHODS TO SHOW THE FROG AND THE INDIVIDUAL LANES
+    def show(self,view):
+        """
+        Adds the lanes, frog, and lives display to view.
 
+        The level keeps its images in the view (adding and removing them as the frog
+        and the lives come and go) until it is hidden. Each frame only has to animate
+        the level.
+
+        Parameter view: The view to show the level in
+        Precondition: view is a GView in retained mode
+        """
+        self._view = view
         for lane in self._lanes:
-            lane.update(dt)
-            if isinstance(lane,Water) and lane.getTile().collides(self._frog):
-                if self._animator is None:
-                    if lane.onLog(self._frog,
-                    self._width,self._animator,dt) == 'lose life in water':
-                        self._livesimg.pop(0)
-                        self._frog = None
-                        self._animator = None
-                        if len(self._livesimg)>0:
-                            return 'more lives left'
-                        else:
-                            return 'no lives left'
-
-        if self._checkCarCollisions():
-                return self._changeLives()
-
-    # DRAW METHOD TO DRAW THE FROG AND THE INDIVIDUAL LANES
-    def draw(self,view):
+            lane.show(view)
+        if not self._frog is None:
+            view.add(self._frog,LAYER_FROG)
+        for frog in self._livesimg:
+            view.add(frog,LAYER_DISPLAY)
+        view.add(self._livestext,LAYER_DISPLAY)
+
+    def hide(self):
+        """
+        Removes the lanes, frog, and lives display from the view of the level.
+        """
+        if not self._view is None:
+            for lane in self._lanes:
+                lane.hide()
+            self._view.remove(self._frog)
+            for frog in self._livesimg:
+                self._view.remove(frog)
+            self._view.remove(self._livestext)
+        self._view = None
+
+    def animate(self,alpha=1.0):
         """
-        Draws the lane,frog, and lives display into view.
+        Moves the lanes and the frog to where the model has them.
+
+        If alpha is less than 1, the lanes and the frog are drawn alpha of the way from
+        where they were before the last update to where they are now. This is for a game
+        with a fixed time step (see GameApp.alpha), which may draw between two updates.
+
+        Parameter alpha: How far to draw from the last update to the current one
+        Precondition: alpha is a float in [0,1]
         """
+        lag = (1-alpha)*self._dt
         for lane in self._lanes:
-            lane.draw(view)
+            lane.animate(lag)
         if not self._frog == None:
-            self._frog.draw(view)
-        for frog in self._livesimg:
-            frog.draw(view)
-        self._livestext.draw(view)
+            self._frog.follow(self._sim.getFrog(),None if alpha == 1 else self._last,alpha)
 
     # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
     def reconstructFrog(self):
         '''
         Reconstructs a frog after state_paused
 
-        The function recreates the Frog(object) after frog was assigned None.
+        The function recreates the Frog(object) after frog was assigned None. The
+        image of the frog is acquired from a pool, so it is the image of an earlier frog
+        if there was one.
+        '''
+        self._sim.reconstructFrog()
+        self._matchFrog()
+        self._last = None
+
+    def snapshot(self):
+        '''
+        Returns the whole state of the level as a flat NumPy array of floats
+
+        Everything on the screen (the lanes, the frog, the lives and the safe frogs)
+        is drawn from the model, so this is the snapshot of the model (see
+        SimLevel.snapshot). It is cheap enough to take every frame.
+        '''
+        return self._sim.snapshot()
+
+    def restore(self,data):
         '''
-        self._frog = Frog(self._level)
+        Puts the level back in the state of a snapshot
+
+        The images follow the model the next time the level is drawn. The frog is
+        drawn where the model puts it (without interpolation) until the next update.
+
+        Parameter data: The state of the level
+        Precondition: data is a value returned by snapshot for this level
+        '''
+        self._sim.restore(data)
+        self._sync()
+
+    def rewind(self,ticks):
+        '''
+        Puts the level back the given number of updates, and returns how many it went
+
+        The level can only go back as far as its history (see setHistory), so it may
+        go back fewer updates. The updates that are undone are also taken out of the
+        recording, if there is one, so the recording stays a replay of the game. As
+        with restore, the images follow the model the next time the level is drawn.
+
+        Parameter ticks: The number of updates to undo
+        Precondition: ticks is an int >= 0
+        '''
+        assert type(ticks) == int and ticks >= 0, '%s is not a number of ticks' % repr(ticks)
+        if self._history is None:
+            return 0
+        tick = self._history.getTick()
+        ticks = tick-self._history.rewind(self._sim,tick-ticks)
+        if ticks > 0:
+            if not self._recorder is None:
+                self._recorder.truncate(max(0,self._recorder.getTicks()-ticks))
+            self._sync()
+        return ticks
+
+    def _sync(self):
+        '''
+        Makes the frog and the lives display match the model, after it has jumped
+        '''
+        self._matchFrog()
+        self._matchLives()
+        self._last = None
+
+    def _matchFrog(self):
+        '''
+        Acquires a frog image if the model has a frog, or releases it if not
+
+        The image is also added to or removed from the view, if the level is shown.
+        '''
+        if self._sim.getFrog() is None and not self._frog is None:
+            if not self._view is None:
+                self._view.remove(self._frog)
+            self._frogs.release(self._frog)
+            self._frog = None
+        elif not self._sim.getFrog() is None and self._frog is None:
+            self._frog = self._frogs.acquire()
+            if not self._view is None:
+                self._view.add(self._frog,LAYER_FROG)
+
+    def _matchLives(self):
+        '''
+        Makes the lives display show one frog image for each life left in the model
+
+        The images are also added to or removed from the view, if the level is shown.
+        '''
+        lives = min(self._sim.getLives(),len(self._heads))
+        shown = self._heads[len(self._heads)-lives:]
+        if not self._view is None:
+            for frog in self._livesimg:
+                if not frog in shown:
+                    self._view.remove(frog)
+            for frog in shown:
+                if not frog in self._livesimg:
+                    self._view.add(frog,LAYER_DISPLAY)
+        self._livesimg = shown
+
+    def _makeLane(self,sim):
+        '''
+        Returns a new lane (of the type of sim) drawing the model sim
+
+        Parameter sim: The model of the lane
+        Precondition: sim is a SimLane of this level
+        '''
+        tile = sim.getRow()
+        if sim.getType() == 'grass':
+            return Grass(self._level,tile,self._hitbox,sim,self._images)
+        elif sim.getType() == 'water':
+            return Water(self._level,tile,self._hitbox,sim,self._images)
+        elif sim.getType() == 'road':
+            return Road(self._level,tile,self._hitbox,sim,self._images)
+        elif sim.getType() == 'hedge':
+            return Hedge(self._level,tile,self._hitbox,sim,self._images)
 
     def isWon(self,lane):
         '''
@@ -200,137 +398,199 @@ class Level(object):
         '''
         return lane.getNumExits() != lane.getNumOccupied()
 
-    def _moveUp(self):
-        '''
-        Moves the frog forward and checks for collisions with objects.
-
-        The function moves the frog forward and changes the angle to north. It also
-        checks if the frog is trying to go into a hedge or an exit. If the frog goes
-        into an exit it returns "in exit". This function calls the coroutine to animate
-        the frog moving up.
-        '''
-        self._frog.angle = FROG_NORTH
-        if self._frog.y + GRID_SIZE <= self._height:
-            self._frog.y += GRID_SIZE
-            collide = self._checkCollide('up')
-            self._frog.y -= GRID_SIZE
-            if collide != 'cannot go':
-                self._animator = self._frog.animateFrogVert('up')
-                next(self._animator)
-            if collide == 'is exit':
-                self._frog = None
-                return 'in exit'
-
-    def _moveDown(self):
-        '''
-        Moves the frog downward and checks for collisions with objects.
-
-        The function moves the frog downward and changes the angle to south. It also
-        checks if the frog is trying to go into a hedge or an exit. If the frog goes
-        into an exit it returns "in exit". This function calls the coroutine to animate
-        the frog moving down.
-        '''
-        self._frog.angle = FROG_SOUTH
-        if self._frog.y - GRID_SIZE >= 1:
-            self._frog.y -= GRID_SIZE
-            collide = self._checkCollide('down')
-            if collide == 'cannot go':
-                self._frog.y += GRID_SIZE
-            else:
-                self._frog.y += GRID_SIZE
-                self._animator = self._frog.animateFrogVert('down')
-                next(self._animator)
-            if collide == 'is exit':
-                self._frog = None
-                return 'in exit'
-
-    def _moveLeft(self):
-        '''
-        Moves the frog left and checks for collisions with objects.
-
-        The function moves the frog forward and changes the angle to west. It also
-        checks if the frog is trying to go into a hedge.
-        This function calls the coroutine to animate the frog moving left.
-        '''
-        self._frog.angle = FROG_WEST
-        if self._frog.x - GRID_SIZE >= 1:
-            self._frog.x -= GRID_SIZE
-            if self._checkCollide('left') == 'cannot go':
-                self._frog.x += GRID_SIZE
-            else:
-                self._frog.x += GRID_SIZE
-                self._animator = self._frog.animateFrogHor('left')
-                next(self._animator)
+    def positionsAt(self,t):
+        '''
+        Returns the obstacle centers of every lane once the lanes have moved t seconds
+
+        The result is a list of NumPy arrays (one per lane, bottom to top), computed in
+        closed form by the model without stepping the level.
 
-    def _moveRight(self):
+        Parameter t: The lane time
+        Precondition: t is a number
         '''
-        Moves the frog right and checks for collisions with objects.
+        return self._sim.positionsAt(t)
 
-        The function moves the frog forward and changes the angle to east. It also
-        checks if the frog is trying to go into a hedge.This function calls the
-        coroutine to animate the frog moving up.
+    def occupied(self,row,left,right,t=None):
         '''
-        self._frog.angle = FROG_EAST
-        if self._frog.x + GRID_SIZE <= self._width:
-            self._frog.x += GRID_SIZE
-            if self._checkCollide('right') == 'cannot go':
-                self._frog.x -= GRID_SIZE
+        Returns True if an obstacle in the lane at row overlaps [left,right] at time t
+
+        Parameter row: The row of the lane
+        Precondition: row is a valid index into getLanes()
+
+        Parameter left: The left end of the range
+        Precondition: left is a number
+
+        Parameter right: The right end of the range
+        Precondition: right is a number
+
+        Parameter t: The lane time (None for the current time)
+        Precondition: t is a number or None
+        '''
+        return self._sim.occupied(row,left,right,t)
+
+    def isComplete(self):
+        '''
+        Returns True if every exit in every hedge of the level is taken.
+
+        The model keeps a count of the exits left, so this does not look at the lanes.
+        '''
+        return self._sim.getExitsLeft() == 0
+
+
+class EndlessLevel(Level):
+    """
+    This class controls the endless level (see endless.py).
+
+    The model is a SimEndless, which only has ENDLESS_ROWS lanes at a time. When the
+    model moves its lanes up, the lanes of the rows that scrolled off the bottom are put
+    aside by type, and used again (see Lane.reload) for the new rows of the same type,
+    along with their tiles and obstacle images. So the number of lanes and images stays
+    the same however far the frog goes.
+
+    The lanes and the frog are drawn through a camera that follows the frog. The lives
+    and the distance are drawn on top of them, where they are on the screen.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _spare: The lanes that are not in use, by type
+    # Invariant: _spare is a dict from lane type to a list of Lane objects not in _lanes
+
+    # Attribute _bottom: The row of the lowest lane
+    # Invariant: _bottom is an int, the lowest row of the model after each update
+
+    # Attribute _camera: The camera that the lanes and the frog are drawn through
+    # Invariant: _camera is a GCamera
+
+    # Attribute _distance: The display of the farthest row reached
+    # Invariant: _distance is a GLabel
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getDistance(self):
+        '''Returns the farthest row that the frog has reached'''
+        return self._sim.getReached()
+
+    # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
+    def __init__(self,seed,jsonhitbox):
+        """
+        Initializes the endless level with the given seed
+
+        Parameter seed: The seed of the level (the same seed makes the same lanes)
+        Precondition: seed is an int
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        """
+        jsondict = endlessLevel(seed,jsonhitbox)
+        super().__init__(jsondict,jsonhitbox,SimEndless(jsondict,jsonhitbox))
+        self._spare = {}
+        self._bottom = self._sim.getBottom()
+        self._camera = GCamera()
+        self._distance = GLabel(text = "rows: 0",font_name="AlloyInk.ttf",
+        font_size =48,y = self._height + GRID_SIZE/2,
+        linecolor = 'dark green')
+        self._distance.left = GRID_SIZE/2
+
+    def update(self,input,dt):
+        """
+        Animates the frog slide, and moves the lanes up if the model scrolled.
+
+        Parameter input: The user input
+        Precondition: input has a method is_key_down (e.g. GInput)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        """
+        result = super().update(input,dt)
+        if self._sim.getBottom() != self._bottom:
+            self._recycle()
+        return result
+
+    def show(self,view):
+        """
+        Adds the lanes and frog (through the camera) and the displays to view.
+
+        Parameter view: The view to show the level in
+        Precondition: view is a GView in retained mode
+        """
+        self._camera.show(view,LAYER_TILES,LAYER_FROG)
+        super().show(view)
+        view.add(self._distance,LAYER_DISPLAY)
+
+    def hide(self):
+        """
+        Removes the lanes, frog, camera and displays from the view of the level.
+        """
+        if not self._view is None:
+            self._camera.hide(self._view)
+            self._view.remove(self._distance)
+        super().hide()
+
+    def animate(self,alpha=1.0):
+        """
+        Moves the lanes and the frog, and the camera to follow the frog.
+
+        Parameter alpha: How far to draw from the last update to the current one
+        Precondition: alpha is a float in [0,1]
+        """
+        super().animate(alpha)
+        self._follow()
+        text = "rows: %d" % self._sim.getReached()
+        if self._distance.text != text:
+            with batch():
+                self._distance.text = text
+                self._distance.left = GRID_SIZE/2
+
+    # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
+    def _sync(self):
+        '''
+        Makes the frog, the lives display and the lanes match the model, after it has jumped
+        '''
+        super()._sync()
+        self._recycle()
+
+    def _recycle(self):
+        '''
+        Makes the lanes match the lanes of the model, after it scrolled
+
+        The lanes of the rows that are still there are kept. The others are put in
+        _spare (and hidden), and the new rows take a spare lane of their type (or a new
+        lane if there is none), which is shown if the level is.
+        '''
+        sims = self._sim.getLanes()
+        bottom = self._sim.getBottom()
+        keep = {}
+        for lane in self._lanes:
+            if bottom <= lane.getRow() < bottom+len(sims):
+                keep[lane.getRow()] = lane
             else:
-                self._frog.x -= GRID_SIZE
-                self._animator = self._frog.animateFrogHor('right')
-                next(self._animator)
-
-    def _changeLives(self):
-        '''
-        Changes lives display
-
-        Function takes off a frog off of the list of frogs in the lives display.
-        If there are no more frogs left after taking one off, the function
-        returns "no lives left" to indicate all of the lives have been used. The
-        function returns "more lives left" if the list still contaisn frog images
-        (indicating not all lives were lost)
-        '''
-        if len(self._livesimg)>0:
-            self._livesimg.pop(0)
-        if len(self._livesimg)>0:
-            return 'more lives left'
-        else:
-            return 'no lives left'
-
-    def _checkCollide(self,direction):
-         '''
-         Checks for colliding with hedge and whether it is opening or exit in hedge
-
-         The function checks each lane to see if frog is in a hedge lane.
-         If in a hedge lane, function returns "is exit" if the frog is in an exit
-         or 'cannot go' if it is going into an occupied exit or hedge, or 'is opening'
-         if frog is entering a hedge opening.
-
-         Parameter direction: The direction the frog is moving
-         Precondition: direction is 'up,'down','left', or 'right'
-         '''
-         for lane in self._lanes:
-             if isinstance(lane,Hedge) and lane.getTile().collides(self._frog):
-                 if lane.canCont(self._frog,direction) == 'is exit':
-                     return 'is exit'
-                 if lane.canCont(self._frog,direction) == 'not in object':
-                     return 'cannot go'
-                 if lane.canCont(self._frog,direction) == 'is opening':
-                     return 'is opening'
-
-    def _checkCarCollisions(self):
-         '''
-         Check if frog is in any of the road lanes is colliding with a car
-
-         The function loops through all the lanes and checks if the frog is in a
-         Road lane. Then the fucntion checks if the frog collides with any car and
-         if the frog is colliding with a car, frog is set to None and returns True.
-         False is returned if car is not in Road or not colliding with a car.
-         '''
-         for lane in self._lanes:
-             if self._frog is not None:
-                 if isinstance(lane,Road) and lane.getTile().collides(self._frog):
-                     if lane.collideCar(self._frog):
-                         self._frog = None
-                         return True
-         return False
+                lane.hide()
+                self._spare.setdefault(lane.getType(),[]).append(lane)
+
+        self._lanes = []
+        self._bytype = {}
+        for sim in sims:
+            lane = keep.get(sim.getRow())
+            if lane is None and self._spare.get(sim.getType()):
+                lane = self._spare[sim.getType()].pop()
+                lane.reload(self._level,sim.getRow(),sim)
+            elif lane is None:
+                lane = self._makeLane(sim)
+            elif not lane.getSim() is sim:
+                lane.reload(self._level,sim.getRow(),sim)
+            if not self._view is None and not sim.getRow() in keep:
+                lane.show(self._view)
+            self._lanes.append(lane)
+            self._bytype.setdefault(sim.getType(),[]).append(lane)
+        self._bottom = bottom
+
+    def _follow(self):
+        '''
+        Moves the camera so that the frog (if any) is ENDLESS_BEHIND rows from the bottom
+
+        The camera never shows anything outside of the lanes of the model.
+        '''
+        if self._frog is None:
+            return
+        low  = self._bottom*GRID_SIZE
+        high = (self._bottom+ENDLESS_ROWS-ENDLESS_VISIBLE)*GRID_SIZE
+        y = self._frog.y-(ENDLESS_BEHIND+0.5)*GRID_SIZE
+        self._camera.y = min(max(y,low),high)
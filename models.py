@@ -36,69 +36,32 @@ class Frog(GImage):
         self.angle = FROG_NORTH
 
     # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
-    def animateFrogVert(self,direction):
-        """
-        Animates a slide of the image forward and back over FROG_SPEED seconds
+    def bbox(self):
+        '''Returns the bounding box (l,t,r,b) of the frog, as in SimFrog.bbox'''
+        return self._bbox()
 
-        This method is a coroutine that takes a break (so that the game
-        can redraw the image) every time it moves it. The coroutine takes
-        the dt as periodic input so it knows how many (parts of) seconds
-        to animate.
-
-        Parameter dt: The time since the last animation frame.
-        Precondition: dt is a float.
-
-        Parameter direction: The direction to rotate.
-        Precondition: direction is a string and one of 'up' or 'down'.
-        """
-        svert = self.y
-        if direction == 'up':
-            fvert = svert+GRID_SIZE
-        elif direction == 'down':
-            fvert = svert-GRID_SIZE
-
-        steps = (fvert-svert)/FROG_SPEED
-        animating = True
-        while animating:
-            dt = (yield)
-
-            amount = steps*dt
-            self.y = self.y+amount
-
-            if abs(self.y-svert) >= self.height:
-                self.y = fvert
-                animating = False
-
-    def animateFrogHor(self,direction):
-        """
-        Animates a slide of the image left and right over FROG_SPEED seconds
-
-        This method is a coroutine that takes a break (so that the game
-        can redraw the image) every time it moves it. The coroutine takes
-        the dt as periodic input so it knows how many (parts of) seconds
-        to animate.
-
-        Parameter dt: The time since the last animation frame.
-        Precondition: dt is a float.
-
-        Parameter direction: The direction to rotate.
-        Precondition: direction is a string and one of 'left' or 'right'.
-        """
-        svert = self.x
-        if direction == 'left':
-            fvert = svert-GRID_SIZE
-        elif direction == 'right':
-            fvert = svert+GRID_SIZE
+    def follow(self,sim,last=None,alpha=1.0):
+        '''
+        Copies the position and heading of the model frog into this image
 
-        steps = (fvert-svert)/FROG_SPEED
-        animating = True
-        while animating:
+        The hop animations are run by the model (see SimFrog in simulation.py), so
+        this is the only way the frog image moves. If last is not None, the image is
+        put alpha of the way from last to the model frog instead.
 
-            dt = (yield)
+        Parameter sim: The model of the frog
+        Precondition: sim is a SimFrog
 
-            amount = steps*dt
-            self.x = self.x+amount
+        Parameter last: The position (x,y) of the model frog before the last step
+        Precondition: last is a pair of numbers, or None
 
-            if abs(self.x-svert) >= self.width:
-                self.x = fvert
-                animating = False
+        Parameter alpha: How far to go from last to the model frog
+        Precondition: alpha is a float in [0,1]
+        '''
+        if last is None:
+            self.x = sim.x
+            self.y = sim.y
+        else:
+            self.x = last[0]+alpha*(sim.x-last[0])
+            self.y = last[1]+alpha*(sim.y-last[1])
+        if self.angle != sim.angle:
+            self.angle = sim.angle
@@ -0,0 +1,835 @@
+"""
+Replay module for frogger
+
+This module records a game as a compact binary stream, and plays it back. A recording
+is made of the calls to Level.update: for every call, it has the arrow keys that were
+held down and the time step. The frog is put back at the start after a death or an
+exit before the next update, exactly as the game does when the player continues, so
+nothing else has to be recorded.
+
+The stream is delta encoded. The ticks are stored as runs of identical ticks, and the
+time step is only stored when it changes. With the fixed time step of the game (see
+TICK_RATE), a run is usually two bytes, so a whole game is a few kilobytes.
+
+Every REPLAY_KEYFRAME ticks, the recording also keeps a snapshot of the level (see
+SimLevel.snapshot). A player can seek to any tick by restoring the keyframe before it
+and playing the rest. The header
+has the name of the level file and a hash of the level, so a recording is never
+played on the wrong level.
+
+Recordings are played without a window, in a SimLevel, at many times real time. They
+can also be checked from the command line:
+
+    python recording.py Replays/easy2-20240101-120000.frec
+"""
+from consts import *
+from simulation import *
+import numpy as np
+import hashlib
+import json
+import os
+import struct
+import time
+
+# PRIMARY RULE: Like simulation.py, this module may only access consts.py and
+# simulation.py. It must never import game2d (or anything else that needs Kivy).
+
+# The first bytes of every recording
+REPLAY_MAGIC = b'FROGREC\0'
+
+# The version of the recording format (change this if the format changes)
+REPLAY_VERSION = 2
+
+# The keys recorded for each tick, in bit order (the only keys Level.update reads)
+REPLAY_KEYS = ('up','down','left','right')
+
+# The number of ticks between keyframes
+REPLAY_KEYFRAME = 600
+
+# The number of ticks between keyframes of a rewind buffer
+REWIND_KEYFRAME = 30
+
+
+def levelHash(jsondict,jsonhitbox):
+    '''
+    Returns a hash (a hex string) of a level, for checking a recording against it
+
+    Two levels with the same content have the same hash, however their files are
+    formatted. The frog speed is included, as it can be changed on the command line.
+
+    Parameter jsondict: The JSON for level
+    Precondition: jsondict is a JSON file
+
+    Paramter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+    '''
+    data = json.dumps([jsondict,jsonhitbox,FROG_SPEED],sort_keys=True)
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+class Recorder(object):
+    """
+    A class that records the updates of a level.
+
+    Level.update calls the method record with its model, input and time step before
+    it updates the model. The method getBytes returns the recording so far, which can
+    be read back with Recording.
+    """
+    # Attribute _name: The file name of the level
+    # Invariant: _name is a string
+
+    # Attribute _hash: The hash of the level (see levelHash)
+    # Invariant: _hash is a 40 character hex string
+
+    # Attribute _body: The encoded runs of ticks, except the one in progress
+    # Invariant: _body is a bytearray
+
+    # Attribute _run: The run in progress as a list [mask,dt,count,newdt]
+    # Invariant: _run is a list, or None if no tick has been recorded since the last
+    # keyframe (or ever)
+
+    # Attribute _dt: The time step of the last run written to _body
+    # Invariant: _dt is a float, or None if no run has a time step yet
+
+    # Attribute _ticks: The number of ticks recorded
+    # Invariant: _ticks is an int >= 0
+
+    # Attribute _keyframes: The keyframes, in order
+    # Invariant: _keyframes is a list of tuples (tick,offset,snapshot), where offset is
+    # the position in _body of the run starting at tick
+
+    # Attribute _next: The tick of the next keyframe
+    # Invariant: _next is an int >= 0
+
+    def getTicks(self):
+        '''Returns the number of ticks recorded'''
+        return self._ticks
+
+    def __init__(self,name,jsondict,jsonhitbox):
+        '''
+        Initializes an empty recording of the given level
+
+        Parameter name: The file name of the level
+        Precondition: name is a string
+
+        Parameter jsondict: The JSON for level
+        Precondition: jsondict is a JSON file
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        '''
+        self._name = name
+        self._hash = levelHash(jsondict,jsonhitbox)
+        self._body = bytearray()
+        self._run = None
+        self._dt = None
+        self._ticks = 0
+        self._keyframes = []
+        self._next = 0
+
+    def record(self,level,input,dt):
+        '''
+        Records one tick, before the level is updated with input and dt
+
+        Parameter level: The model of the level, before the update
+        Precondition: level is a SimLevel
+
+        Parameter input: The user input
+        Precondition: input has a method is_key_down (e.g. GInput or SimInput)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        '''
+        if self._ticks >= self._next:
+            self._flush()
+            self._run = None
+            self._dt = None             # The first run after a keyframe has its dt
+            self._keyframes.append((self._ticks,len(self._body),level.snapshot()))
+            self._next = self._ticks+REPLAY_KEYFRAME
+
+        self._add(_maskOf(input),float(dt),1)
+
+    def truncate(self,ticks):
+        '''
+        Throws away every tick after the first ticks ones
+
+        This is for a game that went back in time (see RewindBuffer), so that the
+        recording matches the game again.
+
+        Parameter ticks: The number of ticks to keep
+        Precondition: ticks is an int in 0..getTicks()
+        '''
+        assert 0 <= ticks <= self._ticks, '%s is not a number of ticks' % repr(ticks)
+        self._flush()
+        self._run = None
+        keep = [keyframe for keyframe in self._keyframes if keyframe[0] <= ticks]
+        if not keep:
+            return
+        (tick,offset,snapshot) = keep[-1]
+        runs = list(_getRuns(self._body,offset))
+        del self._body[offset:]
+        self._keyframes = keep
+        self._dt = None
+        self._ticks = tick
+        self._next = tick+REPLAY_KEYFRAME
+        for (mask,dt,count) in runs:
+            count = min(count,ticks-self._ticks)
+            if count == 0:
+                break
+            self._add(mask,dt,count)
+
+    def getBytes(self):
+        '''
+        Returns the recording so far, as bytes
+
+        Recording can still go on afterwards.
+        '''
+        out = bytearray(REPLAY_MAGIC)
+        out.append(REPLAY_VERSION)
+        out += bytes.fromhex(self._hash)
+        name = self._name.encode()
+        _putVarint(out,len(name))
+        out += name
+        _putVarint(out,self._ticks)
+
+        body = bytearray(self._body)
+        if self._run is not None:
+            _putRun(body,*self._run)
+        _putVarint(out,len(body))
+        out += body
+
+        _putVarint(out,len(self._keyframes))
+        for (tick,offset,snapshot) in self._keyframes:
+            _putVarint(out,tick)
+            _putVarint(out,offset)
+            _putSnapshot(out,snapshot)
+        return bytes(out)
+
+    def save(self,filename):
+        '''
+        Writes the recording so far to the given file
+
+        Parameter filename: The path to the file
+        Precondition: filename is a string
+        '''
+        folder = os.path.dirname(filename)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(filename,'wb') as file:
+            file.write(self.getBytes())
+
+    def _add(self,mask,dt,count):
+        '''
+        Adds count identical ticks to the recording
+
+        Parameter mask: The bit mask of the keys down (bits in the order of REPLAY_KEYS)
+        Precondition: mask is an int in 0..15
+
+        Parameter dt: The time step of the ticks
+        Precondition: dt is a float
+
+        Parameter count: The number of ticks
+        Precondition: count is an int > 0
+        '''
+        if self._run is not None and self._run[0] == mask and self._run[1] == dt:
+            self._run[2] += count
+        else:
+            self._flush()
+            self._run = [mask,dt,count,dt != self._dt]
+            self._dt = dt
+        self._ticks += count
+
+    def _flush(self):
+        '''
+        Writes the run in progress (if any) to the body
+
+        The run stays in progress, so it must be replaced (or set to None) afterwards.
+        '''
+        if self._run is not None:
+            _putRun(self._body,*self._run)
+
+
+class Recording(object):
+    """
+    A class representing a recording read back from bytes.
+
+    A recording is immutable. It is played with a Player.
+    """
+    # Attribute _name: The file name of the level
+    # Invariant: _name is a string
+
+    # Attribute _hash: The hash of the level (see levelHash)
+    # Invariant: _hash is a 40 character hex string
+
+    # Attribute _ticks: The number of ticks in the recording
+    # Invariant: _ticks is an int >= 0
+
+    # Attribute _body: The encoded runs of ticks
+    # Invariant: _body is a bytes object
+
+    # Attribute _keyframes: The keyframes, in order
+    # Invariant: _keyframes is a list of tuples (tick,offset,snapshot), in order of tick
+
+    def getName(self):
+        '''Returns the file name of the level'''
+        return self._name
+
+    def getHash(self):
+        '''Returns the hash of the level (see levelHash)'''
+        return self._hash
+
+    def getTicks(self):
+        '''Returns the number of ticks in the recording'''
+        return self._ticks
+
+    def getKeyframes(self):
+        '''Returns the ticks that have keyframes'''
+        return [keyframe[0] for keyframe in self._keyframes]
+
+    def getSize(self):
+        '''Returns the size in bytes of the encoded ticks (without the keyframes)'''
+        return len(self._body)
+
+    def __init__(self,data):
+        '''
+        Initializes a recording from the bytes of Recorder.getBytes
+
+        This raises a ValueError if the data is not a recording of this version.
+
+        Parameter data: The encoded recording
+        Precondition: data is a bytes object
+        '''
+        data = bytes(data)
+        if data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+            raise ValueError('not a frogger recording')
+        pos = len(REPLAY_MAGIC)
+        if pos >= len(data) or data[pos] != REPLAY_VERSION:
+            raise ValueError('unsupported recording version')
+        try:
+            self._hash = data[pos+1:pos+21].hex()
+            pos += 21
+            (size,pos) = _getVarint(data,pos)
+            self._name = data[pos:pos+size].decode()
+            pos += size
+            (self._ticks,pos) = _getVarint(data,pos)
+            (size,pos) = _getVarint(data,pos)
+            self._body = data[pos:pos+size]
+            pos += size
+
+            (count,pos) = _getVarint(data,pos)
+            self._keyframes = []
+            for k in range(count):
+                (tick,pos) = _getVarint(data,pos)
+                (offset,pos) = _getVarint(data,pos)
+                (snapshot,pos) = _getSnapshot(data,pos)
+                self._keyframes.append((tick,offset,snapshot))
+        except (IndexError,struct.error,UnicodeDecodeError):
+            raise ValueError('truncated recording')
+
+    @classmethod
+    def load(cls,filename):
+        '''
+        Returns the recording in the given file
+
+        Parameter filename: The path to the file
+        Precondition: filename is a string
+        '''
+        with open(filename,'rb') as file:
+            return cls(file.read())
+
+    def runs(self,offset=0):
+        '''
+        Generates the runs of ticks, starting at the given position in the body
+
+        Each run is a tuple (keys,dt,count) for count identical ticks, where keys is
+        the list of keys held down.
+
+        Parameter offset: The position of a run in the body (e.g. of a keyframe)
+        Precondition: offset is an int >= 0
+        '''
+        for (mask,dt,count) in _getRuns(self._body,offset):
+            yield (_keysOf(mask),dt,count)
+
+    def keyframe(self,tick):
+        '''
+        Returns the last keyframe at or before tick, as a tuple (tick,offset,snapshot)
+
+        This returns None if there is no such keyframe.
+
+        Parameter tick: The tick to seek to
+        Precondition: tick is an int >= 0
+        '''
+        best = None
+        for keyframe in self._keyframes:
+            if keyframe[0] > tick:
+                break
+            best = keyframe
+        return best
+
+
+class Player(object):
+    """
+    A class that plays a recording in a level.
+
+    The level is a SimLevel by default, so the recording plays without a window. It
+    may be anything with the methods update and reconstructFrog (such as Level), but
+    seeking also needs the method restore.
+    """
+    # Attribute _recording: The recording to play
+    # Invariant: _recording is a Recording
+
+    # Attribute _level: The level the recording is played in
+    # Invariant: _level has methods update and reconstructFrog
+
+    # Attribute _input: The keys of the current tick
+    # Invariant: _input is a SimInput
+
+    # Attribute _runs: The runs of ticks left to play
+    # Invariant: _runs is a generator from Recording.runs
+
+    # Attribute _run: The run being played, as a list [keys,dt,count left]
+    # Invariant: _run is a list, or None if a new run must be read
+
+    # Attribute _tick: The number of ticks played
+    # Invariant: _tick is an int in 0..getTicks() of the recording
+
+    # Attribute _result: The result of the last update
+    # Invariant: _result is None or a result of Level.update
+
+    def getTick(self):
+        '''Returns the number of ticks played'''
+        return self._tick
+
+    def getLevel(self):
+        '''Returns the level the recording is played in'''
+        return self._level
+
+    def getResult(self):
+        '''Returns the result of the last update (None if nothing happened)'''
+        return self._result
+
+    def isDone(self):
+        '''Returns True if every tick of the recording has been played'''
+        return self._tick >= self._recording.getTicks()
+
+    def __init__(self,recording,jsondict,jsonhitbox,level=None):
+        '''
+        Initializes a player at the start of the recording
+
+        This raises a ValueError if the recording is not of this level.
+
+        Parameter recording: The recording to play
+        Precondition: recording is a Recording
+
+        Parameter jsondict: The JSON for level
+        Precondition: jsondict is a JSON file
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+
+        Parameter level: The level to play in (None for a new SimLevel)
+        Precondition: level is None or a new level for jsondict and jsonhitbox
+        '''
+        if recording.getHash() != levelHash(jsondict,jsonhitbox):
+            raise ValueError('recording of %s is for a different level' % repr(recording.getName()))
+        self._recording = recording
+        self._level = SimLevel(jsondict,jsonhitbox) if level is None else level
+        self._input = SimInput()
+        self._runs = recording.runs()
+        self._run = None
+        self._tick = 0
+        self._result = None
+
+    def step(self):
+        '''
+        Plays one tick of the recording, returning the result of the update
+
+        The frog is put back at the start first if the last update ended in an exit or
+        a death. It is an error to step a finished recording.
+        '''
+        assert not self.isDone(), 'the recording is over'
+        if self._run is None or self._run[2] == 0:
+            self._run = list(next(self._runs))
+        self._run[2] -= 1
+        if self._result in ('in exit','more lives left'):
+            self._level.reconstructFrog()
+        self._input.setKeys(self._run[0])
+        self._result = self._level.update(self._input,self._run[1])
+        self._tick += 1
+        return self._result
+
+    def run(self):
+        '''
+        Plays the rest of the recording, returning the results that were not None
+
+        The result is a list of pairs (tick,result), where tick is the number of the
+        tick (from 0) whose update returned result.
+        '''
+        results = []
+        while not self.isDone():
+            result = self.step()
+            if result is not None:
+                results.append((self._tick-1,result))
+        return results
+
+    def seek(self,tick):
+        '''
+        Moves the level to the state before the given tick is played
+
+        The level is put in the state of the last keyframe before tick, and the ticks
+        from there are played again. So seeking costs at most REPLAY_KEYFRAME ticks,
+        wherever tick is.
+
+        Parameter tick: The tick to seek to
+        Precondition: tick is an int in 0..getTicks() of the recording
+        '''
+        assert 0 <= tick <= self._recording.getTicks(), '%s is not a tick' % repr(tick)
+        keyframe = self._recording.keyframe(tick)
+        if keyframe is not None and (tick < self._tick or keyframe[0] > self._tick):
+            (self._tick,offset,snapshot) = keyframe
+            self._level.restore(snapshot)
+            self._runs = self._recording.runs(offset)
+            self._run = None
+            self._result = None
+        assert self._tick <= tick, 'there is no keyframe before tick %d' % tick
+        while self._tick < tick:
+            self.step()
+
+
+class RewindBuffer(object):
+    """
+    A class that keeps the last ticks of a level, so that the level can go back to any
+    of them.
+
+    The buffer is a ring with room for a fixed number of ticks. Like a recording, a
+    tick is stored as the keys held down and the time step, which is all that changed
+    since the tick before. Every REWIND_KEYFRAME ticks, the buffer also keeps a
+    snapshot of the level. The state before any tick is that keyframe plus the ticks
+    after it, played again (at most REWIND_KEYFRAME-1 updates, well under a millisecond).
+
+    All of the memory is allocated by the first call to record, so the buffer never
+    grows. The time spent in record is measured (see getOverhead).
+    """
+    # Attribute _capacity: The most ticks the buffer can go back
+    # Invariant: _capacity is an int > 0
+
+    # Attribute _keyframe: The number of ticks between keyframes
+    # Invariant: _keyframe is an int > 0
+
+    # Attribute _masks: The keys held down for each tick (see REPLAY_KEYS), in a ring
+    # Invariant: _masks is a uint8 NumPy array of length _capacity; tick n is at n % _capacity
+
+    # Attribute _dts: The time step of each tick, in a ring
+    # Invariant: _dts is a float64 NumPy array, parallel to _masks
+
+    # Attribute _frames: The keyframe snapshots, in a ring
+    # Invariant: _frames is a 2-d float64 NumPy array (one row per keyframe), or None
+    # before the first tick; the keyframe of tick n (a multiple of _keyframe) is at row
+    # (n // _keyframe) % len(_frames)
+
+    # Attribute _first: The earliest tick whose entry has not been written over
+    # Invariant: _first is an int >= 0 (ticks undone by rewind may have written over
+    # entries that the ring would otherwise still hold)
+
+    # Attribute _end: The number of ticks recorded (the tick that comes next)
+    # Invariant: _end is an int >= _first
+
+    # Attribute _cost: The total time spent in record (in seconds)
+    # Invariant: _cost is a float >= 0
+
+    # Attribute _worst: The longest time spent in one call to record (in seconds)
+    # Invariant: _worst is a float >= 0
+
+    # Attribute _calls: The number of calls to record
+    # Invariant: _calls is an int >= 0
+
+    def getTick(self):
+        '''Returns the number of ticks recorded (the tick that comes next)'''
+        return self._end
+
+    def getFirst(self):
+        '''Returns the earliest tick that the level can go back to'''
+        # Replaying needs every tick since a keyframe (the keyframe ring holds more)
+        oldest = max(self._first,self._end-self._capacity)
+        return min(self._end,-(-oldest//self._keyframe)*self._keyframe)
+
+    def getMemory(self):
+        '''Returns the number of bytes used by the buffer (fixed after the first tick)'''
+        total = self._masks.nbytes+self._dts.nbytes
+        if not self._frames is None:
+            total += self._frames.nbytes
+        return total
+
+    def getOverhead(self):
+        '''
+        Returns the time spent in record per tick, as a pair (mean,max) in microseconds
+        '''
+        if self._calls == 0:
+            return (0.0,0.0)
+        return (self._cost/self._calls*1e6,self._worst*1e6)
+
+    def __init__(self,capacity,keyframe=REWIND_KEYFRAME):
+        '''
+        Initializes an empty buffer with room for capacity ticks
+
+        Parameter capacity: The most ticks the buffer can go back
+        Precondition: capacity is an int > 0
+
+        Parameter keyframe: The number of ticks between keyframes
+        Precondition: keyframe is an int > 0
+        '''
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        assert type(keyframe) == int and keyframe > 0, '%s is not a valid keyframe' % repr(keyframe)
+        self._capacity = capacity
+        self._keyframe = keyframe
+        self._masks = np.zeros(capacity,dtype=np.uint8)
+        self._dts = np.zeros(capacity,dtype=np.float64)
+        self._frames = None
+        self._first = 0
+        self._end = 0
+        self._cost = 0.0
+        self._worst = 0.0
+        self._calls = 0
+
+    def record(self,level,input,dt):
+        '''
+        Records one tick, before the level is updated with input and dt
+
+        Parameter level: The model of the level, before the update
+        Precondition: level is a SimLevel
+
+        Parameter input: The user input
+        Precondition: input has a method is_key_down (e.g. GInput or SimInput)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        '''
+        start = time.perf_counter()
+        tick = self._end
+        if tick % self._keyframe == 0:
+            snapshot = level.snapshot()
+            if self._frames is None:
+                rows = -(-self._capacity//self._keyframe)+1
+                self._frames = np.zeros((rows,len(snapshot)),dtype=np.float64)
+            self._frames[(tick//self._keyframe) % len(self._frames)] = snapshot
+        self._masks[tick % self._capacity] = _maskOf(input)
+        self._dts[tick % self._capacity] = dt
+        self._end = tick+1
+
+        cost = time.perf_counter()-start
+        self._cost += cost
+        self._worst = max(self._worst,cost)
+        self._calls += 1
+
+    def rewind(self,level,tick):
+        '''
+        Puts the level in its state before the given tick, and forgets the later ticks
+
+        The tick is clamped to the ticks in the buffer. This returns the tick that the
+        level went back to.
+
+        Parameter level: The model of the level that was recorded
+        Precondition: level is a SimLevel
+
+        Parameter tick: The tick to go back to
+        Precondition: tick is an int
+        '''
+        tick = max(self.getFirst(),min(tick,self._end))
+        if tick == self._end or self._frames is None:
+            return self._end
+        base = (tick//self._keyframe)*self._keyframe
+        level.restore(self._frames[(base//self._keyframe) % len(self._frames)])
+        input = SimInput()
+        for n in range(base,tick):
+            if level.getFrog() is None:
+                level.reconstructFrog()
+            input.setKeys(_keysOf(int(self._masks[n % self._capacity])))
+            level.update(input,float(self._dts[n % self._capacity]))
+        self._first = max(self._first,self._end-self._capacity)
+        self._end = tick
+        return tick
+
+
+# HIDDEN FUNCTIONS
+def _putVarint(out,value):
+    '''
+    Appends value to out as a variable length integer (7 bits per byte)
+
+    Parameter out: The buffer to append to
+    Precondition: out is a bytearray
+
+    Parameter value: The value to write
+    Precondition: value is an int >= 0
+    '''
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _getVarint(data,pos):
+    '''
+    Returns the pair (value,pos) for the variable length integer at pos in data
+
+    The second value is the position after the integer.
+
+    Parameter data: The buffer to read from
+    Precondition: data is a bytes object
+
+    Parameter pos: The position of the integer
+    Precondition: pos is an int >= 0
+    '''
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return (value,pos)
+        shift += 7
+
+
+def _maskOf(input):
+    '''
+    Returns the bit mask of the keys in REPLAY_KEYS that are down in input
+
+    Parameter input: The user input
+    Precondition: input has a method is_key_down (e.g. GInput or SimInput)
+    '''
+    mask = 0
+    for (bit,key) in enumerate(REPLAY_KEYS):
+        if input.is_key_down(key):
+            mask |= 1 << bit
+    return mask
+
+
+def _keysOf(mask):
+    '''
+    Returns the list of keys in the bit mask (in the order of REPLAY_KEYS)
+
+    Parameter mask: The bit mask of the keys down
+    Precondition: mask is an int in 0..15
+    '''
+    return [key for (bit,key) in enumerate(REPLAY_KEYS) if mask & (1 << bit)]
+
+
+def _getRuns(body,offset):
+    '''
+    Generates the runs of ticks in body, starting at offset, as tuples (mask,dt,count)
+
+    Parameter body: The encoded runs
+    Precondition: body is a bytes object or bytearray
+
+    Parameter offset: The position of a run in body
+    Precondition: offset is an int >= 0
+    '''
+    dt = None
+    pos = offset
+    while pos < len(body):
+        (header,pos) = _getVarint(body,pos)
+        if header & 16:
+            dt = struct.unpack_from('<d',body,pos)[0]
+            pos += 8
+        yield (header & 15,dt,header >> 5)
+
+
+def _putRun(out,mask,dt,count,newdt):
+    '''
+    Appends a run of count ticks to out
+
+    The run is a variable length integer (count << 5 | newdt << 4 | mask), followed by
+    the time step as a double if newdt is True.
+
+    Parameter out: The buffer to append to
+    Precondition: out is a bytearray
+
+    Parameter mask: The bit mask of the keys down (bits in the order of REPLAY_KEYS)
+    Precondition: mask is an int in 0..15
+
+    Parameter dt: The time step of the ticks
+    Precondition: dt is a float
+
+    Parameter count: The number of ticks in the run
+    Precondition: count is an int > 0
+
+    Parameter newdt: Whether to write the time step
+    Precondition: newdt is a bool
+    '''
+    _putVarint(out,(count << 5) | (int(newdt) << 4) | mask)
+    if newdt:
+        out += struct.pack('<d',dt)
+
+
+def _putSnapshot(out,snapshot):
+    '''
+    Appends a level snapshot (see SimLevel.snapshot) to out
+
+    The snapshot is its length followed by its values as little-endian doubles.
+
+    Parameter out: The buffer to append to
+    Precondition: out is a bytearray
+
+    Parameter snapshot: The level snapshot
+    Precondition: snapshot is a 1-d NumPy array of floats
+    '''
+    _putVarint(out,len(snapshot))
+    out += snapshot.astype('<f8').tobytes()
+
+
+def _getSnapshot(data,pos):
+    '''
+    Returns the pair (snapshot,pos) for the level snapshot at pos in data
+
+    The second value is the position after the snapshot.
+
+    Parameter data: The buffer to read from
+    Precondition: data is a bytes object
+
+    Parameter pos: The position of the snapshot
+    Precondition: pos is an int >= 0
+    '''
+    (count,pos) = _getVarint(data,pos)
+    if pos+8*count > len(data):
+        raise IndexError('snapshot past the end of the data')
+    snapshot = np.frombuffer(data,dtype='<f8',count=count,offset=pos).astype(np.float64)
+    return (snapshot,pos+8*count)
+
+
+def main(names):
+    '''
+    Plays each recording in names without a window, and prints the results
+
+    The level of a recording is the file with its name in the JSON folder (next to
+    this module), with the objects file OBJECT_DATA.
+
+    Parameter names: The paths to the recordings
+    Precondition: names is a list of strings
+    '''
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),'JSON')
+    for name in names:
+        try:
+            recording = Recording.load(name)
+            with open(os.path.join(folder,recording.getName())) as file:
+                jsondict = json.load(file)
+            with open(os.path.join(folder,OBJECT_DATA)) as file:
+                jsonhitbox = json.load(file)
+            player = Player(recording,jsondict,jsonhitbox)
+        except (OSError,ValueError) as e:
+            print('%s: cannot play (%s)' % (name,e))
+            continue
+        start = time.perf_counter()
+        results = player.run()
+        elapsed = time.perf_counter()-start
+        level = player.getLevel()
+        played = sum(dt*count for (keys,dt,count) in recording.runs())
+        print('%s: %s, %d ticks, %d exits left, %d lives, %d bytes, %.0fx real time' %
+              (name,recording.getName(),recording.getTicks(),level.getExitsLeft(),
+               level.getLives(),recording.getSize(),played/max(elapsed,1e-9)))
+        for (tick,result) in results:
+            print('    tick %d: %s' % (tick,result))
+
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv[1:])
@@ -0,0 +1,578 @@
+"""
+Shared memory module for frogger
+
+This module plays many games of a level in several processes, with the state of every
+game in one block of shared memory (see multiprocessing.shared_memory). Each worker
+process steps its own slice of the games (see FroggerVecEnv), and keeps its lane
+clocks directly in the block. After every step, it also writes the obstacle centers,
+the frogs, the lives, the rewards and the observations of its games there. Nothing is
+pickled between the processes while the games run: the coordinator (SharedVecEnv)
+only writes the actions and waits at a barrier, and then reads the results in place.
+
+The block starts with a small header that describes it (see SharedGames), so any
+other process can attach to a running block by its name and watch the games, without
+slowing them down. For example:
+
+    games = SharedGames.attach(name)
+    print(games.getTicks().max(), games.getLives().sum())
+
+The workers only write between two steps, so a watcher may see a step half written.
+A watcher that needs a consistent view must copy the arrays and check that the tick
+in the header did not change meanwhile.
+
+The games can be timed from the command line:
+
+    python shared.py JSON/easy2.json JSON/complete.json
+"""
+from consts import *
+from simulation import *
+from env import *
+from multiprocessing import shared_memory, resource_tracker
+import multiprocessing
+import numpy as np
+import os
+import threading
+
+# PRIMARY RULE: Like simulation.py, this module may only access consts.py and the
+# headless modules (simulation.py, env.py). It must never import game2d (or anything
+# else that needs Kivy).
+
+# The first value of the header of a block, to check that a block is one of ours
+SHARED_MAGIC = 0x314d485347524f46    # 'FROGSHM1', little-endian
+
+# The version of the layout of a block
+SHARED_VERSION = 1
+
+# The lane types, by code in the lane table
+SHARED_TYPES = ('grass','road','water','hedge')
+
+# The results of an update, by code in the results array
+SHARED_RESULTS = (None,'in exit','more lives left','no lives left')
+
+# The commands that the coordinator gives the workers (the 'command' in the header)
+SHARED_STEP  = 0
+SHARED_RESET = 1
+SHARED_STOP  = 2
+
+# The most seconds to wait for the other processes at a barrier
+SHARED_TIMEOUT = 60
+
+# The number of games played at once by main
+SHARED_GAMES = 256
+
+# The values of the header, in order
+_HEADER = ('magic','version','count','lanes','obstacles','rows','columns','tick','command',
+           'tracker')
+
+
+class SharedGames(object):
+    """
+    A class representing the block of shared memory with the state of many games.
+
+    The block is a header of int64 values (see _HEADER) followed by NumPy arrays, in
+    an order fixed by the sizes in the header (see _layout). Every array is a view of
+    the block, so a change is seen by every process at once. The arrays are
+
+        lanes:        (lanes,4) float64, the type code (see SHARED_TYPES), the speed
+                      (0 if it does not move), and the first obstacle and number of
+                      obstacles of each lane, bottom to top
+        obstacles:    (M,7) float64, the table of FroggerVecEnv.getObstacles
+        clock:        (count,lanes) float64, the lane times of each game
+        positions:    (count,M) float64, the obstacle centers of each game
+        frogs:        (count,3) float64, the frog of each game (see FroggerVecEnv.frogs)
+        lives:        (count,) int64, the lives left in each game
+        exits:        (count,) int64, the exits not yet taken in each game
+        ticks:        (count,) int64, the steps of each game since it was reset
+        results:      (count,) int8, the result code of the last update (SHARED_RESULTS)
+        rewards:      (count,) float64, the reward of the last step
+        dones:        (count,) bool, whether the game was done (and reset) last step
+        actions:      (count,) int64, the action of each game in the next step
+        observations: (count,2,rows,columns) uint8, as in FroggerVecEnv
+
+    Only the process that made the block may unlink it. A block is passed to a worker
+    process as its name; see attach for the other processes.
+    """
+    # Attribute _block: The shared memory
+    # Invariant: _block is a SharedMemory
+
+    # Attribute _owner: Whether this process made the block
+    # Invariant: _owner is a bool
+
+    # Attribute _header: The header of the block
+    # Invariant: _header is an int64 NumPy array, a view of the block (see _HEADER),
+    # or None once closed
+
+    # Attribute _arrays: The arrays in the block, by name
+    # Invariant: _arrays is a dict of NumPy arrays, views of the block (see the class),
+    # and is empty once closed
+
+    def getName(self):
+        '''Returns the name of the block, for attach'''
+        return self._block.name
+
+    def getCount(self):
+        '''Returns the number of games'''
+        return int(self._header[2])
+
+    def getTick(self):
+        '''Returns the number of steps since the block was made (all games, in lockstep)'''
+        return int(self._header[7])
+
+    def getLanes(self):
+        '''Returns the lane table (see the class)'''
+        return self._arrays['lanes']
+
+    def getObstacles(self):
+        '''Returns the obstacle table (see the class)'''
+        return self._arrays['obstacles']
+
+    def getClock(self):
+        '''Returns the lane times of each game'''
+        return self._arrays['clock']
+
+    def getPositions(self):
+        '''Returns the obstacle centers of each game'''
+        return self._arrays['positions']
+
+    def getFrogs(self):
+        '''Returns the frog (x,y,angle) of each game, NaN where there is no frog'''
+        return self._arrays['frogs']
+
+    def getLives(self):
+        '''Returns the lives left in each game'''
+        return self._arrays['lives']
+
+    def getExitsLeft(self):
+        '''Returns the exits not yet taken in each game'''
+        return self._arrays['exits']
+
+    def getTicks(self):
+        '''Returns the steps of each game since it was reset'''
+        return self._arrays['ticks']
+
+    def getResults(self):
+        '''Returns the result code (see SHARED_RESULTS) of the last update of each game'''
+        return self._arrays['results']
+
+    def getRewards(self):
+        '''Returns the reward of the last step of each game'''
+        return self._arrays['rewards']
+
+    def getDones(self):
+        '''Returns whether each game was done (and reset) in the last step'''
+        return self._arrays['dones']
+
+    def getActions(self):
+        '''Returns the actions of the next step (see ENV_ACTIONS)'''
+        return self._arrays['actions']
+
+    def getObservations(self):
+        '''Returns the observations of each game (see FroggerVecEnv)'''
+        return self._arrays['observations']
+
+    def __init__(self,jsondictlvl,jsonhitbox,count):
+        '''
+        Makes a new block for count games of the given level
+
+        Parameter jsondictlvl: The JSON for level
+        Precondition: jsondictlvl is a JSON file
+
+        Parameter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+
+        Parameter count: The number of games
+        Precondition: count is an int > 0
+        '''
+        assert type(count) == int and count > 0, '%s is not a valid count' % repr(count)
+        sample = FroggerVecEnv(jsondictlvl,jsonhitbox,1)
+        table = sample.getObstacles()
+        lanes = sample.getLevel(0).getLanes()
+        shape = sample.getShape()
+        sizes = [count,len(lanes),len(table),shape[2],shape[3]]
+        (layout,size) = _layout(*sizes)
+        self._block = shared_memory.SharedMemory(create=True,size=size)
+        self._owner = True
+        self._map(layout)
+        self._header[:] = [SHARED_MAGIC,SHARED_VERSION]+sizes+[0,SHARED_STEP,_tracker()]
+
+        first = 0
+        for (row,lane) in enumerate(lanes):
+            number = len(lane.getPattern())
+            speed = 0.0 if lane.getSpeed() is None else lane.getSpeed()
+            self._arrays['lanes'][row] = (SHARED_TYPES.index(lane.getType()),speed,first,number)
+            first += number
+        self._arrays['obstacles'][:] = table
+        self._arrays['frogs'][:] = np.nan
+
+    @classmethod
+    def attach(cls,name):
+        '''
+        Returns the block with the given name, made by another process
+
+        The block stays alive until the process that made it unlinks it, even after this
+        process ends. This raises a ValueError if the block is not a block of games.
+
+        Parameter name: The name of the block (see getName)
+        Precondition: name is a string
+        '''
+        block = shared_memory.SharedMemory(name=name)
+        result = cls._open(block)
+        # Attaching registers the block with the resource tracker of this process, which
+        # unlinks it when this process ends, unless it is the tracker of the maker
+        if result._header[9] != _tracker():
+            resource_tracker.unregister(block._name,'shared_memory')
+        return result
+
+    def close(self):
+        '''
+        Closes the block in this process (the games go on in the others)
+
+        The arrays of the block must not be used after this. The memory is released
+        when the last of them is gone.
+        '''
+        self._header = None
+        self._arrays = {}
+        try:
+            self._block.close()
+        except BufferError:
+            pass    # Some arrays are still in use; the mapping goes with the last one
+
+    def unlink(self):
+        '''
+        Destroys the block once every process has closed it
+
+        Only the process that made the block may unlink it.
+        '''
+        assert self._owner, 'only the process that made the block may unlink it'
+        self._block.unlink()
+
+    def __reduce__(self):
+        '''Sends the block to another process by name (as for a worker)'''
+        return (_reopen,(self.getName(),))
+
+    # HIDDEN METHODS
+    @classmethod
+    def _open(cls,block):
+        '''
+        Returns a SharedGames over the block, checking its header
+
+        Parameter block: The shared memory
+        Precondition: block is a SharedMemory
+        '''
+        if len(block.buf) < 8*len(_HEADER):
+            raise ValueError('%s is not a block of frogger games' % repr(block.name))
+        header = np.ndarray((len(_HEADER),),dtype=np.int64,buffer=block.buf)
+        if header[0] != SHARED_MAGIC:
+            raise ValueError('%s is not a block of frogger games' % repr(block.name))
+        if header[1] != SHARED_VERSION:
+            raise ValueError('%s has an unknown layout (version %d)' % (repr(block.name),header[1]))
+        (layout,size) = _layout(*[int(value) for value in header[2:7]])
+        del header
+        result = cls.__new__(cls)
+        result._block = block
+        result._owner = False
+        result._map(layout)
+        return result
+
+    def _map(self,layout):
+        '''
+        Makes the header and the arrays as views of the block
+
+        Parameter layout: The arrays of the block
+        Precondition: layout is a list of (name,dtype,shape,offset) as from _layout
+        '''
+        self._arrays = {}
+        for (name,dtype,shape,offset) in layout:
+            self._arrays[name] = np.ndarray(shape,dtype=dtype,buffer=self._block.buf,offset=offset)
+        self._header = self._arrays.pop('header')
+
+
+class SharedVecEnv(object):
+    """
+    A class that plays many games of a level in worker processes, in lockstep.
+
+    It works like FroggerVecEnv, with reset and step, but the games are split into
+    slices, one per worker, and the state of every game is in a SharedGames block.
+    The arrays returned by reset and step are views of the block. They are not
+    copies, so they change with the next step.
+
+    Call close when done, to stop the workers and free the block.
+    """
+    # Attribute _games: The state of every game
+    # Invariant: _games is a SharedGames made by this process
+
+    # Attribute _barrier: The barrier that the workers and this process wait at
+    # Invariant: _barrier is a multiprocessing Barrier for len(_workers)+1 parties
+
+    # Attribute _workers: The worker processes
+    # Invariant: _workers is a list of multiprocessing Process, empty once closed
+
+    def getGames(self):
+        '''Returns the block with the state of every game'''
+        return self._games
+
+    def getWorkers(self):
+        '''Returns the number of worker processes (0 once closed)'''
+        return len(self._workers)
+
+    def __init__(self,jsondictlvl,jsonhitbox,count,workers=None,dt=ENV_DT,limit=None):
+        '''
+        Starts the workers for count games of the given level
+
+        The games are split as evenly as possible between the workers.
+
+        Parameter jsondictlvl: The JSON for level
+        Precondition: jsondictlvl is a JSON file
+
+        Parameter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+
+        Parameter count: The number of games
+        Precondition: count is an int > 0
+
+        Parameter workers: The number of processes (None for one per core)
+        Precondition: workers is an int > 0 or None
+
+        Parameter dt: The time step of every update
+        Precondition: dt is a float > 0
+
+        Parameter limit: The most steps in a game (None for no limit)
+        Precondition: limit is an int > 0 or None
+        '''
+        workers = min(count,workers or os.cpu_count() or 1)
+        self._games = SharedGames(jsondictlvl,jsonhitbox,count)
+        self._barrier = multiprocessing.Barrier(workers+1)
+        self._workers = []
+        bounds = np.linspace(0,count,workers+1).astype(int)
+        for k in range(workers):
+            args = (self._games,jsondictlvl,jsonhitbox,int(bounds[k]),int(bounds[k+1]),
+                    dt,limit,self._barrier)
+            worker = multiprocessing.Process(target=_work,args=args,daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def reset(self):
+        '''
+        Starts every game again, and returns the observations (a view of the block)
+        '''
+        self._command(SHARED_RESET)
+        return self._games.getObservations()
+
+    def step(self,actions):
+        '''
+        Updates every game once, and returns a tuple (observations,rewards,dones)
+
+        The values are as in FroggerVecEnv.step, but they are views of the block. If a
+        worker fails, this raises a threading.BrokenBarrierError; the games cannot go
+        on, but close still cleans up.
+
+        Parameter actions: The action of each game (an index into ENV_ACTIONS)
+        Precondition: actions is a sequence of getCount() ints
+        '''
+        self._games.getActions()[:] = actions
+        self._command(SHARED_STEP)
+        self._games._header[7] += 1
+        return (self._games.getObservations(),self._games.getRewards(),self._games.getDones())
+
+    def close(self):
+        '''Stops the workers and destroys the block'''
+        if not self._workers:
+            return
+        try:
+            self._command(SHARED_STOP,False)
+        except threading.BrokenBarrierError:
+            pass
+        for worker in self._workers:
+            worker.join(SHARED_TIMEOUT)
+        self._workers = []
+        self._games.close()
+        self._games.unlink()
+
+    # HIDDEN METHODS
+    def _command(self,command,wait=True):
+        '''
+        Gives the workers a command, and waits until they have all done it
+
+        Parameter command: The command
+        Precondition: command is one of SHARED_STEP, SHARED_RESET or SHARED_STOP
+
+        Parameter wait: Whether to wait for the workers to finish
+        Precondition: wait is a bool
+        '''
+        self._games._header[8] = command
+        self._barrier.wait(SHARED_TIMEOUT)
+        if wait:
+            self._barrier.wait(SHARED_TIMEOUT)
+
+
+# HIDDEN FUNCTIONS
+def _layout(count,lanes,obstacles,rows,columns):
+    '''
+    Returns the arrays of a block and its size in bytes, as a pair (layout,size)
+
+    The layout is a list of (name,dtype,shape,offset), with every array 8-byte aligned.
+
+    Parameter count: The number of games
+    Precondition: count is an int > 0
+
+    Parameter lanes: The number of lanes
+    Precondition: lanes is an int >= 0
+
+    Parameter obstacles: The number of obstacles (in all lanes)
+    Precondition: obstacles is an int >= 0
+
+    Parameter rows: The rows of an observation
+    Precondition: rows is an int >= 0
+
+    Parameter columns: The columns of an observation
+    Precondition: columns is an int >= 0
+    '''
+    arrays = [('header',np.int64,(len(_HEADER),)),
+              ('lanes',np.float64,(lanes,4)),
+              ('obstacles',np.float64,(obstacles,7)),
+              ('clock',np.float64,(count,lanes)),
+              ('positions',np.float64,(count,obstacles)),
+              ('frogs',np.float64,(count,3)),
+              ('lives',np.int64,(count,)),
+              ('exits',np.int64,(count,)),
+              ('ticks',np.int64,(count,)),
+              ('rewards',np.float64,(count,)),
+              ('actions',np.int64,(count,)),
+              ('results',np.int8,(count,)),
+              ('dones',np.bool_,(count,)),
+              ('observations',np.uint8,(count,2,rows,columns))]
+    layout = []
+    offset = 0
+    for (name,dtype,shape) in arrays:
+        layout.append((name,dtype,shape,offset))
+        size = np.dtype(dtype).itemsize*int(np.prod(shape))
+        offset += -(-size//8)*8
+    return (layout,max(offset,1))
+
+
+def _tracker():
+    '''
+    Returns the process id of the resource tracker of this process (0 if unknown)
+
+    The processes started by multiprocessing share the tracker of their parent.
+    '''
+    resource_tracker.ensure_running()
+    return getattr(resource_tracker._resource_tracker,'_pid',None) or 0
+
+
+def _reopen(name):
+    '''
+    Returns the block with the given name, in a worker of the process that made it
+
+    A worker shares the resource tracker of the process that made the block, so
+    (unlike attach) it leaves the block registered there.
+
+    Parameter name: The name of the block
+    Precondition: name is a string
+    '''
+    return SharedGames._open(shared_memory.SharedMemory(name=name))
+
+
+def _work(games,jsondictlvl,jsonhitbox,first,last,dt,limit,barrier):
+    '''
+    Plays the games first..last-1 of the block in this process, until told to stop
+
+    The worker waits at the barrier for a command, does it, writes the state of its
+    games to the block and waits at the barrier again. If anything goes wrong, the
+    barrier is broken, so the coordinator does not wait forever.
+
+    Parameter games: The block
+    Precondition: games is a SharedGames
+
+    Parameter jsondictlvl: The JSON for level
+    Precondition: jsondictlvl is a JSON file
+
+    Parameter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+
+    Parameter first: The first game of this worker
+    Precondition: first is an int >= 0
+
+    Parameter last: One past the last game of this worker
+    Precondition: last is an int > first
+
+    Parameter dt: The time step of every update
+    Precondition: dt is a float > 0
+
+    Parameter limit: The most steps in a game (None for no limit)
+    Precondition: limit is an int > 0 or None
+
+    Parameter barrier: The barrier shared with the coordinator
+    Precondition: barrier is a multiprocessing Barrier
+    '''
+    try:
+        part = slice(first,last)
+        env = FroggerVecEnv(jsondictlvl,jsonhitbox,last-first,dt,limit,games.getClock()[part])
+        codes = {result: code for (code,result) in enumerate(SHARED_RESULTS)}
+        while True:
+            barrier.wait()
+            command = games._header[8]
+            if command == SHARED_STOP:
+                break
+            if command == SHARED_RESET:
+                observations = env.reset()
+                games.getRewards()[part] = 0.0
+                games.getDones()[part] = False
+                games.getResults()[part] = 0
+            else:
+                (observations,rewards,dones) = env.step(games.getActions()[part])
+                games.getRewards()[part] = rewards
+                games.getDones()[part] = dones
+                games.getResults()[part] = [codes[result] for result in env.getResults()]
+            games.getObservations()[part] = observations
+            env.positions(games.getPositions()[part])
+            env.frogs(games.getFrogs()[part])
+            games.getLives()[part] = env.getLives()
+            games.getExitsLeft()[part] = env.getExitsLeft()
+            games.getTicks()[part] = env.getTicks()
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        games.close()
+
+
+def main(names):
+    '''
+    Plays SHARED_GAMES games of each level file in names in worker processes with
+    random actions for a few seconds, and prints the steps per second
+
+    The objects file is OBJECT_DATA in the same folder as each level.
+
+    Parameter names: The paths to the level files
+    Precondition: names is a list of strings
+    '''
+    import json
+    import time
+    for name in names:
+        with open(name) as file:
+            jsondict = json.load(file)
+        with open(os.path.join(os.path.dirname(name),OBJECT_DATA)) as file:
+            jsonhitbox = json.load(file)
+        env = SharedVecEnv(jsondict,jsonhitbox,SHARED_GAMES)
+        try:
+            env.reset()
+            watcher = SharedGames.attach(env.getGames().getName())
+            random = np.random.default_rng(0)
+            steps = 0
+            start = time.perf_counter()
+            while time.perf_counter()-start < 2:
+                env.step(random.integers(0,len(ENV_ACTIONS),SHARED_GAMES))
+                steps += SHARED_GAMES
+            elapsed = time.perf_counter()-start
+            print('%s: %.0f steps/s with %d workers, the watcher sees tick %d and %d lives' %
+                  (name,steps/elapsed,env.getWorkers(),watcher.getTick(),watcher.getLives().sum()))
+            watcher.close()
+        finally:
+            env.close()
+
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv[1:])
@@ -0,0 +1,1348 @@
+"""
+Headless simulation module for frogger
+
+This module contains a pure-data model of a single frogger level: the lanes, the
+obstacles in them, the frog and the exits are all stored as plain numbers. Nothing in
+this module touches Kivy, so a level can be stepped without a window (for bots,
+balancing runs and regression tests).
+
+The classes in lanes.py, models.py and level.py are thin views over this model. They
+own the GTile and GImage objects and copy the positions out of the model when drawn.
+
+The model is driven by the same level JSON and objects.json hitbox data as the game,
+and follows the same rules as the original Level.update.
+"""
+from consts import *
+import numpy as np
+import bisect
+import math
+
+# PRIMARY RULE: This module may only access consts.py (and NumPy). It must never import
+# game2d (or anything else that needs Kivy).
+
+# How far (in pixels) the lane index may be off from the true hitbox edges. The lane
+# index only picks candidates; every candidate is then checked with the exact box
+# arithmetic.
+_SLACK = 1.0
+
+# The number of values before the lane times in a SimLevel snapshot: the lives, the
+# exits left, the frog (4 values) and the hop (7 values)
+_HEAD = 13
+
+
+def _bbox(x,y,width,height,angle,hit):
+    """
+    Returns the bounding box (l,t,r,b) of a hitbox rotated in 90 degree increments.
+
+    This is the same computation as GObject._bbox, so that collisions in the model
+    agree with collisions between the GImages to the last bit.
+
+    Parameter x: The horizontal coordinate of the object center
+    Precondition: x is a float
+
+    Parameter y: The vertical coordinate of the object center
+    Precondition: y is a float
+
+    Parameter width: The width of the object
+    Precondition: width is a float > 0
+
+    Parameter height: The height of the object
+    Precondition: height is a float > 0
+
+    Parameter angle: The angle of the object
+    Precondition: angle % 360 is one of 0, 90, 180 or 270
+
+    Parameter hit: The hitbox offsets of the object
+    Precondition: hit is a 4-element tuple of numbers
+    """
+    oangle = angle % 360
+    w = width/2
+    h = height/2
+    if oangle == 0:
+        l = x + hit[0] - w
+        r = x - hit[2] + w
+        t = y - hit[1] + h
+        b = y + hit[3] - h
+    elif oangle == 90:
+        t = y + hit[2] - w
+        b = y - hit[0] + w
+        r = x - hit[3] + h
+        l = x + hit[1] - h
+    elif oangle == 180:
+        l = x + hit[2] - w
+        r = x - hit[0] + w
+        t = y - hit[3] + h
+        b = y + hit[1] - h
+    else:
+        t = y + hit[0] - w
+        b = y - hit[2] + w
+        r = x - hit[1] + h
+        l = x + hit[3] - h
+    return (l,t,r,b)
+
+
+def _overlaps(mine,other):
+    """
+    Returns True if the box mine collides with the box other.
+
+    This is the same test as GObject.collides for right angles, where mine is the box
+    of the object doing the test and other is the box of its argument.
+
+    Parameter mine: The box (l,t,r,b) of the object doing the test
+    Precondition: mine is a 4-element tuple of floats
+
+    Parameter other: The box (l,t,r,b) of the object tested against
+    Precondition: other is a 4-element tuple of floats
+    """
+    (l0,t0,r0,b0) = other
+    (l1,t1,r1,b1) = mine
+    isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
+    isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
+    return isx and isy
+
+
+class SimInput(object):
+    """
+    A stand-in for GInput when running without a window.
+
+    The model only ever asks the input whether a key is down, so this class just keeps
+    a set of the keys that are currently held.  Bots and tests change the keys between
+    calls to SimLevel.update.
+    """
+    # Attribute _keys: The keys currently held down
+    # Invariant: _keys is a set of strings
+
+    def __init__(self,keys=()):
+        '''
+        Initializes an input with the given keys held down
+
+        Parameter keys: The keys to hold down
+        Precondition: keys is an iterable of strings (e.g. 'up', 'left')
+        '''
+        self._keys = set(keys)
+
+    def setKeys(self,keys):
+        '''
+        Replaces the held keys with keys
+
+        Parameter keys: The keys to hold down
+        Precondition: keys is an iterable of strings
+        '''
+        self._keys = set(keys)
+
+    def is_key_down(self,key):
+        '''Returns True if key is currently held down'''
+        return key in self._keys
+
+
+class SimFrog(object):
+    """
+    A class representing the frog as plain numbers.
+
+    The frog has a center, an angle (one of the FROG_ headings) and a size. Like the
+    Frog image, its hitbox is the full image, so it has no hitbox offsets.
+    """
+    # Attribute x: The horizontal coordinate of the frog center
+    # Invariant: x is a float
+
+    # Attribute y: The vertical coordinate of the frog center
+    # Invariant: y is a float
+
+    # Attribute angle: The heading of the frog
+    # Invariant: angle is one of FROG_NORTH, FROG_SOUTH, FROG_EAST, FROG_WEST
+
+    # Attribute width: The width of the frog image
+    # Invariant: width is a float > 0
+
+    # Attribute height: The height of the frog image
+    # Invariant: height is a float > 0
+
+    def __init__(self,jsondict,jsonhitbox):
+        '''
+        Initializes a frog at the start position of the level
+
+        Parameter jsondict: The JSON for level
+        Precondition: jsondict is a JSON file
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        '''
+        size = jsonhitbox['images']['frog']['size']
+        self.width  = float(size[0])
+        self.height = float(size[1])
+        self.x = float((jsondict['start'][0]* GRID_SIZE)+ GRID_SIZE/2)
+        self.y = float(jsondict['start'][1] + GRID_SIZE/2)
+        self.angle = FROG_NORTH
+
+    def bbox(self):
+        '''Returns the bounding box (l,t,r,b) of the frog'''
+        return _bbox(self.x,self.y,self.width,self.height,self.angle,(0,0,0,0))
+
+    def hop(self,direction):
+        """
+        Returns a new hop of the frog one grid square in the given direction
+
+        A hop is plain data: a list [axis,start,end,step,size,value,attached]. The hop
+        moves the frog coordinate axis ('x' or 'y') from start towards end by step
+        pixels a second. Once the coordinate is size pixels from start, it is put at end
+        and the hop is over. While attached is True, the coordinate is that of the frog;
+        otherwise it is value (see SimLevel._stepHop). The hop takes FROG_SPEED seconds.
+
+        Parameter direction: The direction to move.
+        Precondition: direction is one of 'up', 'down', 'left' or 'right'.
+        """
+        if direction in ('up','down'):
+            (axis,start,size) = ('y',self.y,self.height)
+        else:
+            (axis,start,size) = ('x',self.x,self.width)
+        if direction in ('up','right'):
+            end = start+GRID_SIZE
+        else:
+            end = start-GRID_SIZE
+        return [axis,start,end,(end-start)/FROG_SPEED,size,start,True]
+
+
+class SimLane(object):
+    """
+    A class representing a single lane as plain numbers.
+
+    A lane is one of 'grass', 'road', 'water' or 'hedge'.  It is GRID_SIZE high and
+    the width of the level wide.  All obstacles in a lane share the lane speed and
+    heading, so the lane stores a fixed obstacle pattern (the centers at phase 0) and a
+    single phase. The phase advances by speed*dt modulo the wrap length, which is the
+    level width plus the offscreen buffer on both sides. Moving a lane is O(1); the
+    obstacle centers are only computed from the pattern when they are asked for.
+
+    The obstacle hitboxes never change, so the parts of the bounding boxes that do not
+    depend on the position are computed once, when the lane is created.
+    """
+    # Attribute _type: The lane type
+    # Invariant: _type is one of 'grass', 'road', 'water' or 'hedge'
+
+    # Attribute _row: The row number of the lane
+    # Invariant: _row is an int >= 0
+
+    # Attribute _y: The vertical coordinate of the lane (and obstacle) centers
+    # Invariant: _y is a float
+
+    # Attribute _box: The bounding box (l,t,r,b) of the lane tile
+    # Invariant: _box is a 4-element tuple of floats
+
+    # Attribute _speed: The speed of the obstacles in the lane
+    # Invariant: _speed is an int or float, or None if the lane does not move
+
+    # Attribute _low: The left wraparound edge of the lane
+    # Invariant: _low is a number <= 0 (-inf if the lane does not move)
+
+    # Attribute _high: The right wraparound edge of the lane
+    # Invariant: _high is a number >= the level width (inf if the lane does not move)
+
+    # Attribute _period: The wrap length of the lane
+    # Invariant: _period is _high - _low (inf if the lane does not move)
+
+    # Attribute _angle: The angle of the obstacles in the lane
+    # Invariant: _angle is 0 or 180
+
+    # Attribute _base: The obstacle pattern (the obstacle centers at phase 0)
+    # Invariant: _base is a 1-d float64 NumPy array, with values in [_low,_high)
+
+    # Attribute _time: How long (in seconds) the lane has been moving
+    # Invariant: _time is a float >= 0
+
+    # Attribute _phase: How far the lane has scrolled, modulo the wrap length
+    # Invariant: _phase is phaseAt(_time), a float in [0,_period)
+
+    # Attribute _split: The position in _keys of the first obstacle that has wrapped
+    # Invariant: _split is an int; the obstacles _order[_split:] have wrapped, which
+    # means that _keys[k] + _phase >= _high exactly when k >= _split
+
+    # Attribute _xs: The obstacle centers at the current phase (a cache)
+    # Invariant: _xs is a float64 NumPy array the length of _base, or None if the
+    # lane moved since it was computed
+
+    # Attribute _types: The obstacle types (keys in objects.json)
+    # Invariant: _types is a list of strings, the same length as _base
+
+    # Attribute _sizes: The (width,height) of each obstacle
+    # Invariant: _sizes is a list of pairs of floats, the same length as _base
+
+    # Attribute _hits: The hitbox offsets of each obstacle
+    # Invariant: _hits is a list of 4-element tuples, the same length as _base
+
+    # Attribute _lefts: The offsets from an obstacle center to its hitbox left edge
+    # Invariant: _lefts is a float64 NumPy array with l = (x + _lefts[0]) - _lefts[1]
+
+    # Attribute _rights: The offsets from an obstacle center to its hitbox right edge
+    # Invariant: _rights is a float64 NumPy array with r = (x - _rights[0]) + _rights[1]
+
+    # Attribute _tops: The top edge of each obstacle hitbox
+    # Invariant: _tops is a float64 NumPy array, the same length as _base
+
+    # Attribute _bottoms: The bottom edge of each obstacle hitbox
+    # Invariant: _bottoms is a float64 NumPy array, the same length as _base
+
+    # Attribute _spans: The edge offsets and y-extent of each obstacle, as Python floats
+    # Invariant: _spans is a list of tuples (_lefts[0],_lefts[1],_rights[0],_rights[1],t,b)
+
+    # Attribute _reachl: The farthest a hitbox left edge is to the left of its center
+    # Invariant: _reachl is a float >= 0
+
+    # Attribute _reachr: The farthest a hitbox right edge is to the right of its center
+    # Invariant: _reachr is a float >= 0
+
+    # Attribute _keys: The index keys (the pattern centers), sorted
+    # Invariant: _keys is a sorted list of floats, the same length as _base
+
+    # Attribute _order: The obstacle index for each key
+    # Invariant: _order is a list of ints, parallel to _keys
+
+    # Attribute _occupied: The indices of the exits taken in a hedge, in order
+    # Invariant: _occupied is a list of ints
+
+    # Attribute _taken: Whether each obstacle is a taken exit
+    # Invariant: _taken is a list of bools, the same length as _base
+
+    # Attribute _numexits: The number of exits in the lane
+    # Invariant: _numexits is an int >= 0
+
+    # Attribute _columns: The exits and openings touching each grid column of a hedge
+    # Invariant: _columns is a list (one per column) of lists of obstacle indices in
+    # order, and is empty if the lane is not a hedge
+
+    # Attribute _cells: What is in each grid column of a hedge
+    # Invariant: _cells is a list (parallel to _columns) of 'hedge', 'open', 'exit' or
+    # 'taken', the type of the first exit or opening in the column (empty if unmapped)
+
+    def getType(self):
+        '''Returns the lane type'''
+        return self._type
+
+    def getRow(self):
+        '''Returns the row number of the lane'''
+        return self._row
+
+    def getSpeed(self):
+        '''Returns the speed of the lane, or None if it does not move'''
+        return self._speed
+
+    def getPositions(self):
+        '''Returns the NumPy array of obstacle centers (x-coordinates); do not change it'''
+        if self._xs is None:
+            self._xs = self._positions(self._phase,self._split)
+        return self._xs
+
+    def getPattern(self):
+        '''Returns the NumPy array of obstacle centers at phase 0; do not change it'''
+        return self._base
+
+    def getPhase(self):
+        '''Returns how far the lane has scrolled, modulo the wrap length'''
+        return self._phase
+
+    def getTime(self):
+        '''Returns how long (in seconds) the lane has been moving'''
+        return self._time
+
+    def getPeriod(self):
+        '''Returns the wrap length of the lane (inf if the lane does not move)'''
+        return self._period
+
+    def getLapped(self):
+        '''Returns the indices of the obstacles that have wrapped (one period back)'''
+        return self._order[self._split:]
+
+    def getTypes(self):
+        '''Returns the list of obstacle types'''
+        return self._types
+
+    def getOccupied(self):
+        '''Returns the indices of the taken exits, in the order they were taken'''
+        return self._occupied
+
+    def getNumExits(self):
+        '''Returns the number of exits in the lane'''
+        return self._numexits
+
+    def getNumOccupied(self):
+        '''Returns the number of occupied exits in the lane'''
+        return len(self._occupied)
+
+    def getCells(self):
+        '''Returns what is in each column of a hedge ('hedge','open','exit' or 'taken')'''
+        return self._cells
+
+    def getWrap(self):
+        '''Returns the wraparound edges (low,high) of the lane'''
+        return (self._low,self._high)
+
+    def __init__(self,jsondict,tile,jsonhitbox):
+        '''
+        Initializes a lane with given tile and a JSON of level and JSON of objects
+
+        Parameter jsondict: The JSON for level
+        Precondition: jsondict is a JSON file
+
+        Paramter tile: The row number
+        Precondition: tile is an integer
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        '''
+        self.reload(jsondict,tile,jsonhitbox)
+
+    def reload(self,jsondict,tile,jsonhitbox):
+        '''
+        Makes this lane the lane at row tile of jsondict, as if it were new
+
+        The lane time starts again at 0. This lets a level with a moving window of lanes
+        (see endless.py) use the same lane objects again for new rows.
+
+        Parameter jsondict: The JSON for level
+        Precondition: jsondict is a JSON file
+
+        Paramter tile: The row number
+        Precondition: tile is an integer
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        '''
+        singlelane = jsondict['lanes'][tile]
+        width = jsondict['size'][0]*GRID_SIZE
+        self._type = singlelane['type']
+        self._row = tile
+        self._y = float(GRID_SIZE * tile + GRID_SIZE/2)
+        self._box = _bbox(width/2,self._y,width,GRID_SIZE,0,(0,0,0,0))
+        self._occupied = []
+
+        self._speed = None
+        self._low = -np.inf
+        self._high = np.inf
+        self._period = np.inf
+        self._angle = 0
+        if 'speed' in singlelane:
+            self._speed = singlelane['speed']
+            buffer = jsondict['offscreen']
+            self._low  = -1 * buffer * GRID_SIZE
+            self._high = width + buffer * GRID_SIZE
+            self._period = float(self._high - self._low)
+            if self._speed < 0:
+                self._angle = 180
+
+        xs = []
+        self._types = []
+        self._sizes = []
+        self._hits = []
+        for obj in singlelane.get('objects',[]):
+            data = jsonhitbox['images'][obj['type']]
+            xs.append(float(obj['position'] * GRID_SIZE + GRID_SIZE/2))
+            self._types.append(obj['type'])
+            self._sizes.append((float(data['size'][0]),float(data['size'][1])))
+            self._hits.append(tuple(data['hitbox']))
+        self._base = np.array(xs,dtype=np.float64)
+        if self._speed is not None:
+            outside = (self._base < self._low) | (self._base >= self._high)
+            self._base[outside] = self._low + (self._base[outside] - self._low) % self._period
+        self._time = 0.0
+        self._phase = 0.0
+        self._xs = None
+        self._prepare()
+
+        self._taken = [False]*len(self._types)
+        self._numexits = self._types.count('exit')
+        self._columns = []
+        self._cells = []
+        if self._type == 'hedge' and self._speed is None:
+            self._mapCells(jsondict['size'][0])
+
+    def setTime(self,t):
+        '''
+        Moves the lane to the given lane time (see getTime)
+
+        Parameter t: The lane time
+        Precondition: t is a float >= 0
+        '''
+        if self._speed is None:
+            return
+        self._time = t
+        self._phase = self.phaseAt(t)
+        self._split = self._splitAt(self._phase)
+        self._xs = None
+
+    def setOccupied(self,occupied):
+        '''
+        Replaces the taken exits of a hedge with the exits occupied, in order
+
+        Parameter occupied: The indices of the taken exits (see getOccupied)
+        Precondition: occupied is a list of indices of distinct exits
+        '''
+        self._taken = [False]*len(self._types)
+        self._occupied = []
+        for col in range(len(self._columns)):
+            self._cells[col] = self._kind(col)
+        for i in occupied:
+            self._take(i)
+
+    def update(self,dt):
+        '''
+        Moves the obstacles by the lane speed, wrapping them at the offscreen buffer
+
+        Only the lane clock and phase change, so this takes constant time (plus a
+        binary search for the obstacles that wrapped).
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        '''
+        if self._speed is None:
+            return
+        self._time += dt
+        self._phase = self.phaseAt(self._time)
+        self._split = self._splitAt(self._phase)
+        self._xs = None
+
+    def phaseAt(self,t):
+        '''
+        Returns the phase of the lane once it has been moving for t seconds
+
+        Lane motion is linear and periodic, so this is (speed*t) modulo the wrap
+        length. The phase is 0 for a lane that does not move.
+
+        Parameter t: The lane time
+        Precondition: t is a number (it may be negative)
+        '''
+        if self._speed is None:
+            return 0.0
+        phase = (self._speed * t) % self._period
+        return 0.0 if phase >= self._period else phase
+
+    def lappedAt(self,t):
+        '''
+        Returns the indices of the obstacles that have wrapped once the lane has moved t seconds
+
+        This is getLapped at another lane time, computed without moving the lane.
+
+        Parameter t: The lane time
+        Precondition: t is a number (it may be negative)
+        '''
+        return self._order[self._splitAt(self.phaseAt(t)):]
+
+    def positionsAt(self,t):
+        '''
+        Returns the obstacle centers once the lane has been moving for t seconds
+
+        The centers are computed from the obstacle pattern, without stepping the
+        lane, so t may be far in the future (or the past). The result is a new NumPy
+        array, and positionsAt(getTime()) is equal to getPositions().
+
+        Parameter t: The lane time
+        Precondition: t is a number
+        '''
+        return self._positions(self.phaseAt(t))
+
+    def edgesAt(self,times):
+        '''
+        Returns the hitbox edges (l,r) of every obstacle at each of the given lane times
+
+        The values are two NumPy arrays with a row for each time and a column for each
+        obstacle. They are exactly the edges used by overlapping (and so by containing
+        and collideCar) at those times, computed for all of the times at once.
+
+        Parameter times: The lane times
+        Precondition: times is a 1-d NumPy array of numbers
+        '''
+        if self._speed is None:
+            phase = np.zeros(len(times))
+        else:
+            phase = (self._speed * times) % self._period
+            phase[phase >= self._period] = 0.0
+        xs = self._base[np.newaxis,:] + phase[:,np.newaxis]
+        xs = np.where(xs >= self._high,xs - self._period,xs)
+        l = (xs + self._lefts[0]) - self._lefts[1]
+        r = (xs - self._rights[0]) + self._rights[1]
+        return (l,r)
+
+    def occupied(self,left,right,t=None):
+        '''
+        Returns True if an obstacle hitbox overlaps [left,right] at lane time t
+
+        This is answered from the lane index in O(log n) time (plus the obstacles
+        that actually overlap the range), without stepping the lane.
+
+        Parameter left: The left end of the range
+        Precondition: left is a number
+
+        Parameter right: The right end of the range
+        Precondition: right is a number
+
+        Parameter t: The lane time (None for the current time)
+        Precondition: t is a number or None
+        '''
+        return len(self.overlapping(left,right,t)) > 0
+
+    def bbox(self,i):
+        '''
+        Returns the bounding box (l,t,r,b) of the obstacle at index i
+
+        Parameter i: The obstacle index
+        Precondition: i is a valid index into getPositions()
+        '''
+        size = self._sizes[i]
+        return _bbox(self._center(i),self._y,size[0],size[1],self._angle,self._hits[i])
+
+    def bounds(self):
+        '''
+        Returns the bounding boxes of all obstacles as four arrays (l,t,r,b)
+
+        The values are exactly those of bbox, for every obstacle at once.
+        '''
+        xs = self.getPositions()
+        l = (xs + self._lefts[0]) - self._lefts[1]
+        r = (xs - self._rights[0]) + self._rights[1]
+        return (l,self._tops,r,self._bottoms)
+
+    def collides(self,box):
+        '''
+        Returns True if the box collides with the lane tile
+
+        Parameter box: The bounding box (l,t,r,b) of an object (usually the frog)
+        Precondition: box is a 4-element tuple of floats
+        '''
+        return _overlaps(self._box,box)
+
+    def overlapping(self,left,right,t=None):
+        '''
+        Returns the indices of the obstacles whose hitboxes overlap [left,right], in order
+
+        The overlap test is the horizontal half of GObject.collides. This method uses
+        the lane index, so it only looks at the obstacles near the range.
+
+        Parameter left: The left end of the range
+        Precondition: left is a number
+
+        Parameter right: The right end of the range
+        Precondition: right is a number
+
+        Parameter t: The lane time (None for the current time)
+        Precondition: t is a number or None
+        '''
+        if t is None:
+            (phase,split) = (self._phase,self._split)
+        else:
+            phase = self.phaseAt(t)
+            split = self._splitAt(phase)
+        low  = min(left,right) - self._reachr - _SLACK - phase
+        high = max(left,right) + self._reachl + _SLACK - phase
+        keys = self._keys
+        candidates = self._order[bisect.bisect_left(keys,low):bisect.bisect_right(keys,high)]
+        if split < len(keys):
+            # The obstacles that wrapped are one period to the left of the pattern
+            low  += self._period
+            high += self._period
+            candidates += self._order[bisect.bisect_left(keys,low):bisect.bisect_right(keys,high)]
+
+        result = set()
+        for i in candidates:
+            (l,r) = self._edges(i,phase)
+            if left <= l <= right or l <= left <= r:
+                result.add(i)
+        return sorted(result)
+
+    def contains(self,i,point):
+        '''
+        Returns True if the obstacle at index i contains point
+
+        Parameter i: The obstacle index
+        Precondition: i is a valid index into getPositions()
+
+        Parameter point: The point to check
+        Precondition: point is a pair of numbers
+        '''
+        (l,t,r,b) = self.bbox(i)
+        return l <= point[0] <= r and b <= point[1] <= t
+
+    def containing(self,point,t=None):
+        '''
+        Returns the indices of the obstacles that contain point, in order
+
+        Parameter point: The point to check
+        Precondition: point is a pair of numbers
+
+        Parameter t: The lane time (None for the current time)
+        Precondition: t is a number or None
+        '''
+        px = point[0]
+        py = point[1]
+        phase = None if t is None else self.phaseAt(t)
+        result = []
+        for i in self.overlapping(px,px,t):
+            (l,r) = self._edges(i,phase)
+            span = self._spans[i]
+            if l <= px <= r and span[5] <= py <= span[4]:
+                result.append(i)
+        return result
+
+    def collideCar(self,box,t=None):
+        '''
+        Returns True if the box collides with an obstacle in the lane
+
+        Parameter box: The bounding box (l,t,r,b) of the frog
+        Precondition: box is a 4-element tuple of floats
+
+        Parameter t: The lane time (None for the current time)
+        Precondition: t is a number or None
+        '''
+        (l1,t1,r1,b1) = box
+        for i in self.overlapping(l1,r1,t):
+            span = self._spans[i]
+            t0 = span[4]
+            b0 = span[5]
+            if b1 <= b0 <= t1 or b0 <= b1 <= t0:
+                return True
+        return False
+
+    def onLog(self,frog,width,animation,dt):
+        '''
+        Returns whether the frog is safe on a log or in the water
+
+        This method returns 'lose life in water' if the frog moved offscreen on the
+        log or is in the water, but returns 'safe' if on a log. This also moves the
+        frog with the log if the frog is on the log.
+
+        Parameter frog: The frog to check and move
+        Precondition: frog has float attributes x and y
+
+        Parameter width: The width of the level
+        Precondition: width is an int
+
+        Parameter animation: The frog hop in progress
+        Precondition: animation is a hop (see SimFrog.hop) or None
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        '''
+        if len(self._base) == 0:
+            return 'lose life in water'
+        if animation is not None or len(self.containing((frog.x,frog.y))) > 0:
+            frog.x += self._speed * dt
+            if frog.x<0 or frog.x > width:
+                return 'lose life in water'
+            else:
+                return 'safe'
+        return 'lose life in water'
+
+    def canCont(self,frog,direction):
+        '''
+        Returns if the frog is in a hedge object and if it is, what type of object
+
+        This returns 'is exit' if the frog center is in a free exit (and marks that
+        exit as occupied), 'is opening' if it is in an opening, and 'not in object'
+        otherwise. Moving down into an exit or into a taken exit is 'not in object'.
+
+        Parameter frog: The frog to check
+        Precondition: frog has float attributes x and y
+
+        Parameter direction: The direction the frog is moving
+        Precondition: direction is 'up,'down','left', or 'right'
+        '''
+        col = math.floor(frog.x/GRID_SIZE)
+        if 0 <= col < len(self._columns):
+            if self._cells[col] == 'hedge':
+                return 'not in object'
+            candidates = [i for i in self._columns[col] if self.contains(i,(frog.x,frog.y))]
+        else:
+            candidates = self.containing((frog.x,frog.y))
+
+        for i in candidates:
+            if self._types[i] == 'exit':
+                if self._taken[i] or direction == 'down':
+                    return 'not in object'
+                else:
+                    self._take(i)
+                    return 'is exit'
+            elif self._types[i] == 'open':
+                return 'is opening'
+        return 'not in object'
+
+    def _mapCells(self,columns):
+        '''
+        Builds the column map of a hedge from the exits and openings in it
+
+        Parameter columns: The number of grid columns in the level
+        Precondition: columns is an int >= 0
+        '''
+        self._columns = [[] for col in range(columns)]
+        for i in range(len(self._types)):
+            if self._types[i] in ('exit','open'):
+                (l,r) = self._edges(i)
+                first = max(0,math.ceil(l/GRID_SIZE)-1)
+                last  = min(columns,math.floor(r/GRID_SIZE)+1)
+                for col in range(first,last):
+                    self._columns[col].append(i)
+        self._cells = []
+        for col in range(columns):
+            self._cells.append(self._kind(col))
+
+    def _kind(self,col):
+        '''
+        Returns what is in the given column of a hedge
+
+        Parameter col: The column number
+        Precondition: col is a valid index into _columns
+        '''
+        if len(self._columns[col]) == 0:
+            return 'hedge'
+        i = self._columns[col][0]
+        if self._taken[i]:
+            return 'taken'
+        return self._types[i]
+
+    def _take(self,i):
+        '''
+        Marks the exit at index i as occupied
+
+        Parameter i: The obstacle index
+        Precondition: i is the index of a free exit
+        '''
+        self._taken[i] = True
+        self._occupied.append(i)
+        for col in range(len(self._columns)):
+            if self._columns[col] and self._columns[col][0] == i:
+                self._cells[col] = 'taken'
+
+    def _prepare(self):
+        '''
+        Computes the parts of the obstacle bounding boxes that do not move
+        '''
+        n = len(self._types)
+        self._lefts   = np.zeros((2,n))
+        self._rights  = np.zeros((2,n))
+        self._tops    = np.zeros(n)
+        self._bottoms = np.zeros(n)
+        for i in range(n):
+            (width,height) = self._sizes[i]
+            hit = self._hits[i]
+            if self._angle == 0:
+                self._lefts[:,i]  = (hit[0],width/2)
+                self._rights[:,i] = (hit[2],width/2)
+            else:
+                self._lefts[:,i]  = (hit[2],width/2)
+                self._rights[:,i] = (hit[0],width/2)
+            (l,t,r,b) = _bbox(0.0,self._y,width,height,self._angle,hit)
+            self._tops[i] = t
+            self._bottoms[i] = b
+
+        self._spans = []
+        for i in range(n):
+            self._spans.append((float(self._lefts[0,i]),float(self._lefts[1,i]),
+                                float(self._rights[0,i]),float(self._rights[1,i]),
+                                float(self._tops[i]),float(self._bottoms[i])))
+        self._index()
+
+    def _edges(self,i,phase=None):
+        '''
+        Returns the left and right hitbox edges (l,r) of the obstacle at index i
+
+        These are exactly the values in bounds, computed for a single obstacle.
+
+        Parameter i: The obstacle index
+        Precondition: i is a valid index into getPositions()
+
+        Parameter phase: The lane phase (None for the current phase)
+        Precondition: phase is a float in [0,_period) or None
+        '''
+        x = self._center(i,phase)
+        span = self._spans[i]
+        return ((x + span[0]) - span[1],(x - span[2]) + span[3])
+
+    def _center(self,i,phase=None):
+        '''
+        Returns the center of the obstacle at index i, exactly as in getPositions
+
+        Parameter i: The obstacle index
+        Precondition: i is a valid index into getPositions()
+
+        Parameter phase: The lane phase (None for the current phase)
+        Precondition: phase is a float in [0,_period) or None
+        '''
+        x = float(self._base[i]) + (self._phase if phase is None else phase)
+        if x >= self._high:
+            x -= self._period
+        return x
+
+    def _positions(self,phase,split=None):
+        '''
+        Returns a new NumPy array of the obstacle centers at the given phase
+
+        Parameter phase: The lane phase
+        Precondition: phase is a float in [0,_period)
+
+        Parameter split: The value of _splitAt(phase) (None to compute it)
+        Precondition: split is an int or None
+        '''
+        if split is None:
+            split = self._splitAt(phase)
+        xs = self._base + phase
+        if split < len(self._keys):
+            xs[self._order[split:]] -= self._period
+        return xs
+
+    def _splitAt(self,phase):
+        '''
+        Returns the position in _keys of the first obstacle that has wrapped at phase
+
+        Parameter phase: The phase of the lane
+        Precondition: phase is a float in [0,_period)
+        '''
+        keys = self._keys
+        split = bisect.bisect_left(keys,self._high - phase)
+        # Settle the rounding of high - phase with the exact test used by _center
+        while split > 0 and keys[split-1] + phase >= self._high:
+            split -= 1
+        while split < len(keys) and keys[split] + phase < self._high:
+            split += 1
+        return split
+
+    def _index(self):
+        '''
+        Builds the lane index (the pattern centers, sorted) and the hitbox reaches
+        '''
+        self._order = sorted(range(len(self._base)),key=lambda i: self._base[i])
+        self._keys = [float(self._base[i]) for i in self._order]
+        self._reachl = 0.0
+        self._reachr = 0.0
+        for span in self._spans:
+            self._reachl = max(self._reachl,span[1] - span[0])
+            self._reachr = max(self._reachr,span[3] - span[2])
+        self._split = self._splitAt(self._phase)
+
+
+class SimLevel(object):
+    """
+    A class representing a whole level as plain numbers.
+
+    This is the model behind Level.  It has the same update method, with the same
+    return values ('in exit', 'more lives left' and 'no lives left'), but it takes any
+    input object with an is_key_down method (such as SimInput).
+    """
+    # Attribute _lanes: The lanes of the level, bottom to top (so also the row table)
+    # Invariant: _lanes is a list of SimLane, and _lanes[row].getRow() == row
+
+    # Attribute _bytype: The lanes of each type, bottom to top
+    # Invariant: _bytype is a dict from lane type to a list of SimLane
+
+    # Attribute _frog: The frog that the player uses to play the game
+    # Invariant: _frog is a SimFrog, or None if the frog is dead or safe
+
+    # Attribute _hop: The frog hop in progress (see SimFrog.hop)
+    # Invariant: _hop is a list, or None if the frog is not hopping. If the frog reached
+    # an exit or was hit by a car during the hop, the hop is not attached to a frog,
+    # but it still runs (and the keys do nothing) until it is over
+
+    # Attribute _slots: Where each hedge keeps its taken exits in a snapshot
+    # Invariant: _slots is a list of pairs (lane,offset) for the hedge lanes, where
+    # snapshot()[offset+i] is the order (from 1) in which exit i of lane was taken
+
+    # Attribute _size: The number of values in a snapshot
+    # Invariant: _size is an int > _HEAD
+
+    # Attribute _lives: The number of lives left
+    # Invariant: _lives is an int >= 0
+
+    # Attribute _exitsleft: The number of exits not yet taken, in all hedges
+    # Invariant: _exitsleft is an int >= 0
+
+    # Attribute _width: Width of the level in pixels
+    # Invariant: _width is an int
+
+    # Attribute _height: Height of the level in pixels (without the lives display)
+    # Invariant: _height is an int
+
+    # Attribute _killer: The row of the lane that killed the frog in the last update
+    # Invariant: _killer is an int, or None if the frog did not die in the last update
+
+    def getLanes(self):
+        '''Returns the list of lanes (SimLane objects) in the level'''
+        return self._lanes
+
+    def getLanesOfType(self,type):
+        '''
+        Returns the list of lanes (bottom to top) with the given type
+
+        Parameter type: The lane type
+        Precondition: type is one of 'grass', 'road', 'water' or 'hedge'
+        '''
+        return self._bytype.get(type,[])
+
+    def getFrog(self):
+        '''Returns the frog, or None if there is no frog on the screen'''
+        return self._frog
+
+    def getLives(self):
+        '''Returns the number of lives left'''
+        return self._lives
+
+    def getExitsLeft(self):
+        '''Returns the number of exits (in all hedges) that are not taken yet'''
+        return self._exitsleft
+
+    def getWidth(self):
+        '''Returns the width of the level in pixels'''
+        return self._width
+
+    def getHeight(self):
+        '''Returns the height of the level in pixels'''
+        return self._height
+
+    def getKiller(self):
+        '''
+        Returns the row of the lane that killed the frog in the last update
+
+        This is the road that hit the frog, or the water that it drowned in. It is None
+        if the last update did not take a life.
+        '''
+        return self._killer
+
+    def __init__(self,jsondictlvl,jsonhitbox):
+        """
+        Initializes a level with given level JSON and hitbox JSON
+
+        Parameter jsondictlvl: The JSON for level
+        Precondition: jsondictlvl is a JSON file
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+        """
+        self._level = jsondictlvl
+        self._hitbox = jsonhitbox
+        self._lanes = []
+        self._bytype = {}
+        for tile in range(len(jsondictlvl['lanes'])):
+            lane = SimLane(jsondictlvl,tile,jsonhitbox)
+            self._lanes.append(lane)
+            self._bytype.setdefault(lane.getType(),[]).append(lane)
+
+        self._hop = None
+        self._frog = SimFrog(jsondictlvl,jsonhitbox)
+        self._killer = None
+        self._lives = FROG_LIVES
+        self._exitsleft = 0
+        self._slots = []
+        offset = _HEAD+len(self._lanes)
+        for lane in self.getLanesOfType('hedge'):
+            self._exitsleft += lane.getNumExits()
+            self._slots.append((lane,offset))
+            offset += len(lane.getTypes())
+        self._size = offset
+        self._width = jsondictlvl['size'][0] * GRID_SIZE
+        self._height= jsondictlvl['size'][1] * GRID_SIZE
+
+    def update(self,input,dt):
+        """
+        Moves the frog and the obstacles forward one animation frame.
+
+        Returns 'in exit' if the frog reached an exit, 'more lives left' or 'no lives
+        left' if the frog died, and None otherwise.
+
+        Parameter input: The user input
+        Precondition: input has a method is_key_down (e.g. GInput or SimInput)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        """
+        self._killer = None
+        if self._hop is not None:               # We have something to animate
+            self._stepHop(dt)
+        elif input.is_key_down('up'):
+            return self._moveUp()
+        elif input.is_key_down('down'):
+            return self._moveDown()
+        elif input.is_key_down('left'):
+            self._moveLeft()
+        elif input.is_key_down('right'):
+            self._moveRight()
+
+        # Lanes move bottom to top, and lanes above a drowning do not move that frame
+        done = 0
+        for pos in self._rows(self._frog.bbox()):
+            lane = self._lanes[pos]
+            if lane.getType() == 'water' and lane.collides(self._frog.bbox()):
+                if self._hop is None:
+                    self._step(dt,done,pos+1)
+                    done = pos+1
+                    if lane.onLog(self._frog,
+                    self._width,self._hop,dt) == 'lose life in water':
+                        self._killer = lane.getRow()
+                        self._frog = None
+                        self._hop = None
+                        return self._changeLives()
+        self._step(dt,done,len(self._lanes))
+
+        if self._checkCarCollisions():
+                return self._changeLives()
+
+    def reconstructFrog(self):
+        '''Puts a new frog at the start position after it died or reached safety'''
+        self._frog = SimFrog(self._level,self._hitbox)
+
+    def snapshot(self):
+        '''
+        Returns the whole state of the level as a flat NumPy array of floats
+
+        The array has the lives, the exits left, the frog, the hop in progress, the
+        lane times and the order in which the exits were taken, always in the same
+        places for a level (see _HEAD). The level can be put back in this state with
+        restore. A snapshot takes a few microseconds.
+        '''
+        frog = self._frog
+        hop = self._hop
+        values = [self._lives,self._exitsleft]
+        if frog is None:
+            values += [0,0,0,0]
+        else:
+            values += [1,frog.x,frog.y,frog.angle]
+        if hop is None:
+            values += [0,0,0,0,0,0,0]
+        else:
+            values += [1 if hop[0] == 'x' else 2,hop[1],hop[2],hop[3],hop[4],hop[5],hop[6]]
+        values += [lane.getTime() for lane in self._lanes]
+        values += [0]*(self._size-len(values))
+        for (lane,offset) in self._slots:
+            for (order,i) in enumerate(lane.getOccupied()):
+                values[offset+i] = order+1
+        return np.array(values,dtype=np.float64)
+
+    def restore(self,data):
+        '''
+        Puts the level back in the state of a snapshot
+
+        Only the lanes that changed are moved, so restoring a recent snapshot is cheap.
+
+        Parameter data: The state of the level
+        Precondition: data is a value returned by snapshot for this level
+        '''
+        values = data.tolist()
+        self._lives = int(values[0])
+        self._exitsleft = int(values[1])
+        if values[2]:
+            if self._frog is None:
+                self._frog = SimFrog(self._level,self._hitbox)
+            (self._frog.x,self._frog.y,self._frog.angle) = (values[3],values[4],int(values[5]))
+        else:
+            self._frog = None
+        if values[6]:
+            self._hop = ['x' if values[6] == 1 else 'y']+values[7:12]+[bool(values[12])]
+        else:
+            self._hop = None
+
+        for (lane,time) in zip(self._lanes,values[_HEAD:]):
+            if lane.getTime() != time:
+                lane.setTime(time)
+        for (lane,offset) in self._slots:
+            ranks = values[offset:offset+len(lane.getTypes())]
+            occupied = sorted((i for i in range(len(ranks)) if ranks[i]),key=lambda i: ranks[i])
+            if occupied != lane.getOccupied():
+                lane.setOccupied(occupied)
+
+    def positionsAt(self,t):
+        '''
+        Returns the obstacle centers of every lane once the lanes have moved for t seconds
+
+        The result is a list (one NumPy array per lane, bottom to top) computed in closed
+        form, without stepping the level. Lanes above a drowning frog skip that frame, so
+        compare with getTime of each lane (not a level clock) when replaying a game.
+
+        Parameter t: The lane time
+        Precondition: t is a number
+        '''
+        return [lane.positionsAt(t) for lane in self._lanes]
+
+    def occupied(self,row,left,right,t=None):
+        '''
+        Returns True if an obstacle in the lane at row overlaps [left,right] at time t
+
+        This takes O(log n) time in the number of obstacles in the lane.
+
+        Parameter row: The row of the lane
+        Precondition: row is a valid index into getLanes()
+
+        Parameter left: The left end of the range
+        Precondition: left is a number
+
+        Parameter right: The right end of the range
+        Precondition: right is a number
+
+        Parameter t: The lane time (None for the current time)
+        Precondition: t is a number or None
+        '''
+        return self._lanes[row].occupied(left,right,t)
+
+    def _step(self,dt,first,last):
+        '''
+        Moves the obstacles of the lanes first..last-1
+
+        Each lane only advances its phase, so this takes constant time per lane, however
+        many obstacles there are.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+
+        Parameter first: The first lane to move
+        Precondition: first is an int >= 0
+
+        Parameter last: One past the last lane to move
+        Precondition: last is an int <= len(getLanes())
+        '''
+        for pos in range(first,last):
+            self._lanes[pos].update(dt)
+
+    def _rows(self,box):
+        '''
+        Returns the range of rows (bottom to top) whose lanes the box might touch
+
+        Lanes are GRID_SIZE high and stacked by row, so this is at most a couple of
+        rows, however many lanes there are. Callers still check the lane tile exactly.
+
+        Parameter box: The bounding box (l,t,r,b) of an object (usually the frog)
+        Precondition: box is a 4-element tuple of floats
+        '''
+        low  = min(box[1],box[3])               # t and b swap when the frog is sideways
+        high = max(box[1],box[3])
+        first = max(0,math.ceil(low/GRID_SIZE)-1)
+        last  = min(len(self._lanes),math.floor(high/GRID_SIZE)+1)
+        return range(first,last)
+
+    def _moveUp(self):
+        '''
+        Moves the frog forward, returning 'in exit' if it reaches an exit.
+        '''
+        self._frog.angle = FROG_NORTH
+        if self._frog.y + GRID_SIZE <= self._height:
+            self._frog.y += GRID_SIZE
+            collide = self._checkCollide('up')
+            self._frog.y -= GRID_SIZE
+            if collide != 'cannot go':
+                self._hop = self._frog.hop('up')
+            if collide == 'is exit':
+                self._detach()
+                self._frog = None
+                return 'in exit'
+
+    def _moveDown(self):
+        '''
+        Moves the frog downward, returning 'in exit' if it reaches an exit.
+        '''
+        self._frog.angle = FROG_SOUTH
+        if self._frog.y - GRID_SIZE >= 1:
+            self._frog.y -= GRID_SIZE
+            collide = self._checkCollide('down')
+            if collide == 'cannot go':
+                self._frog.y += GRID_SIZE
+            else:
+                self._frog.y += GRID_SIZE
+                self._hop = self._frog.hop('down')
+            if collide == 'is exit':
+                self._detach()
+                self._frog = None
+                return 'in exit'
+
+    def _moveLeft(self):
+        '''
+        Moves the frog left unless it would go into a hedge.
+        '''
+        self._frog.angle = FROG_WEST
+        if self._frog.x - GRID_SIZE >= 1:
+            self._frog.x -= GRID_SIZE
+            if self._checkCollide('left') == 'cannot go':
+                self._frog.x += GRID_SIZE
+            else:
+                self._frog.x += GRID_SIZE
+                self._hop = self._frog.hop('left')
+
+    def _moveRight(self):
+        '''
+        Moves the frog right unless it would go into a hedge.
+        '''
+        self._frog.angle = FROG_EAST
+        if self._frog.x + GRID_SIZE <= self._width:
+            self._frog.x += GRID_SIZE
+            if self._checkCollide('right') == 'cannot go':
+                self._frog.x -= GRID_SIZE
+            else:
+                self._frog.x -= GRID_SIZE
+                self._hop = self._frog.hop('right')
+
+    def _stepHop(self,dt):
+        '''
+        Moves the hop in progress forward by dt seconds, ending it if it is over
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        '''
+        hop = self._hop
+        if hop[6]:
+            value = getattr(self._frog,hop[0])+hop[3]*dt
+        else:
+            value = hop[5]+hop[3]*dt
+        if abs(value-hop[1]) >= hop[4]:
+            value = float(hop[2])
+            self._hop = None
+        if hop[6]:
+            setattr(self._frog,hop[0],value)
+        else:
+            hop[5] = value
+
+    def _detach(self):
+        '''
+        Lets the hop in progress (if any) run on without the frog, which is going away
+        '''
+        if self._hop is not None and self._hop[6]:
+            self._hop[5] = getattr(self._frog,self._hop[0])
+            self._hop[6] = False
+
+    def _changeLives(self):
+        '''
+        Takes away a life, returning 'more lives left' or 'no lives left'
+        '''
+        if self._lives > 0:
+            self._lives -= 1
+        if self._lives > 0:
+            return 'more lives left'
+        else:
+            return 'no lives left'
+
+    def _checkCollide(self,direction):
+        '''
+        Returns 'is exit', 'cannot go' or 'is opening' if the frog is in a hedge
+
+        Returns None if the frog is not in a hedge lane.
+
+        Parameter direction: The direction the frog is moving
+        Precondition: direction is 'up,'down','left', or 'right'
+        '''
+        box = self._frog.bbox()
+        for pos in self._rows(box):
+            lane = self._lanes[pos]
+            if lane.getType() == 'hedge' and lane.collides(box):
+                result = lane.canCont(self._frog,direction)
+                if result == 'is exit':
+                    self._exitsleft -= 1
+                    return 'is exit'
+                if result == 'not in object':
+                    return 'cannot go'
+                if result == 'is opening':
+                    return 'is opening'
+
+    def _checkCarCollisions(self):
+        '''
+        Returns True (and removes the frog) if the frog is hit by a car
+        '''
+        box = self._frog.bbox()
+        for pos in self._rows(box):
+            lane = self._lanes[pos]
+            if self._frog is not None:
+                if lane.getType() == 'road' and lane.collides(box):
+                    if lane.collideCar(box):
+                        self._killer = lane.getRow()
+                        self._detach()
+                        self._frog = None
+                        return True
+        return False
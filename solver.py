@@ -0,0 +1,1637 @@
+"""
+Level solver for frogger
+
+This module searches a level for a way to fill every exit of its hedges. The search
+is an A* search over animation frames, one trip at a time, and is greedy per exit:
+each trip is the fastest way from where the last one ended to whichever exit left the
+frog can reach first. The order of the exits is never searched, so with more than one
+exit the plan is not always the fastest overall, and a later trip that finds no way
+is 'unknown' rather than 'unsolvable'. A state is the row and column of the frog (its
+position is on the column grid until it rides a log), the hop in progress, the lane
+clock, and the exits taken so far. A frog riding a log is kept by the log it is on and
+its place on that log instead.
+
+Lane motion is linear and periodic, so the lanes are never stepped: the search asks
+each lane in closed form (see SimLane.occupied and friends) where its obstacles are at
+the time of a state. When the lane speeds are commensurate with the frame time, the
+whole level repeats after the least common multiple of the lane periods. The lane
+clock is then only kept modulo that period, which makes the state space finite. An
+exhausted search proves that the level cannot be solved only if it merged no distinct
+states (a frog on a log is snapped, see _Search._search); otherwise it is 'unknown'.
+
+Each frame of the search follows the same rules as SimLevel.update (with a fixed dt).
+Plans never lose a life. A plan can be checked against the model itself with the
+function replay.
+
+The search is guided by tables of the fewest frames to each exit, from each cell of
+the rows below it at each tick of the lane clock. These tables are for an easier level
+where the frog is only known to the cell, so they never overestimate. They are
+computed backwards in time with numpy. A state that the tables show cannot reach an
+exit at all is dropped, so they prune the search as well as order it. Large or hard
+levels may still need more than SOLVER_LIMIT states, in which case the result is
+'unknown' rather than a plan.
+
+The solver is memoized by a hash of the level and the search settings, so checking the
+same level file again is free. It can also be run from the command line:
+
+    python solver.py JSON/easy1.json JSON/error3.json
+
+This also times each level, and fails if one takes more than SOLVER_SECONDS.
+"""
+from consts import *
+from simulation import *
+from fractions import Fraction
+import hashlib
+import heapq
+import json
+import math
+import numpy as np
+import os
+import time
+
+# PRIMARY RULE: Like simulation.py, this module may only access consts.py and
+# simulation.py. It must never import game2d (or anything else that needs Kivy).
+
+# The default frame time of the search (in seconds), the fixed step of the game
+SOLVER_DT = 1/TICK_RATE
+
+# The default number of states the search may expand before it gives up
+SOLVER_LIMIT = 1000000
+
+# The most entries (ticks x cells x exits) in the lower bound tables
+SOLVER_TABLE = 1 << 25
+
+# The longest lane cycle (in frames) that the search keeps the lane clock modulo
+SOLVER_CYCLE = 1000000
+
+# The size (in pixels) of the steps that the frog position on a log is rounded to
+SOLVER_SNAP = GRID_SIZE/4
+
+# How far (in pixels) the frog keeps from the edges of logs and cars, as the lane time
+# of the model is a sum of frame times and may differ from that of the search by a hair
+SOLVER_MARGIN = 1e-6
+
+# The most seconds that main allows for searching each level
+SOLVER_SECONDS = 15.0
+
+# The moves the frog can try when it is not hopping (None waits a frame)
+SOLVER_KEYS = (None,'up','left','right','down')
+
+# The results of earlier searches, by hash
+_SOLVED = {}
+
+
+class Solution(object):
+    """
+    A class representing the result of solving a level.
+
+    The status is 'solved' if the search found a plan (greedy per exit, see solve),
+    'unsolvable' if the search proved that the frog cannot reach any exit, and 'unknown'
+    if it gave up (the state limit was reached, the lanes do not repeat within
+    SOLVER_CYCLE frames, the search merged distinct states and so did not look at all
+    of them, or a later trip found no way to the exits left).
+
+    The plan is the key to press on each frame (None for no key), for SimLevel.update
+    with the solver dt. After each update that returns 'in exit', call reconstructFrog
+    before the next frame, as the game does when the player continues.
+    """
+    # Attribute _status: The result of the search
+    # Invariant: _status is one of 'solved', 'unsolvable' or 'unknown'
+
+    # Attribute _moves: The key pressed on each frame
+    # Invariant: _moves is a list of 'up', 'down', 'left', 'right' or None (empty if
+    # the level is not solved)
+
+    # Attribute _expanded: The number of states the search expanded
+    # Invariant: _expanded is an int >= 0
+
+    # Attribute _cycle: The length (in frames) of the lane cycle
+    # Invariant: _cycle is an int > 0, or None if the lanes do not repeat soon enough
+
+    def getStatus(self):
+        '''Returns 'solved', 'unsolvable' or 'unknown' '''
+        return self._status
+
+    def getMoves(self):
+        '''Returns the key to press on each frame (None for no key), as a list'''
+        return self._moves
+
+    def getFrames(self):
+        '''Returns the number of frames in the plan (None if the level is not solved)'''
+        return len(self._moves) if self._status == 'solved' else None
+
+    def getExpanded(self):
+        '''Returns the number of states the search expanded'''
+        return self._expanded
+
+    def getCycle(self):
+        '''Returns the length (in frames) of the lane cycle, or None if it is too long'''
+        return self._cycle
+
+    def __init__(self,status,moves,expanded,cycle):
+        '''
+        Initializes a solution with the given search results
+
+        Parameter status: The result of the search
+        Precondition: status is one of 'solved', 'unsolvable' or 'unknown'
+
+        Parameter moves: The key pressed on each frame
+        Precondition: moves is a list of key names or None
+
+        Parameter expanded: The number of states the search expanded
+        Precondition: expanded is an int >= 0
+
+        Parameter cycle: The length (in frames) of the lane cycle
+        Precondition: cycle is an int > 0 or None
+        '''
+        self._status = status
+        self._moves = moves
+        self._expanded = expanded
+        self._cycle = cycle
+
+    def __repr__(self):
+        '''Returns a readable summary of this solution'''
+        if self._status == 'solved':
+            return '<Solution solved in %d frames>' % len(self._moves)
+        return '<Solution %s>' % self._status
+
+
+def solve(jsondict,jsonhitbox,dt=SOLVER_DT,limit=SOLVER_LIMIT):
+    '''
+    Returns the Solution with a greedy plan to fill every exit of the level
+
+    The plan fills every exit without dying, in frames of length dt. It is greedy per
+    exit: each trip is the fastest way to the exit that the frog can reach first, and
+    other orders of the exits are not tried (see _Search.run). The results are memoized
+    by a hash of the level, the hitboxes and the search settings.
+
+    Parameter jsondict: The JSON for level
+    Precondition: jsondict is a JSON file
+
+    Paramter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+
+    Parameter dt: The time of each frame
+    Precondition: dt is a float > 0
+
+    Parameter limit: The number of states to expand before giving up
+    Precondition: limit is an int > 0
+    '''
+    key = levelHash(jsondict,jsonhitbox,dt,limit)
+    if not key in _SOLVED:
+        _SOLVED[key] = _Search(jsondict,jsonhitbox,dt,limit).run()
+    return _SOLVED[key]
+
+
+def solveFile(filename,hitname,dt=SOLVER_DT,limit=SOLVER_LIMIT):
+    '''
+    Returns the Solution for the level file filename (see solve)
+
+    Parameter filename: The path to the level JSON file
+    Precondition: filename is a string
+
+    Parameter hitname: The path to the objects JSON file
+    Precondition: hitname is a string
+
+    Parameter dt: The time of each frame
+    Precondition: dt is a float > 0
+
+    Parameter limit: The number of states to expand before giving up
+    Precondition: limit is an int > 0
+    '''
+    with open(filename) as file:
+        jsondict = json.load(file)
+    with open(hitname) as file:
+        jsonhitbox = json.load(file)
+    return solve(jsondict,jsonhitbox,dt,limit)
+
+
+def levelHash(jsondict,jsonhitbox,dt=SOLVER_DT,limit=SOLVER_LIMIT):
+    '''
+    Returns a hash (a hex string) of a level and the search settings
+
+    Two levels with the same content have the same hash, however their files are
+    formatted. The frog speed is included, as it can be changed on the command line.
+
+    Parameter jsondict: The JSON for level
+    Precondition: jsondict is a JSON file
+
+    Paramter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+
+    Parameter dt: The time of each frame
+    Precondition: dt is a float > 0
+
+    Parameter limit: The number of states to expand before giving up
+    Precondition: limit is an int > 0
+    '''
+    data = json.dumps([jsondict,jsonhitbox,dt,limit,FROG_SPEED],sort_keys=True)
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def replay(jsondict,jsonhitbox,moves,dt=SOLVER_DT):
+    '''
+    Returns the results of playing moves in a new SimLevel, as a list
+
+    Each frame presses the key in moves (if any) and calls update with dt. The result
+    has the value returned by update for each frame. After 'in exit' the frog is put
+    back at the start, as in the game. A plan that works fills every exit (so the
+    level has no exits left) with no deaths.
+
+    Parameter jsondict: The JSON for level
+    Precondition: jsondict is a JSON file
+
+    Paramter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+
+    Parameter moves: The key pressed on each frame
+    Precondition: moves is a list of key names or None
+
+    Parameter dt: The time of each frame
+    Precondition: dt is a float > 0
+    '''
+    level = SimLevel(jsondict,jsonhitbox)
+    input = SimInput()
+    results = []
+    for key in moves:
+        input.setKeys([] if key is None else [key])
+        result = level.update(input,dt)
+        results.append(result)
+        if result == 'in exit':
+            level.reconstructFrog()
+        elif result is not None:
+            break
+    return results
+
+
+class _Search(object):
+    """
+    A class running one A* search over the frames of a level.
+
+    A state is a tuple (x,y,angle,hop,tick,taken). The frog is at (x,y) with the given
+    heading. The value hop is None, or the pair ('wait',frames) after an exit: the hop
+    of the old frog keeps running (and blocks the keys) for a few frames. The value
+    tick counts the frames in which the lanes moved (modulo the lane cycle), and taken
+    is a bit mask of the exits taken. The frames of a hop are one step of the search.
+
+    States are compared by their cell (see _key): the row and column of the frog (or
+    the log it rides and its place on that log), the lane clock and the exits taken.
+    Only the fastest state to reach a cell is searched further. It keeps the exact
+    position of its frog, so a plan does exactly what the model does.
+
+    The moves from a frog position are worked out once for every value of the lane
+    clock at the same time (see _outcome). So expanding a state is a few lookups, and
+    the same moves give the tables of the lower bounds.
+    """
+    # Attribute _level: The model used for the lanes and the level geometry
+    # Invariant: _level is a SimLevel that is never updated
+
+    # Attribute _width: The width of the level
+    # Invariant: _width is an int > 0
+
+    # Attribute _height: The height of the level
+    # Invariant: _height is an int > 0
+
+    # Attribute _size: The width and height of the frog
+    # Invariant: _size is a pair of floats > 0
+
+    # Attribute _sizes: The half width and half height of the frog box, by heading
+    # Invariant: _sizes is a dict from FROG_ headings to pairs of floats (the height is
+    # negative when the frog faces sideways, as in SimFrog.bbox)
+
+    # Attribute _lanes: The lanes touched by the frog, by (y,angle) (see _near)
+    # Invariant: _lanes is a dict from pairs to lists of (SimLane,str) pairs
+
+    # Attribute _kinds: The type of the lane in each row
+    # Invariant: _kinds is a list of lane types, bottom to top
+
+    # Attribute _dt: The time of each frame
+    # Invariant: _dt is a float > 0
+
+    # Attribute _limit: The number of states to expand before giving up
+    # Invariant: _limit is an int > 0
+
+    # Attribute _cycle: The number of frames after which every lane repeats
+    # Invariant: _cycle is an int > 0, or None if that is more than SOLVER_CYCLE
+
+    # Attribute _times: The lane time of each tick of the cycle
+    # Invariant: _times is a 1-d NumPy array of _cycle floats (None if _cycle is None)
+
+    # Attribute _outcomes: The moves already worked out (see _outcome)
+    # Invariant: _outcomes is a dict from (frog,move,exits) to outcome tuples
+
+    # Attribute _glides: The frames of the hops up and down with no checks (see _glide)
+    # Invariant: _glides is a dict from (y,angle,hop) to pairs (y,frames)
+
+    # Attribute _merged: The tables of the exits left (see _merge)
+    # Invariant: _merged is a dict from exit masks to (table,exits) pairs
+
+    # Attribute _edges: The obstacle edges of each lane at every tick (see SimLane.edgesAt)
+    # Invariant: _edges is a dict from rows to pairs of arrays, by tick and obstacle. The
+    # keys (row,'phase') and (row,'list') hold the phases (see _phasesOf) and the edges
+    # as lists, with the obstacles at each height (see _logsAt)
+
+    # Attribute _crossed: The obstacles overlapping a range at every tick (see _mask)
+    # Invariant: _crossed is a dict from (row,left,right) to arrays of bools, by tick
+    # and obstacle
+
+    # Attribute _masks: The ticks at which a check kills the frog (see _mask)
+    # Invariant: _masks is a dict from (row,kind,value) to arrays of bools, by tick
+
+    # Attribute _exits: The bit for each exit, by (row,index)
+    # Invariant: _exits is a dict from pairs of ints to powers of two
+
+    # Attribute _rows: The row of each exit bit
+    # Invariant: _rows is a dict from powers of two to ints
+
+    # Attribute _nearby: The exits that a move from each row can reach
+    # Invariant: _nearby is a dict from rows to exit masks (the exits in the rows next
+    # to it and in it)
+
+    # Attribute _start: The frog of a new state (x,y,angle)
+    # Invariant: _start is a tuple of two floats and a FROG_ heading
+
+    # Attribute _hop: The frames for a hop up or down (the key frame plus the slide)
+    # Invariant: _hop is an int > 1
+
+    # Attribute _side: The frames for a hop left or right (the key frame plus the slide)
+    # Invariant: _side is an int > 1
+
+    # Attribute _columns: The number of columns of the level
+    # Invariant: _columns is an int > 0
+
+    # Attribute _layers: The number of layers of the tables (see _layout)
+    # Invariant: _layers is 2 if a frog can ride a log below the highest exit, else 1
+
+    # Attribute _wrap: The wraparound of the water lanes (see _findWrap)
+    # Invariant: _wrap is a pair of ints (offscreen,columns), or None
+
+    # Attribute _places: The first cell of each row of each layer in the tables
+    # Invariant: _places is a dict from (layer,row) to ints (empty if there are no tables)
+
+    # Attribute _total: The number of cells in the tables
+    # Invariant: _total is an int >= 0
+
+    # Attribute _bounds: The fewest frames to reach each exit (see _findBounds)
+    # Invariant: _bounds is a dict from exit bits to arrays of floats (by tick and cell,
+    # with one more cell that is math.inf); it is empty if there are no tables. The
+    # exits of a hedge with openings share one array, for the whole hedge.
+
+    # Attribute _full: The mask with every exit taken
+    # Invariant: _full is an int >= 0
+
+    # Attribute _open: The rows of the hedges with openings
+    # Invariant: _open is a set of ints
+
+    def __init__(self,jsondict,jsonhitbox,dt,limit):
+        '''
+        Initializes a search of the given level
+
+        Parameter jsondict: The JSON for level
+        Precondition: jsondict is a JSON file
+
+        Paramter jsonhitbox: The JSON for objects and the hitboxes
+        Precondition: jsonhitbox is a JSON file
+
+        Parameter dt: The time of each frame
+        Precondition: dt is a float > 0
+
+        Parameter limit: The number of states to expand before giving up
+        Precondition: limit is an int > 0
+        '''
+        self._level = SimLevel(jsondict,jsonhitbox)
+        frog = SimFrog(jsondict,jsonhitbox)
+        self._start = (frog.x,frog.y,frog.angle)
+        self._height = self._level.getHeight()
+        self._width = self._level.getWidth()
+        self._size = (frog.width,frog.height)
+        self._sizes = {FROG_NORTH: (frog.width/2,frog.height/2),
+                       FROG_SOUTH: (frog.width/2,frog.height/2),
+                       FROG_EAST:  (frog.height/2,-frog.width/2),
+                       FROG_WEST:  (frog.height/2,-frog.width/2)}
+        self._lanes = {}
+        self._kinds = [lane.getType() for lane in self._level.getLanes()]
+        self._dt = dt
+        self._limit = limit
+        self._cycle = self._findCycle()
+        self._times = None if self._cycle is None else np.arange(self._cycle)*dt
+        self._outcomes = {}
+        self._glides = {}
+        self._merged = {}
+        self._edges = {}
+        self._crossed = {}
+        self._masks = {}
+
+        self._columns = jsondict['size'][0]
+        self._hop = 1+self._slide(frog.height)
+        self._side = 1+self._slide(frog.width)
+
+        self._exits = {}
+        self._rows = {}
+        self._open = set()
+        goals = {}
+        for lane in self._level.getLanesOfType('hedge'):
+            types = lane.getTypes()
+            for i in range(len(types)):
+                if types[i] == 'exit':
+                    bit = 1 << len(self._exits)
+                    self._exits[(lane.getRow(),i)] = bit
+                    self._rows[bit] = lane.getRow()
+                    (l,t,r,b) = lane.bbox(i)
+                    goals[bit] = (l,r)
+                elif types[i] == 'open':
+                    self._open.add(lane.getRow())
+        self._nearby = {}
+        for (bit,exit) in self._rows.items():
+            for row in (exit-1,exit,exit+1):
+                self._nearby[row] = self._nearby.get(row,0) | bit
+        self._full = (1 << len(self._exits))-1
+
+        self._prepare(goals)
+
+    def run(self):
+        '''
+        Returns the Solution found by searching the level
+
+        The plan is made one trip at a time (see _search): each trip is the fastest way
+        from where the last one ended (at first, the start of the level) to any exit
+        left. So a level with one exit gets the fastest plan. With more exits, the plan
+        fills the nearest exit first, which is not always the fastest overall.
+        '''
+        state = self._startState(0,0)
+        (moves,expanded) = ([],0)
+        while state[5] != self._full:
+            (status,state,plan,count) = self._search(state,self._limit-expanded)
+            expanded += count
+            if status != 'solved':
+                if moves and status == 'unsolvable':
+                    # Another order of the exits may start this trip at a better time
+                    status = 'unknown'
+                return Solution(status,[],expanded,self._cycle)
+            moves.extend(plan)
+        return Solution('solved',moves,expanded,self._cycle)
+
+    def _search(self,start,limit):
+        '''
+        Returns the tuple (status,state,moves,expanded) for the fastest trip from start
+
+        A trip ends with the first move that takes an exit. The status is 'solved' if
+        the search found one (state is then the state after that move, and moves are
+        the keys pressed to get there), 'unsolvable' if there is none, and 'unknown' if
+        the search expanded more than limit states. The value expanded is the number of
+        states expanded.
+
+        States in the same cell (see _key) are merged, and only one of them is searched
+        further. If a merged state had a different frog position or hop, then the search
+        did not look at every state, and an exhausted search is 'unknown' instead of
+        'unsolvable'. A level where the frog never leaves the grid has no such merges.
+
+        A state is only kept if its lower bound (see _estimate) is finite, so the tables
+        prune the states that cannot reach an exit, as well as order the others. Among
+        states with the same estimate, the one with more frames played (so closer to
+        the exits) is expanded first.
+
+        Parameter start: The state to start from
+        Precondition: start is a search state with exits left
+
+        Parameter limit: The number of states to expand before giving up
+        Precondition: limit is an int
+        '''
+        taken = start[5]
+        count = 0
+        first = self._key(start)
+        states = {first: start}
+        parents = {first: None}
+        costs = {first: 0}
+        queue = [(self._estimate(start),0,count,first)]
+        if queue[0][0] == math.inf:
+            return ('unsolvable',None,[],0)
+        expanded = 0
+        dropped = False
+        while queue:
+            (f,depth,order,key) = heapq.heappop(queue)
+            g = -depth
+            if g > costs[key]:
+                continue
+            state = states[key]
+            if state[5] != taken:
+                return ('solved',state,self._plan(parents,key),expanded)
+            expanded += 1
+            if expanded > limit:
+                return ('unknown',None,[],expanded)
+
+            # The keys do nothing while the old hop runs after an exit
+            for move in (SOLVER_KEYS if state[3] is None else SOLVER_KEYS[:1]):
+                (after,frames) = self._advance(state,move)
+                if after is None:
+                    continue
+                akey = self._key(after)
+                cost = g+frames
+                if akey in costs and states[akey] != after:
+                    # One of the two is not searched, so exhausting the search proves nothing
+                    dropped = True
+                if not akey in costs or cost < costs[akey]:
+                    estimate = 0 if after[5] != taken else self._estimate(after)
+                    if estimate == math.inf:
+                        continue
+                    states[akey] = after
+                    costs[akey] = cost
+                    parents[akey] = (key,move,frames)
+                    count += 1
+                    heapq.heappush(queue,(cost+estimate,-cost,count,akey))
+
+        status = 'unknown' if self._cycle is None or dropped else 'unsolvable'
+        return (status,None,[],expanded)
+
+    # HELPERS FOR THE SEARCH
+    def _findCycle(self):
+        '''
+        Returns the number of frames after which every lane repeats, or None
+
+        A lane repeats after k frames when speed*k*dt is a multiple of its wrap length.
+        The result is None if the cycle is longer than SOLVER_CYCLE frames.
+        '''
+        step = Fraction(self._dt).limit_denominator(1000000)
+        cycle = 1
+        for lane in self._level.getLanes():
+            speed = lane.getSpeed()
+            if speed is None or len(lane.getPattern()) == 0:
+                continue
+            moved = abs(Fraction(speed).limit_denominator(1000000))*step
+            ratio = moved/Fraction(lane.getPeriod()).limit_denominator(1000000)
+            cycle = cycle*ratio.denominator//math.gcd(cycle,ratio.denominator)
+            if cycle > SOLVER_CYCLE:
+                return None
+        return cycle
+
+    def _slide(self,size):
+        '''
+        Returns the number of frames the frog slides to move a distance size
+
+        Parameter size: The distance the frog must move (its height or width)
+        Precondition: size is a float > 0
+        '''
+        (pos,step,frames) = (0.0,GRID_SIZE/FROG_SPEED,0)
+        while abs(pos) < size:
+            pos += step*self._dt
+            frames += 1
+        return frames
+
+    def _prepare(self,goals):
+        '''
+        Computes the lower bounds used by _estimate
+
+        There is a table for each exit (or for each hedge with openings, where the frog
+        can walk to any of its exits) of the fewest frames to get into it, from each
+        cell below it at each tick (see _findBounds). The tables are only made if they
+        have at most SOLVER_TABLE entries in all.
+
+        Parameter goals: The horizontal range (l,r) from which a hop up gets into each exit
+        Precondition: goals is a dict from exit bits to pairs of floats
+        '''
+        (self._bounds,self._places,self._total) = ({},{},0)
+        (terms,tops,index) = ([],[],{})
+        for (bit,exit) in self._rows.items():
+            key = (exit,None if exit in self._open else bit)
+            if exit > 0 and not key in index:
+                index[key] = len(tops)
+                tops.append(exit)
+                terms.append((index[key],exit-1,(0,self._width) if exit in self._open else goals[bit]))
+        top = max(tops,default=0)
+        self._layers = 2 if 'water' in self._kinds[:top] else 1
+        self._wrap = self._findWrap(top) if self._layers == 2 else None
+        if self._cycle is None or not tops or (self._layers == 2 and self._wrap is None):
+            return
+
+        if self._cycle*self._layout(top)*len(tops) > SOLVER_TABLE:
+            self._places = {}
+            return
+        bounds = self._findBounds(terms,tops,top)
+        for (bit,exit) in self._rows.items():
+            key = (exit,None if exit in self._open else bit)
+            if key in index:
+                self._bounds[bit] = bounds[:,index[key]]
+
+    def _layout(self,top):
+        '''
+        Returns the number of cells below the row top, after placing them in _places
+
+        A frog that has not ridden a log is always on the column grid, and it has cells
+        of its own (layer 0), which know exactly when the cars hit it. If the frog can
+        ride a log, there are also cells for a frog anywhere in its column, and for a
+        frog on a log, by its place in the lane (the last layer, see _findCells).
+
+        Parameter top: The number of rows to place
+        Precondition: top is an int > 0
+        '''
+        (self._places,size) = ({},0)
+        for row in range(top):
+            if self._kinds[row] == 'water':
+                self._places[(self._layers-1,row)] = size
+                size += self._wrap[1]
+            else:
+                for layer in range(self._layers):
+                    self._places[(layer,row)] = size
+                    size += self._columns
+        self._total = size
+        return size
+
+    def _findWrap(self,top):
+        '''
+        Returns the pair (offscreen,columns) of the water lanes below the row top, or None
+
+        The value offscreen is the number of columns that the lanes wrap beyond each
+        edge of the screen, and columns is the number of columns in a whole wrap
+        length. A frog on a log is found in the tables by its place in that wrap length
+        (see _findCells), which needs a whole number of columns, with at least one off
+        the screen. The result is None if a water lane does not have them.
+
+        Parameter top: The number of rows to look at
+        Precondition: top is an int > 0
+        '''
+        wrap = None
+        for lane in self._level.getLanes()[:top]:
+            if lane.getType() == 'water':
+                (low,high) = lane.getWrap()
+                if lane.getSpeed() is None or low > -GRID_SIZE or low % GRID_SIZE or high % GRID_SIZE:
+                    return None
+                wrap = (round(-low/GRID_SIZE),round(lane.getPeriod()/GRID_SIZE))
+        return wrap
+
+    def _findCells(self,top):
+        '''
+        Returns the cells below the row top where a frog may be, as an array of bools
+
+        The array is by tick and cell (see _layout). Outside of the water, the cell is
+        the column. It is False in a hedge that has no opening there.
+
+        In the water, the cell of a frog is its place in the lane (counted from the
+        left wraparound edge) at its next check, so it does not change as the frog
+        rides a log. It is False if no log reaches that place, or if the frog is sure
+        to be off the screen after the check at that tick.
+
+        Parameter top: The number of rows to describe
+        Precondition: top is an int > 0
+        '''
+        (cycle,columns) = (self._cycle,self._columns)
+        edges = np.arange(columns)*GRID_SIZE
+        allowed = np.zeros((cycle,self._total),dtype=bool)
+        for ((layer,row),first) in self._places.items():
+            lane = self._level.getLanes()[row]
+            cells = allowed[:,first:first+columns]
+            if lane.getType() == 'water':
+                low = lane.getWrap()[0]
+                y = row*GRID_SIZE+self._start[1] % GRID_SIZE
+                (l,r) = lane.edgesAt(np.zeros(1))
+                (tops,bottoms) = lane.bounds()[1::2]
+                level = (bottoms <= y) & (y <= tops)
+                (l,r) = ((l[0,level]-low)/GRID_SIZE,(r[0,level]-low)/GRID_SIZE)
+                wrap = self._wrap[1]
+                place = np.arange(wrap)[:,None]
+                logs = np.zeros(len(place),dtype=bool)
+                for lap in (-wrap,0,wrap):
+                    logs |= ((l+lap <= place+1+1e-6) & (r+lap >= place-1e-6)).any(axis=1)
+                # The frog must be on the screen after the drift
+                x = self._drifted(row,np.arange(cycle))+lane.getSpeed()*self._dt/GRID_SIZE
+                allowed[:,first:first+len(logs)] = logs & (x <= columns+1e-6) & (x+1 >= -1e-6)
+            elif lane.getType() == 'hedge':
+                types = lane.getTypes()
+                for i in range(len(types)):
+                    if types[i] == 'open':
+                        (l,t,r,b) = lane.bbox(i)
+                        cells |= (l <= edges+GRID_SIZE) & (r >= edges)
+            else:
+                cells[:] = True
+        return allowed
+
+    def _phasesOf(self,lane):
+        '''
+        Returns the phase of a lane at every tick of the cycle, in columns
+
+        These are the phases of SimLane.phaseAt (and so SimLane.edgesAt). The results are
+        cached.
+
+        Parameter lane: The lane
+        Precondition: lane is a moving SimLane of the level
+        '''
+        key = (lane.getRow(),'phase')
+        if not key in self._edges:
+            period = lane.getPeriod()
+            phase = (lane.getSpeed()*self._times) % period
+            phase[phase >= period] = 0.0
+            self._edges[key] = phase/GRID_SIZE
+        return self._edges[key]
+
+    def _findDeaths(self,top):
+        '''
+        Returns the ticks at which each move is not open to a frog in each cell below top
+
+        The result is a list of arrays of bools, by tick and cell (see _layout): for
+        waiting a frame, and for a hop up, left, right and down (as in SOLVER_KEYS). A
+        move is marked at a tick if it kills a frog on the column grid (or wherever it
+        is in the column in the other layer, see _sweep), and a wait if it kills the
+        frog whichever way it faces. The hops that do not land in a cell of the same
+        layer (from the water, into the water, or out of the rows) are always marked,
+        as the tables treat them in other ways (see _findMoves).
+
+        Parameter top: The number of rows to describe
+        Precondition: top is an int > 0
+        '''
+        (cycle,columns) = (self._cycle,self._columns)
+        deaths = [np.zeros((cycle,self._total),dtype=bool) for move in SOLVER_KEYS]
+        (shift,lift) = (self._start[0] % GRID_SIZE,self._start[1] % GRID_SIZE)
+        for ((layer,row),first) in self._places.items():
+            y = row*GRID_SIZE+lift
+            for pos in range(len(SOLVER_KEYS)):
+                move = SOLVER_KEYS[pos]
+                step = (0,1,0,0,-1)[pos]
+                if pos > 0 and (self._kinds[row] == 'water' or not (layer,row+step) in self._places
+                                or self._kinds[row+step] == 'water'):
+                    deaths[pos][:,first:first+columns] = True
+                    continue
+                if self._kinds[row] == 'water':
+                    continue
+                for col in range(columns):
+                    x = col*GRID_SIZE+(shift if layer == 0 else GRID_SIZE/2)
+                    dead = deaths[pos][:,first+col]
+                    dead[:] = True
+                    for angle in ((FROG_NORTH,FROG_EAST) if move is None else (FROG_NORTH,)):
+                        dead &= self._sweep((x,y,angle,None),move,layer == 0)
+        return deaths
+
+    def _sweep(self,frog,move,grid):
+        '''
+        Returns the ticks at which a move kills a frog, as an array
+
+        The move is made at each tick of the cycle. The array is True at a tick if a
+        car hits the frog on some frame of the move. If grid is False, the frog is at
+        the center of its column, and the array is only True if a car hits it wherever
+        it started in the column. It is all False if the move is blocked, takes an
+        exit, or ends in the water, as the tables treat those moves in other ways.
+
+        Parameter frog: The frog (x,y,angle,hop)
+        Precondition: frog is a tuple with no hop in progress
+
+        Parameter move: The key pressed
+        Precondition: move is one of SOLVER_KEYS
+
+        Parameter grid: Whether the frog is on the column grid
+        Precondition: grid is a bool
+        '''
+        (key,ticks,dead) = (move,0,np.zeros(self._cycle,dtype=bool))
+        while True:
+            (frog,taken,moved,result,found) = self._frame(frog,key,0)
+            if not result is None or (not key is None and frog[3] is None):
+                return np.zeros(self._cycle,dtype=bool)
+            if moved:
+                ticks += 1
+            for (lane,kind,value) in found:
+                if kind != 'car':
+                    return np.zeros(self._cycle,dtype=bool)
+                if grid:
+                    dead |= np.roll(self._mask(lane,'car',value),-ticks)
+                else:
+                    # A frog up to half a column away has this box moved that far
+                    (l1,t1,r1,b1) = value
+                    cover = (r1-GRID_SIZE/2,t1,l1+GRID_SIZE/2,b1)
+                    dead |= np.roll(self._mask(lane,'cover',cover),-ticks)
+            if frog[3] is None:
+                return dead
+            key = None
+
+    def _findSteps(self):
+        '''
+        Returns the cells that the hops on land get to, as a list of arrays of ints
+
+        The list is for a hop up, left, right and down (as in SOLVER_KEYS, with None
+        for the wait). The array for a hop has the cell it gets to from each cell (see
+        _layout), or the number of cells if it does not get to a cell of the same layer
+        on land (see _findMoves).
+        '''
+        steps = [None]+[np.full(self._total,self._total) for pos in range(len(SOLVER_KEYS)-1)]
+        columns = np.arange(self._columns)
+        for ((layer,row),first) in self._places.items():
+            if self._kinds[row] == 'water':
+                continue
+            for (pos,step,side) in ((1,1,0),(2,0,-1),(3,0,1),(4,-1,0)):
+                target = (layer,row+step)
+                if target in self._places and self._kinds[row+step] != 'water':
+                    inside = (columns+side >= 0) & (columns+side < self._columns)
+                    steps[pos][first+columns[inside]] = self._places[target]+columns[inside]+side
+        return steps
+
+    def _findMoves(self,top):
+        '''
+        Returns the hops from the water and into the water below the row top
+
+        Where these hops land depends on the lane clock. The result is a list of tuples
+        (sources,targets,delay,frames): a hop from the cell sources[i] (see _layout) at
+        tick k lands delay ticks later on one of the cells targets[k,i] (the number of
+        cells if none). The hop takes that many frames. The place of a frog in the
+        water is only known to a cell, so a hop may land on any of the cells it reaches.
+
+        Parameter top: The number of rows to describe
+        Precondition: top is an int > 0
+        '''
+        (cycle,layers,columns) = (self._cycle,self._layers,self._columns)
+        (hop,side) = (self._hop,self._side)
+        ticks = np.arange(cycle)
+        (hops,sides) = ([],[])
+        for ((layer,row),first) in self._places.items():
+            if self._kinds[row] == 'water':
+                # The frog has drifted with the lanes of the next tick (see _drifted)
+                x = self._drifted(row,(ticks+1) % cycle)
+                sources = first+np.arange(x.shape[1])
+                landing = (ticks+hop-1) % cycle
+                hops.append((sources,[self._targets(x,1,row+1,landing),
+                                      self._targets(x,1,row-1,landing)]))
+                landing = (ticks+side) % cycle
+                sides.append((sources,[self._targets(x-1,1,row,landing),
+                                       self._targets(x+1,1,row,landing)]))
+            elif layers > 1:
+                # The hops into land are in the arrays of _findSteps
+                (x,width) = (np.arange(columns),1)
+                if layer == 0:
+                    (x,width) = (x+self._start[0] % GRID_SIZE/GRID_SIZE,0)
+                x = np.broadcast_to(x,(cycle,columns))
+                water = [0 <= row+step < top and self._kinds[row+step] == 'water' for step in (1,-1)]
+                landing = (ticks+hop-1) % cycle
+                targets = [self._targets(x,width,row+step if water[pos] else -1,landing)
+                           for (pos,step) in enumerate((1,-1))]
+                if True in water:
+                    hops.append((first+np.arange(columns),targets))
+        moves = []
+        for (group,delay,frames) in ((hops,hop-1,hop),(sides,side,side)):
+            # The hops with as many targets are made together
+            sizes = {}
+            for (sources,targets) in group:
+                targets = np.concatenate(targets,axis=2)
+                sizes.setdefault(targets.shape[2],[]).append((sources,targets))
+            for parts in sizes.values():
+                moves.append((np.concatenate([sources for (sources,targets) in parts]),
+                              np.concatenate([targets for (sources,targets) in parts],axis=1),
+                              delay,frames))
+        return moves
+
+    def _targets(self,x,width,row,ticks):
+        '''
+        Returns the cells of row that a frog in columns [x,x+width] may land on
+
+        The result has the shape of x with one more axis for the cells (see _layout), or
+        the number of cells if none. The cells are in the last layer. The frog lands in
+        the water at the given ticks, one for each value in the first axis of x.
+
+        Parameter x: The left end of the frog position (in columns), by tick
+        Precondition: x is an array of floats with an axis for the ticks of the cycle
+
+        Parameter width: The width of the frog position (in columns)
+        Precondition: width is a float, 0 <= width <= 1
+
+        Parameter row: The row the frog lands on
+        Precondition: row is an int
+
+        Parameter ticks: The tick the frog lands at, for each tick of the cycle
+        Precondition: ticks is a 1-d array of ints
+        '''
+        first = self._places.get((self._layers-1,row))
+        if first is None:
+            return np.full(x.shape+(3,),self._total,dtype=np.int32)
+        (limit,water) = (self._columns,self._kinds[row] == 'water')
+        if water:
+            # The cells in the water are places in the lane
+            lane = self._level.getLanes()[row]
+            x = x+self._wrap[0]-self._phasesOf(lane)[ticks].reshape((-1,)+(1,)*(x.ndim-1))
+            limit = self._wrap[1]
+        start = np.floor(x-1e-6).astype(np.int64)
+        targets = np.full(x.shape+(3,),self._total,dtype=np.int32)
+        for step in range(targets.shape[-1]):
+            cell = start+step
+            valid = cell <= x+width+1e-6
+            if water:
+                cell = cell % limit
+            else:
+                valid &= (cell >= 0) & (cell < limit)
+            targets[...,step] = np.where(valid,first+cell,self._total)
+        return targets
+
+    def _columnsIn(self,place,layer):
+        '''
+        Returns the columns where a frog in a layer may be in a goal place, as a list
+
+        Parameter place: The range (l,r) of the frog position
+        Precondition: place is a pair of floats
+
+        Parameter layer: The layer of the frog (see _layout)
+        Precondition: layer is an int >= 0
+        '''
+        (l,r) = place
+        if layer == 0:
+            shift = self._start[0] % GRID_SIZE
+            return [col for col in range(self._columns) if l <= col*GRID_SIZE+shift <= r]
+        return [col for col in range(self._columns) if l < (col+1)*GRID_SIZE and r >= col*GRID_SIZE]
+
+    def _drifted(self,row,ticks):
+        '''
+        Returns the left end (in columns) of a frog in each cell of a water row
+
+        The cell of a frog in the water is its place in the lane (see _findCells). The
+        result is by tick (one for each value in ticks), and it is for the phase of the
+        lane at that tick: the place of the check before the drift at that tick, or
+        after the drift at the tick before it.
+
+        Parameter row: The water row
+        Precondition: row is an int, the row of a water lane
+
+        Parameter ticks: The ticks to find the positions at
+        Precondition: ticks is a 1-d array of ints in the cycle
+        '''
+        (offscreen,wrap) = self._wrap
+        place = np.arange(wrap)
+        phases = self._phasesOf(self._level.getLanes()[row])[ticks]
+        return (place+phases[:,None]) % wrap-offscreen
+
+    def _findBounds(self,terms,tops,top):
+        '''
+        Returns the fewest frames to reach the goals of some tables, by tick, table and
+        cell
+
+        The result is an array b where b[tick,table,cell] is the number of frames a frog
+        in that cell (see _layout) needs from the lane clock tick, or math.inf if it
+        cannot. It has one more cell at the end, which is always math.inf. This solves
+        an easier level, where the frog is only known to the cell and its heading does
+        not matter. It only dies in the cells where it may not be (see _findCells), or
+        when a car hits it (see _findDeaths). A frog that survives the real level also
+        survives this one, so the table is a lower bound.
+
+        Every move goes forward in time, so the tables are computed backwards from the
+        last tick of the cycle, all of them at once. The moves that wrap around the
+        cycle need a few passes. After the first pass, a pass stops as soon as the
+        values are the same as before for longer than any move.
+
+        Parameter terms: The goal of each table, a hop up into the exit
+        Precondition: terms is a list of (table,row,place) tuples, where place is the
+        range (l,r) of the frog position
+
+        Parameter tops: The number of rows that each table may use
+        Precondition: tops is a list of ints > 0, one for each table
+
+        Parameter top: The number of rows of the tables
+        Precondition: top is max(tops)
+        '''
+        (cycle,size,count) = (self._cycle,self._total,len(tops))
+        (hop,side) = (self._hop,self._side)
+        blocked = ~self._findCells(top)
+        opened = [~dead for dead in self._findDeaths(top)]
+        steps = self._findSteps()
+        moves = self._findMoves(top) if self._layers > 1 else []
+        outside = np.zeros((count,size),dtype=bool)
+        for ((layer,row),first) in self._places.items():
+            outside[:,first:first+self._columns] = row >= np.array(tops)[:,None]
+            if self._kinds[row] == 'water':
+                outside[:,first:first+self._wrap[1]] = row >= np.array(tops)[:,None]
+
+        # The goals in the water depend on the tick
+        (goal,afloat) = (np.full((count,size),np.inf,dtype=np.float32),[])
+        for (table,row,(l,r)) in terms:
+            if self._kinds[row] == 'water':
+                x = self._drifted(row,np.arange(1,cycle+1) % cycle)
+                inside = (x*GRID_SIZE <= r+1e-6) & ((x+1)*GRID_SIZE >= l-1e-6)
+                afloat.append((table,self._places[(self._layers-1,row)],inside))
+            else:
+                for layer in range(self._layers):
+                    for col in self._columnsIn((l,r),layer):
+                        goal[table,self._places[(layer,row)]+col] = 1
+
+        bounds = np.full((cycle,count,size+1),np.inf,dtype=np.float32)
+        delays = [hop-1,side]+[delay for (sources,targets,delay,frames) in moves]
+        (reach,block) = (max(delays),max(min(delays),1))
+        (first,changed) = (True,True)
+        while changed:
+            (changed,quiet,top) = (False,0,cycle-1)
+            while top >= 0:
+                # The hops of a block of ticks land after it, so they are found together
+                ticks = np.arange(top,max(top-block,-1),-1)
+                best = np.repeat(goal[None],len(ticks),axis=0)
+                for (table,start,inside) in afloat:
+                    part = best[:,table,start:start+inside.shape[1]]
+                    np.minimum(part,1,out=part,where=inside[ticks])
+                for (pos,delay,frames) in ((1,hop-1,hop),(2,side,side),(3,side,side),(4,hop-1,hop)):
+                    values = bounds[(ticks+delay) % cycle][:,:,steps[pos]]+frames
+                    np.minimum(best,values,out=best,where=opened[pos][ticks][:,None])
+                for (sources,targets,delay,frames) in moves:
+                    later = bounds[(ticks+delay) % cycle]
+                    (near,part) = (targets[ticks],best[:,:,sources])
+                    for slot in range(near.shape[2]):
+                        values = np.take_along_axis(later,near[:,None,:,slot],axis=2)+frames
+                        np.minimum(part,values,out=part)
+                    best[:,:,sources] = part
+                for i in range(len(ticks)):
+                    (k,part) = (ticks[i],best[i])
+                    np.minimum(part,bounds[(k+1) % cycle,:,:size]+1,out=part,where=opened[0][k])
+                    np.copyto(part,np.inf,where=blocked[k])
+                    np.copyto(part,np.inf,where=outside)
+                    if (part < bounds[k,:,:size]).any():
+                        (changed,quiet) = (True,0)
+                        bounds[k,:,:size] = part
+                    else:
+                        quiet += 1
+                top -= len(ticks)
+                if not first and quiet >= reach:
+                    break
+            first = False
+        return bounds
+
+    def _startState(self,tick,taken,hop=None):
+        '''
+        Returns the state of a new frog at the start position
+
+        Parameter tick: The lane clock (in frames)
+        Precondition: tick is an int >= 0
+
+        Parameter taken: The mask of the exits taken
+        Precondition: taken is an int >= 0
+
+        Parameter hop: The hop in progress
+        Precondition: hop is None or a hop tuple
+        '''
+        return self._start+(hop,tick,taken)
+
+    def _time(self,tick):
+        '''
+        Returns the lane time of the given frame count
+
+        Parameter tick: The lane clock (in frames)
+        Precondition: tick is an int >= 0
+        '''
+        return tick*self._dt
+
+    def _key(self,state):
+        '''
+        Returns the cell of a state, to compare states
+
+        The cell of a frog riding a log is the log and the place of the frog on it
+        (rounded to SOLVER_SNAP pixels). Otherwise it is the row and column of the frog,
+        and the hop of the old frog after an exit. The cell also has the lane clock and
+        the exits taken.
+
+        Parameter state: The state to compare
+        Precondition: state is a search state
+        '''
+        (x,y,angle,hop,tick,taken) = state
+        row = math.floor(y/GRID_SIZE)
+        if hop is None and 0 <= row < len(self._kinds) and self._kinds[row] == 'water':
+            lane = self._level.getLanes()[row]
+            logs = self._logsAt(lane,(x,y),tick,0)
+            if logs and self._cycle is None:
+                base = float(lane.positionsAt(self._time(tick))[logs[0]])
+                return (row,'log',logs[0],round((x-base)/SOLVER_SNAP),tick,taken)
+            elif logs:
+                base = self._edges[(row,'list')][0][tick % self._cycle][logs[0]]
+                return (row,'log',logs[0],round((x-base)/SOLVER_SNAP),tick,taken)
+        return (row,self._column(x),hop,tick,taken)
+
+    def _plan(self,parents,key):
+        '''
+        Returns the keys pressed to reach a state, as a list
+
+        Parameter parents: The parent of each state reached, the key pressed, and the
+        frames until the next state
+        Precondition: parents is a dict from state keys to triples (key,move,frames)
+        or None
+
+        Parameter key: The key of the state reached
+        Precondition: key is a key of parents
+        '''
+        moves = []
+        while parents[key] is not None:
+            (key,move,frames) = parents[key]
+            moves.extend([None]*(frames-1)+[move])
+        moves.reverse()
+        return moves
+
+    def _estimate(self,state):
+        '''
+        Returns a lower bound on the frames needed to take another exit from state
+
+        The bound is the fewest frames to the nearest exit left. It is read from the
+        tables of the exits left, all at once (see _merge). After an exit, the new frog also waits for the old hop. The result is
+        math.inf if no exit left can be reached.
+
+        Parameter state: The state to estimate
+        Precondition: state is a search state
+        '''
+        (x,y,angle,hop,tick,taken) = state
+        row = math.floor(y/GRID_SIZE)
+        wait = hop[1] if not hop is None else 0
+        if not self._cycle is None:
+            tick = (tick+wait) % self._cycle
+        if not taken in self._merged:
+            self._merged[taken] = self._merge(taken)
+        (table,exits) = self._merged[taken]
+        best = math.inf
+        for (exit,tabled) in exits:
+            if not tabled or row >= exit:
+                best = min(best,self._trip(row,exit))
+        if not table is None and 0 <= row < len(self._kinds):
+            (layer,cell) = self._cell(x,row,tick)
+            if (layer,row) in self._places:
+                best = min(best,float(table[tick,self._places[(layer,row)]+cell]))
+        return wait+best
+
+    def _merge(self,taken):
+        '''
+        Returns the pair (table,exits) used by _estimate for the exits left after taken
+
+        The value table is the least of the tables of the exits left (see _findBounds),
+        or None if none of them has a table. The value exits is a list of the pairs
+        (row,tabled) of the exits left, where tabled is True if the table has that exit.
+        Below the row of an exit with a table, the table knows it; otherwise a frog
+        needs a hop for each row below the exit (the hop into the exit ends as soon as
+        it starts).
+
+        Parameter taken: The mask of the exits taken
+        Precondition: taken is an int >= 0
+        '''
+        (table,exits) = (None,[])
+        for (bit,exit) in self._rows.items():
+            if not taken & bit:
+                exits.append((exit,bit in self._bounds))
+                if bit in self._bounds:
+                    table = self._bounds[bit] if table is None else np.minimum(table,self._bounds[bit])
+        return (table,exits)
+
+    def _cell(self,x,row,tick):
+        '''
+        Returns the pair (layer,cell) of a frog in its row of the tables (see _layout)
+
+        Parameter x: The horizontal coordinate of the frog
+        Precondition: x is a float
+
+        Parameter row: The row of the frog
+        Precondition: row is an int
+
+        Parameter tick: The lane clock (in frames)
+        Precondition: tick is an int >= 0
+        '''
+        water = 0 <= row < len(self._kinds) and self._kinds[row] == 'water'
+        if not self._places or not water:
+            grid = self._layers == 1 or (x-self._start[0]) % GRID_SIZE == 0
+            return (0 if grid else self._layers-1,self._column(x))
+        phase = self._phasesOf(self._level.getLanes()[row])[(tick+1) % self._cycle]
+        place = (x/GRID_SIZE+self._wrap[0]-phase) % self._wrap[1]
+        return (self._layers-1,min(math.floor(place),self._wrap[1]-1))
+
+    def _column(self,x):
+        '''
+        Returns the column of the frog at horizontal coordinate x
+
+        Parameter x: The horizontal coordinate of the frog (on the screen)
+        Precondition: x is a float
+        '''
+        return min(max(math.floor(x/GRID_SIZE),0),self._columns-1)
+
+    def _trip(self,row,exit):
+        '''
+        Returns the fewest frames for a frog in row to get into an exit in row exit
+
+        Parameter row: The row of the frog
+        Precondition: row is an int
+
+        Parameter exit: The row of the exit
+        Precondition: exit is an int
+        '''
+        return max(exit-row-1,0)*self._hop + 1
+
+    def _advance(self,state,move):
+        '''
+        Returns the pair (state,frames) after pressing move and waiting out any hop
+
+        The value frames is the number of frames that this takes. The state is None if
+        the frog dies.
+
+        Parameter state: The state before the move
+        Precondition: state is a search state
+
+        Parameter move: The key pressed
+        Precondition: move is one of SOLVER_KEYS
+        '''
+        (x,y,angle,hop,tick,taken) = state
+        (frog,gain,frames,ticks,result,dead) = self._outcome((x,y,angle,hop),move,taken)
+        if result == 'dead' or self._dies(dead,tick):
+            return (None,frames)
+        tick = tick+ticks
+        if not self._cycle is None:
+            tick = tick % self._cycle
+        return (frog+(tick,taken | gain),frames)
+
+    def _outcome(self,frog,move,taken):
+        '''
+        Returns what happens after pressing move and waiting out any hop, at any tick
+
+        The positions of the frog do not depend on the lane clock, only whether it
+        dies. So the result is a tuple (frog,gain,frames,ticks,result,dead): the frog
+        after the move (x,y,angle,hop), the exits it took, the frames that the move
+        takes, the frames in which the lanes moved, and the result of the last frame
+        (None, 'in exit' or 'dead'). The value dead is an array of bools, by the tick
+        at the start of the move, of when the frog dies. If the lanes do not repeat, or
+        the frog is off the column grid (after a log ride, so that it seldom comes
+        back to the same place), it is the list of checks to make instead (see _dies).
+        The results are cached.
+
+        The move stops after an exit (the new frog then waits for the old hop), or
+        once every exit is taken.
+
+        Parameter frog: The frog before the move (x,y,angle,hop)
+        Precondition: frog is a tuple
+
+        Parameter move: The key pressed
+        Precondition: move is one of SOLVER_KEYS
+
+        Parameter taken: The mask of the exits taken
+        Precondition: taken is an int >= 0
+        '''
+        near = self._nearby.get(math.floor(frog[1]/GRID_SIZE),0)
+        key = (frog,move,taken & near,taken | near == self._full)
+        if key in self._outcomes:
+            return self._outcomes[key]
+
+        (first,frames,ticks,checks) = (taken,0,0,[])
+        while True:
+            if frames > 0 and frog[3][0] != 'wait':
+                (frog,count) = self._glide(frog)
+                (frames,ticks) = (frames+count,ticks+count)
+            (frog,taken,moved,result,found) = self._frame(frog,move if frames == 0 else None,taken)
+            frames += 1
+            if moved:
+                ticks += 1
+            checks.extend((ticks,lane,kind,value) for (lane,kind,value) in found)
+            if not result is None or frog[3] is None or taken == self._full:
+                break
+
+        dead = checks
+        if not self._cycle is None and (key[0][0]-self._start[0]) % GRID_SIZE == 0:
+            dead = np.zeros(self._cycle,dtype=bool)
+            for (offset,lane,kind,value) in checks:
+                dead |= np.roll(self._mask(lane,kind,value),-offset)
+        outcome = (frog,taken & ~first,frames,ticks,result,dead)
+        self._outcomes[key] = outcome
+        return outcome
+
+    def _dies(self,dead,tick):
+        '''
+        Returns True if a move that starts at tick kills the frog
+
+        Parameter dead: The deaths of the move (see _outcome)
+        Precondition: dead is an array of bools by tick, or a list of checks (offset,
+        lane,kind,value): a car check ('car',box) or a log check ('log',point), made
+        offset frames after tick
+
+        Parameter tick: The lane clock (in frames)
+        Precondition: tick is an int >= 0
+        '''
+        if type(dead) != list:
+            return dead[tick]
+        for (offset,lane,kind,value) in dead:
+            when = self._time(tick+offset)
+            if kind == 'car':
+                (l,t,r,b) = value
+                box = (l-SOLVER_MARGIN,t,r+SOLVER_MARGIN,b)
+                if lane.collideCar(box,when):
+                    return True
+            if kind == 'log' and not self._logsAt(lane,value,tick+offset,SOLVER_MARGIN):
+                return True
+        return False
+
+    def _logsAt(self,lane,point,tick,margin):
+        '''
+        Returns the indices of the obstacles that contain point at tick, as a list
+
+        This is the test of SimLane.containing, but the obstacles must reach margin past
+        the point on both sides. It uses the edges of _edgesOf when the lanes repeat.
+
+        Parameter lane: The lane to check
+        Precondition: lane is a SimLane of the level
+
+        Parameter point: The point to check
+        Precondition: point is a pair of floats
+
+        Parameter tick: The lane clock (in frames)
+        Precondition: tick is an int >= 0
+
+        Parameter margin: The distance to keep from the ends of the obstacles
+        Precondition: margin is a float >= 0
+        '''
+        (px,py) = point
+        if self._cycle is None:
+            when = self._time(tick)
+            left = lane.containing((px-margin,py),when)
+            right = lane.containing((px+margin,py),when)
+            return [i for i in left if i in right]
+        key = (lane.getRow(),'list')
+        if not key in self._edges:
+            (l,r) = self._edgesOf(lane)
+            self._edges[key] = (l.tolist(),r.tolist(),{})
+        (l,r,levels) = self._edges[key]
+        if not py in levels:
+            (tops,bottoms) = lane.bounds()[1::2]
+            levels[py] = [i for i in range(len(tops)) if bottoms[i] <= py <= tops[i]]
+        (l,r) = (l[tick % self._cycle],r[tick % self._cycle])
+        return [i for i in levels[py] if l[i] <= px-margin and r[i] >= px+margin]
+
+    def _mask(self,lane,kind,value):
+        '''
+        Returns the ticks of the cycle at which a check kills the frog, as an array
+
+        A car check ('car',box) kills the frog if a car collides with the box, as in
+        SimLane.collideCar. A log check ('log',point) kills the frog if no log contains
+        the point, as in SimLane.containing. Both keep SOLVER_MARGIN from the edges. A cover check ('cover',box) kills the
+        frog if a car at the height of the box reaches from its left edge to its right
+        edge (see _sweep). The results are cached.
+
+        Parameter lane: The lane to check
+        Precondition: lane is a SimLane of the level
+
+        Parameter kind: The kind of check
+        Precondition: kind is 'car', 'log' or 'cover'
+
+        Parameter value: The frog box (for a car or cover check) or center (for a log
+        check)
+        Precondition: value is a tuple of floats
+        '''
+        key = (lane.getRow(),kind,value)
+        if not key in self._masks:
+            (l,tops,r,bottoms) = lane.bounds()
+            if kind == 'log':
+                (px,py) = value
+                level = (bottoms <= py) & (py <= tops)
+                (l,r) = self._edgesOf(lane)
+                crossed = (l <= px-SOLVER_MARGIN) & (r >= px+SOLVER_MARGIN)
+                self._masks[key] = ~crossed[:,level].any(axis=1)
+            else:
+                (l1,t1,r1,b1) = value
+                level = ((b1 <= bottoms) & (bottoms <= t1)) | ((bottoms <= b1) & (b1 <= tops))
+                if kind == 'car':
+                    crossed = self._crossing(lane,l1-SOLVER_MARGIN,r1+SOLVER_MARGIN)
+                else:
+                    (l,r) = self._edgesOf(lane)
+                    crossed = (l <= l1) & (r >= r1)
+                self._masks[key] = crossed[:,level].any(axis=1)
+        return self._masks[key]
+
+    def _crossing(self,lane,left,right):
+        '''
+        Returns the obstacles that overlap [left,right] at each tick, as an array
+
+        The array is by tick and obstacle, with the overlap test of SimLane.overlapping.
+        The results are cached.
+
+        Parameter lane: The lane to check
+        Precondition: lane is a SimLane of the level
+
+        Parameter left: The left end of the range
+        Precondition: left is a float
+
+        Parameter right: The right end of the range
+        Precondition: right is a float >= left
+        '''
+        key = (lane.getRow(),left,right)
+        if not key in self._crossed:
+            (l,r) = self._edgesOf(lane)
+            self._crossed[key] = ((left <= l) & (l <= right)) | ((l <= left) & (left <= r))
+        return self._crossed[key]
+
+    def _edgesOf(self,lane):
+        '''
+        Returns the obstacle edges (l,r) of a lane at every tick of the cycle
+
+        Parameter lane: The lane
+        Precondition: lane is a SimLane of the level
+        '''
+        if not lane.getRow() in self._edges:
+            self._edges[lane.getRow()] = lane.edgesAt(self._times)
+        return self._edges[lane.getRow()]
+
+    # THE RULES OF A FRAME (SEE SimLevel.update)
+    def _frame(self,frog,key,taken):
+        '''
+        Returns the tuple (frog,taken,moved,result,checks) after one frame with key pressed
+
+        The frog is (x,y,angle,hop), and moved is True if the lanes moved on the frame.
+        The result is None, 'in exit' (the frog is then a new frog at the start) or
+        'dead'. The frog survives the frame only if it passes every check in the list
+        checks at the lane time after the frame (see _dies).
+
+        Parameter frog: The frog before the frame (x,y,angle,hop)
+        Precondition: frog is a tuple
+
+        Parameter key: The key pressed
+        Precondition: key is one of SOLVER_KEYS
+
+        Parameter taken: The mask of the exits taken
+        Precondition: taken is an int >= 0
+        '''
+        (x,y,angle,hop) = frog
+        dt = self._dt
+        if not hop is None and hop[0] == 'wait':
+            hop = None if hop[1] == 1 else ('wait',hop[1]-1)
+        elif not hop is None:
+            (axis,start,end,step,size) = hop
+            if axis == 'y':
+                y = y+step*dt
+                if abs(y-start) >= size:
+                    (y,hop) = (float(end),None)
+            else:
+                x = x+step*dt
+                if abs(x-start) >= size:
+                    (x,hop) = (float(end),None)
+        elif key in ('up','down'):
+            angle = FROG_NORTH if key == 'up' else FROG_SOUTH
+            sign = 1 if key == 'up' else -1
+            if (key == 'up' and y + GRID_SIZE <= self._height) or (key == 'down' and y - GRID_SIZE >= 1):
+                (collide,taken) = self._hedge(x,y+sign*GRID_SIZE,angle,key,taken)
+                if collide != 'cannot go':
+                    end = y+sign*GRID_SIZE
+                    hop = ('y',y,end,(end-y)/FROG_SPEED,self._size[1])
+                if collide == 'is exit':
+                    # The hop of the old frog still runs after the new frog appears
+                    return (self._start+(('wait',self._hop-1),),taken,False,'in exit',[])
+            # The lanes do not move on this frame
+            return ((x,y,angle,hop),taken,False,None,[])
+        elif key in ('left','right'):
+            angle = FROG_WEST if key == 'left' else FROG_EAST
+            sign = 1 if key == 'right' else -1
+            if (key == 'left' and x - GRID_SIZE >= 1) or (key == 'right' and x + GRID_SIZE <= self._width):
+                (collide,taken) = self._hedge(x+sign*GRID_SIZE,y,angle,key,taken)
+                if collide != 'cannot go':
+                    end = x+sign*GRID_SIZE
+                    hop = ('x',x,end,(end-x)/FROG_SPEED,self._size[0])
+
+        checks = []
+        lanes = self._near(y,angle)
+        if hop is None:
+            for (lane,kind) in lanes:
+                if kind == 'water':
+                    if len(lane.getPattern()) == 0:
+                        return ((x,y,angle,hop),taken,True,'dead',[])
+                    checks.append((lane,'log',(x,y)))
+                    x += lane.getSpeed() * dt
+                    if x < 0 or x > self._width:
+                        return ((x,y,angle,hop),taken,True,'dead',[])
+
+        box = self._box(x,y,angle)
+        for (lane,kind) in lanes:
+            if kind == 'road':
+                checks.append((lane,'car',box))
+        return ((x,y,angle,hop),taken,True,None,checks)
+
+    def _glide(self,frog):
+        '''
+        Returns the pair (frog,frames) after the frames of a hop that need no checks
+
+        These are the frames before the last one of the hop in which the frog touches no
+        road, so that _frame would only move it. They are done here without _frame. A
+        hop up or down does not depend on the frog x, so those are cached.
+
+        Parameter frog: The frog in the middle of a hop (x,y,angle,hop)
+        Precondition: frog is a tuple, and hop is a hop up, down, left or right
+        '''
+        (x,y,angle,hop) = frog
+        (axis,start,end,step,size) = hop
+        (move,frames) = (step*self._dt,0)
+        if axis == 'x':
+            if not any(kind == 'road' for (lane,kind) in self._near(y,angle)):
+                while abs(x+move-start) < size:
+                    (x,frames) = (x+move,frames+1)
+            return ((x,y,angle,hop),frames)
+
+        key = (y,angle,hop)
+        if not key in self._glides:
+            (value,frames) = (y,0)
+            while abs(value+move-start) < size:
+                if any(kind == 'road' for (lane,kind) in self._near(value+move,angle)):
+                    break
+                (value,frames) = (value+move,frames+1)
+            self._glides[key] = (value,frames)
+        (y,frames) = self._glides[key]
+        return ((x,y,angle,hop),frames)
+
+    def _hedge(self,x,y,angle,direction,taken):
+        '''
+        Returns the pair (result,taken) for a frog moving to (x,y) near a hedge
+
+        The result is 'is exit', 'cannot go', 'is opening' or None (no hedge), as in
+        SimLevel._checkCollide. Taking an exit adds it to the mask taken. Hedges do not
+        move, so this does not depend on the lane clock.
+
+        Parameter x: The horizontal coordinate the frog moves to
+        Precondition: x is a float
+
+        Parameter y: The vertical coordinate the frog moves to
+        Precondition: y is a float
+
+        Parameter angle: The heading of the frog
+        Precondition: angle is one of the FROG_ headings
+
+        Parameter direction: The direction the frog is moving
+        Precondition: direction is 'up,'down','left', or 'right'
+
+        Parameter taken: The mask of the exits taken
+        Precondition: taken is an int >= 0
+        '''
+        for (lane,kind) in self._near(y,angle):
+            if kind == 'hedge':
+                types = lane.getTypes()
+                for i in lane.containing((x,y)):
+                    if types[i] == 'exit':
+                        bit = self._exits[(lane.getRow(),i)]
+                        if taken & bit or direction == 'down':
+                            return ('cannot go',taken)
+                        return ('is exit',taken | bit)
+                    elif types[i] == 'open':
+                        return ('is opening',taken)
+                return ('cannot go',taken)
+        return (None,taken)
+
+    def _near(self,y,angle):
+        '''
+        Returns the lanes touched by the frog at height y, as a list of (lane,type)
+
+        The lanes are bottom to top, as in SimLevel.update. The frog center is always on
+        the screen (or the frog is dead), so whether its box touches a lane tile only
+        depends on its height and heading. The lists are cached.
+
+        Parameter y: The vertical coordinate of the frog
+        Precondition: y is a float
+
+        Parameter angle: The heading of the frog
+        Precondition: angle is one of the FROG_ headings
+        '''
+        key = (y,angle)
+        if not key in self._lanes:
+            box = self._box(self._width/2,y,angle)
+            lanes = self._level.getLanes()
+            self._lanes[key] = [(lanes[pos],lanes[pos].getType()) for pos in
+                                self._level._rows(box) if lanes[pos].collides(box)]
+        return self._lanes[key]
+
+    def _box(self,x,y,angle):
+        '''
+        Returns the bounding box (l,t,r,b) of the frog at (x,y) with the given heading
+
+        This is SimFrog.bbox (the frog has no hitbox offsets), without making a frog.
+
+        Parameter x: The horizontal coordinate of the frog
+        Precondition: x is a float
+
+        Parameter y: The vertical coordinate of the frog
+        Precondition: y is a float
+
+        Parameter angle: The heading of the frog
+        Precondition: angle is one of the FROG_ headings
+        '''
+        (w,h) = self._sizes[angle]
+        return (x-w,y+h,x+w,y-h)
+
+
+def main(names):
+    '''
+    Solves each level file in names, prints the results, and returns the number of failures
+
+    The objects file is OBJECT_DATA in the same folder as each level. This is also a
+    timing check: a level fails if the search takes more than SOLVER_SECONDS, if it
+    ends as 'unknown', or if its plan loses a life when replayed in the model.
+
+    Parameter names: The paths to the level files
+    Precondition: names is a list of strings
+    '''
+    failures = 0
+    for name in names:
+        hitname = os.path.join(os.path.dirname(name),OBJECT_DATA)
+        start = time.perf_counter()
+        try:
+            solution = solveFile(name,hitname)
+        except (KeyError,IndexError,TypeError,ValueError) as e:
+            print('%s: invalid level (%s: %s)' % (name,type(e).__name__,e))
+            continue
+        seconds = time.perf_counter()-start
+        failed = seconds > SOLVER_SECONDS or solution.getStatus() == 'unknown'
+        if solution.getStatus() == 'solved':
+            with open(name) as file:
+                jsondict = json.load(file)
+            with open(hitname) as file:
+                jsonhitbox = json.load(file)
+            results = replay(jsondict,jsonhitbox,solution.getMoves())
+            deaths = len([result for result in results if not result in (None,'in exit')])
+            failed = failed or deaths > 0
+            print('%s: solved in %d frames (%.2f seconds), %d deaths, searched in %.1f seconds' %
+                  (name,solution.getFrames(),solution.getFrames()*SOLVER_DT,deaths,seconds))
+        else:
+            print('%s: %s (%d states), searched in %.1f seconds' %
+                  (name,solution.getStatus(),solution.getExpanded(),seconds))
+        failures += failed
+    return failures
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(1 if main(sys.argv[1:]) else 0)
@@ -0,0 +1,385 @@
+"""
+Level sweep module for frogger
+
+This module plays many levels without a window, in parallel, and writes one report.
+It is for regression testing: every level file (or a folder of them, such as JSON)
+is played by a bot, or a set of recordings is played back, and each game is a row of
+the report with the outcome, the time to complete the level, the deaths in each lane
+and statistics of the time per update.
+
+The games are run in a pool of processes (see ProcessPoolExecutor), one game per
+task, so a sweep uses every core. The bots are
+
+    random: presses keys at random (mostly 'up'), with a seed for each game
+    solver: plays the plan found by solver.py (levels it cannot solve are 'unsolved')
+
+The report is CSV or JSON, depending on the file name. For example:
+
+    python sweep.py JSON --bot=random --runs=20 --out=report.csv
+    python sweep.py JSON/easy1.json JSON/easy2.json --bot=solver --out=report.json
+    python sweep.py --replays=Replays --out=replays.csv
+
+Write the numbers as --name=value. Like the game, consts.py reads a number in the
+second place on the command line as the frog speed, so this module refuses one there.
+"""
+from consts import *
+from simulation import *
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import json
+import numpy as np
+import os
+import random
+import recording
+import solver
+import sys
+import time
+
+# PRIMARY RULE: Like simulation.py, this module may only access consts.py and the
+# headless modules (simulation.py, solver.py, recording.py). It must never import
+# game2d (or anything else that needs Kivy).
+
+# The bots that can play a level
+SWEEP_BOTS = ('random','solver')
+
+# The chance that the random bot presses each key on a tick
+SWEEP_KEYS = {'up': 0.04, 'left': 0.02, 'right': 0.02, 'down': 0.01}
+
+# The default most ticks in a game (a game still going is a 'timeout')
+SWEEP_TICKS = 120*TICK_RATE
+
+# The columns of a row of the report, in order
+SWEEP_COLUMNS = ('level','source','run','outcome','ticks','seconds','exits','lives',
+                 'deaths','lanes','mean_us','p50_us','p99_us','max_us','error')
+
+
+def runGame(task):
+    '''
+    Plays one game of a sweep, and returns its row of the report (a dict)
+
+    The task is a dict. For a bot (see SWEEP_BOTS), it has 'level', the path to a level
+    file, 'bot', 'run', 'seed' and 'ticks'. For a recording, it only has 'replay', the
+    path to the recording; the level is the file with its name in the JSON folder.
+    A game that cannot be played is a row with the outcome 'error'.
+
+    The outcome is 'win' if every exit was taken, 'loss' if the last life was lost,
+    'timeout' if the game ran out of ticks, and 'unsolved' if the solver found no
+    plan. The value 'lanes' maps each row (as a string) to the deaths in that lane,
+    the road that hit the frog or the water that it drowned in (see SimLevel.getKiller).
+
+    Parameter task: The game to play
+    Precondition: task is a dict as above
+    '''
+    row = dict.fromkeys(SWEEP_COLUMNS)
+    row.update(level=task.get('level'),run=task.get('run',0),deaths=0,lanes={})
+    row['source'] = task['replay'] if 'replay' in task else task['bot']
+    try:
+        if 'replay' in task:
+            data = recording.Recording.load(task['replay'])
+            folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),'JSON')
+            row['level'] = os.path.join(folder,data.getName())
+        with open(row['level']) as file:
+            jsondict = json.load(file)
+        with open(os.path.join(os.path.dirname(row['level']),OBJECT_DATA)) as file:
+            jsonhitbox = json.load(file)
+        if 'replay' in task:
+            ticks = _replayTicks(data,jsondict,jsonhitbox)
+        elif task['bot'] == 'solver':
+            ticks = _solverTicks(jsondict,jsonhitbox)
+        else:
+            ticks = _randomTicks(task['seed'],task['ticks'])
+        if ticks is None:
+            row['outcome'] = 'unsolved'
+            return row
+        _play(row,SimLevel(jsondict,jsonhitbox),ticks)
+    except (OSError,KeyError,IndexError,TypeError,ValueError) as e:
+        row['outcome'] = 'error'
+        row['error'] = '%s: %s' % (type(e).__name__,e)
+    return row
+
+
+def sweep(tasks,jobs=None):
+    '''
+    Plays every task in a pool of jobs processes, and returns the rows in order
+
+    Parameter tasks: The games to play (see runGame)
+    Precondition: tasks is a list of dicts
+
+    Parameter jobs: The number of processes (None for one per core, 1 for no pool)
+    Precondition: jobs is an int > 0 or None
+    '''
+    if jobs == 1:
+        return [runGame(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Small chunks keep the cores busy when some levels take much longer
+        chunk = max(1,len(tasks)//(4*(jobs or os.cpu_count() or 1)))
+        return list(pool.map(runGame,tasks,chunksize=chunk))
+
+
+def summarize(rows):
+    '''
+    Returns a summary of the rows of a sweep for each level, as a dict by level
+
+    Each summary has the number of games, the outcomes, the mean ticks of the games
+    that were won, the deaths in each lane and the worst time of an update. A game
+    with no level (a recording that cannot be read) is summarized by its source.
+
+    Parameter rows: The rows of a sweep
+    Precondition: rows is a list of dicts returned by runGame
+    '''
+    result = {}
+    wins = {}
+    for row in rows:
+        level = row['level'] or row['source']
+        entry = result.setdefault(level,{'games': 0, 'outcomes': {}, 'win_ticks': None,
+                                                'lanes': {}, 'max_us': None})
+        entry['games'] += 1
+        entry['outcomes'][row['outcome']] = entry['outcomes'].get(row['outcome'],0)+1
+        for (lane,deaths) in row['lanes'].items():
+            entry['lanes'][lane] = entry['lanes'].get(lane,0)+deaths
+        if not row['max_us'] is None:
+            entry['max_us'] = max(entry['max_us'] or 0.0,row['max_us'])
+        if row['outcome'] == 'win':
+            wins.setdefault(level,[]).append(row['ticks'])
+    for (level,ticks) in wins.items():
+        result[level]['win_ticks'] = sum(ticks)/len(ticks)
+    return result
+
+
+def writeReport(filename,rows,settings):
+    '''
+    Writes the rows of a sweep to filename, as JSON or CSV (by the file extension)
+
+    The JSON report also has the settings of the sweep and the summary of each level.
+    The CSV report is one line per game, with the deaths per lane as 'row:deaths'
+    pairs separated by spaces.
+
+    Parameter filename: The file to write
+    Precondition: filename is a string ending in .json or .csv
+
+    Parameter rows: The rows of a sweep
+    Precondition: rows is a list of dicts returned by runGame
+
+    Parameter settings: The settings of the sweep
+    Precondition: settings is a dict that can be written as JSON
+    '''
+    if filename.lower().endswith('.json'):
+        report = {'settings': settings, 'levels': summarize(rows), 'games': rows}
+        with open(filename,'w') as file:
+            json.dump(report,file,indent=1)
+    else:
+        with open(filename,'w',newline='') as file:
+            writer = csv.DictWriter(file,fieldnames=SWEEP_COLUMNS)
+            writer.writeheader()
+            for row in rows:
+                line = dict(row)
+                line['lanes'] = ' '.join('%s:%d' % pair for pair in sorted(row['lanes'].items(),key=lambda pair: int(pair[0])))
+                writer.writerow(line)
+
+
+def main(args):
+    '''
+    Runs a sweep from the command line arguments args (see the module), and prints
+    the summary of each level
+
+    Parameter args: The command line arguments, without the program name
+    Precondition: args is a list of strings
+    '''
+    parser = argparse.ArgumentParser(prog='sweep.py',description='Plays levels without a window, in parallel.')
+    parser.add_argument('levels',nargs='*',help='level files, or folders of level files')
+    parser.add_argument('--bot',choices=SWEEP_BOTS,default='random',help='the bot that plays the levels')
+    parser.add_argument('--runs',type=int,default=1,help='the games of each level (random bot)')
+    parser.add_argument('--seed',type=int,default=0,help='the seed of the random bot')
+    parser.add_argument('--ticks',type=int,default=SWEEP_TICKS,help='the most ticks in a game')
+    parser.add_argument('--replays',help='a recording, or a folder of recordings, to play instead of a bot')
+    parser.add_argument('--jobs',type=int,default=None,help='the number of processes (default: one per core)')
+    parser.add_argument('--out',help='the report to write (.csv or .json)')
+    options = parser.parse_args(args)
+    if options.out and not options.out.lower().endswith(('.csv','.json')):
+        parser.error('the report must be a .csv or .json file')
+
+    tasks = []
+    if options.replays:
+        for name in _files(options.replays,'.frec'):
+            tasks.append({'replay': name})
+    else:
+        for level in _files(options.levels,'.json'):
+            runs = options.runs if options.bot == 'random' else 1
+            for run in range(runs):
+                tasks.append({'level': level, 'bot': options.bot, 'run': run,
+                              'seed': '%s:%d:%d' % (os.path.basename(level),options.seed,run),
+                              'ticks': options.ticks})
+    if not tasks:
+        parser.error('there are no levels or recordings to play')
+
+    start = time.perf_counter()
+    rows = sweep(tasks,options.jobs)
+    elapsed = time.perf_counter()-start
+    for (level,entry) in summarize(rows).items():
+        outcomes = ', '.join('%d %s' % (count,outcome) for (outcome,count) in sorted(entry['outcomes'].items()))
+        print('%s: %d games (%s)' % (level,entry['games'],outcomes))
+    print('%d games in %.1f seconds' % (len(rows),elapsed))
+    if options.out:
+        settings = {key: value for (key,value) in vars(options).items() if key != 'out'}
+        settings.update(tick_rate=TICK_RATE,frog_speed=FROG_SPEED,seconds=elapsed)
+        writeReport(options.out,rows,settings)
+
+
+# HIDDEN FUNCTIONS
+def _play(row,level,ticks):
+    '''
+    Plays the ticks in level, filling in row with what happened
+
+    The frog is put back at the start after an exit or a death, as in the game. The
+    game ends when it is won or lost, or when the ticks run out.
+
+    Parameter row: The row of the report for the game
+    Precondition: row is a dict with the keys SWEEP_COLUMNS
+
+    Parameter level: The level to play
+    Precondition: level is a new SimLevel
+
+    Parameter ticks: The keys and time step of each tick
+    Precondition: ticks is an iterable of pairs (keys,dt), with keys a list of key names
+    '''
+    input = SimInput()
+    times = []
+    clock = 0.0
+    result = None
+    for (keys,dt) in ticks:
+        if level.getFrog() is None:
+            level.reconstructFrog()
+        input.setKeys(keys)
+        start = time.perf_counter()
+        result = level.update(input,dt)
+        times.append(time.perf_counter()-start)
+        clock += dt
+        if result in ('more lives left','no lives left'):
+            lane = str(level.getKiller())
+            row['lanes'][lane] = row['lanes'].get(lane,0)+1
+            row['deaths'] += 1
+        if result == 'no lives left' or level.getExitsLeft() == 0:
+            break
+
+    if level.getExitsLeft() == 0:
+        row['outcome'] = 'win'
+    elif result == 'no lives left':
+        row['outcome'] = 'loss'
+    else:
+        row['outcome'] = 'timeout'
+    row['ticks'] = len(times)
+    row['seconds'] = clock
+    row['lives'] = level.getLives()
+    row['exits'] = sum(lane.getNumOccupied() for lane in level.getLanesOfType('hedge'))
+    if times:
+        times = np.array(times)*1e6
+        row['mean_us'] = float(times.mean())
+        (row['p50_us'],row['p99_us']) = (float(value) for value in np.percentile(times,(50,99)))
+        row['max_us'] = float(times.max())
+
+
+def _randomTicks(seed,count):
+    '''
+    Returns the ticks of the random bot, as a list of pairs (keys,dt)
+
+    Parameter seed: The seed of the game
+    Precondition: seed is a string
+
+    Parameter count: The number of ticks
+    Precondition: count is an int >= 0
+    '''
+    generator = random.Random(seed)
+    dt = 1/TICK_RATE
+    result = []
+    for tick in range(count):
+        keys = []
+        value = generator.random()
+        for (key,chance) in SWEEP_KEYS.items():
+            if value < chance:
+                keys = [key]
+                break
+            value -= chance
+        result.append((keys,dt))
+    return result
+
+
+def _solverTicks(jsondict,jsonhitbox):
+    '''
+    Returns the ticks of the plan of the solver, or None if it has no plan
+
+    Parameter jsondict: The JSON for level
+    Precondition: jsondict is a JSON file
+
+    Paramter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+    '''
+    solution = solver.solve(jsondict,jsonhitbox)
+    if solution.getStatus() != 'solved':
+        return None
+    return [([] if key is None else [key],solver.SOLVER_DT) for key in solution.getMoves()]
+
+
+def _replayTicks(data,jsondict,jsonhitbox):
+    '''
+    Returns the ticks of the recording data, as a list of pairs (keys,dt)
+
+    This raises a ValueError if the recording is not of this level.
+
+    Parameter data: The recording
+    Precondition: data is a Recording
+
+    Parameter jsondict: The JSON for level
+    Precondition: jsondict is a JSON file
+
+    Paramter jsonhitbox: The JSON for objects and the hitboxes
+    Precondition: jsonhitbox is a JSON file
+    '''
+    if data.getHash() != recording.levelHash(jsondict,jsonhitbox):
+        raise ValueError('recording of %s is for a different level' % repr(data.getName()))
+    return [(keys,dt) for (keys,dt,count) in data.runs() for tick in range(count)]
+
+
+def _files(paths,extension):
+    '''
+    Returns the files in paths with the extension, looking inside folders, sorted
+
+    The objects file OBJECT_DATA is never a level.
+
+    Parameter paths: The files and folders
+    Precondition: paths is a string or a list of strings
+
+    Parameter extension: The file extension (such as '.json')
+    Precondition: extension is a string
+    '''
+    if type(paths) == str:
+        paths = [paths]
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(extension) and name != OBJECT_DATA:
+                    result.append(os.path.join(path,name))
+        else:
+            result.append(path)
+    return result
+
+
+def _numeric(value):
+    '''
+    Returns True if value is a number, as consts.py would read it
+
+    Parameter value: A command line argument
+    Precondition: value is a string
+    '''
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and _numeric(sys.argv[2]):
+        sys.exit('sweep.py: write numbers as --name=value (consts.py reads %s as the frog speed)' % sys.argv[2])
+    main(sys.argv[1:])